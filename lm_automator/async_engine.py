@@ -0,0 +1,742 @@
+"""Contains an asyncio engine that drives many geckodriver sessions from a single process.
+
+Each session talks to its own geckodriver over a kept alive HTTP connection
+through AsyncWebDriver, a minimal W3C WebDriver client built on asyncio
+streams, so no thread or process is needed per browser.
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import socket
+import time
+import traceback
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib import parse
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from lm_automator.auth_cache import AuthCache, LOAD_STORAGE_SCRIPT
+from lm_automator.common import LaunchProfile
+from lm_automator.element_handler import (
+    BATCH_SCRIPT,
+    DEFAULT_SCRIPT_TIMEOUT,
+    READ_VALUES_SCRIPT,
+    BatchResult,
+)
+from lm_automator.flow_compiler import TestPlan
+from lm_automator.journal import Journal
+from lm_automator.layout_manager import LayoutManager
+from lm_automator.page import Page, Route
+from lm_automator.readiness import (
+    IDLE_SCRIPT,
+    PAGE_CHANGED,
+    PAGE_LOADED,
+    TRACKER_SCRIPT,
+    ReadinessCondition,
+)
+from lm_automator.runner import TestResult, concurrency_for, format_result, take_from
+from lm_automator.session_pool import RESET_STORAGE_SCRIPT, SessionPool
+
+# Key W3C WebDriver uses for element references in command results.
+ELEMENT_KEY = "element-6066-11e4-a52f-4f735466cecf"
+
+# The exception raised for each W3C error code, the rest raise WebDriverException.
+ERRORS = {
+    "element click intercepted": ElementClickInterceptedException,
+    "element not interactable": ElementNotInteractableException,
+    "invalid session id": InvalidSessionIdException,
+    "javascript error": JavascriptException,
+    "no such element": NoSuchElementException,
+    "script timeout": TimeoutException,
+    "stale element reference": StaleElementReferenceException,
+    "timeout": TimeoutException,
+}
+
+
+def free_port() -> int:
+    """Return a TCP port on localhost that nothing is listening on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class AsyncWebDriver:
+    """A minimal W3C WebDriver client for one session of its own geckodriver.
+
+    Commands are sent one at a time over a single kept alive connection.
+
+    Attributes:
+        executable -- the geckodriver command
+        startup_timeout -- seconds to wait for geckodriver to accept connections
+        capabilities -- capabilities the session is created with
+        session_id -- id of the session, None until started
+    """
+
+    executable = "geckodriver"
+    startup_timeout = 10
+
+    def __init__(self, capabilities: Dict[str, Any], port: Optional[int] = None):
+        """
+        Arguments:
+            capabilities -- capabilities the session is created with
+            port -- port of an already running driver, instead of launching geckodriver
+        """
+        self.capabilities = capabilities
+        self.session_id: Optional[str] = None
+        self._port = port
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Launch geckodriver if needed and create the session."""
+        if self._port is None:
+            self._port = free_port()
+            self._process = await asyncio.create_subprocess_exec(
+                self.executable,
+                "--port",
+                str(self._port),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                await self._connect()
+            except OSError:
+                if self._process is not None and self._process.returncode is not None:
+                    raise WebDriverException(
+                        f"{self.executable} exited with code {self._process.returncode}"
+                    )
+                if time.monotonic() > deadline:
+                    raise WebDriverException(
+                        f"{self.executable} did not start within {self.startup_timeout}s"
+                    )
+                await asyncio.sleep(0.05)
+            else:
+                break
+        value = await self.command(
+            "POST", "/session", {"capabilities": {"alwaysMatch": self.capabilities}}
+        )
+        self.session_id = value["sessionId"]
+
+    async def quit(self) -> None:
+        """End the session and stop the geckodriver launched for it."""
+        try:
+            if self.session_id is not None:
+                await self.command("DELETE", f"/session/{self.session_id}")
+        except (OSError, EOFError, WebDriverException):
+            # E.g. the browser is already gone and the connection was closed.
+            pass
+        finally:
+            self.session_id = None
+            self._disconnect()
+            if self._process is not None and self._process.returncode is None:
+                self._process.terminate()
+                await self._process.wait()
+            self._process = None
+
+    async def command(
+        self, method: str, path: str, body: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Send a command and return the value of its response.
+
+        Arguments:
+            method -- HTTP method of the command
+            path -- path of the command's endpoint
+            body -- parameters of the command
+        """
+        payload = json.dumps(body if body is not None else {}).encode()
+        if method in ("GET", "DELETE"):
+            payload = b""
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            try:
+                status, data = await self._exchange(method, path, payload)
+            except (OSError, asyncio.IncompleteReadError):
+                # The driver closed the kept alive connection, reconnect once.
+                self._disconnect()
+                await self._connect()
+                status, data = await self._exchange(method, path, payload)
+
+        value = json.loads(data)["value"] if data else None
+        if status >= 400 or (isinstance(value, dict) and "error" in value):
+            error = value.get("error", "") if isinstance(value, dict) else ""
+            message = value.get("message", "") if isinstance(value, dict) else str(value)
+            raise ERRORS.get(error, WebDriverException)(message or f"HTTP {status}")
+        return value
+
+    async def session_command(
+        self, method: str, name: str, body: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Send a command of the session, e.g. ("POST", "url", {"url": ...})."""
+        return await self.command(method, f"/session/{self.session_id}/{name}", body)
+
+    async def get(self, url: str) -> None:
+        await self.session_command("POST", "url", {"url": url})
+
+    async def refresh(self) -> None:
+        await self.session_command("POST", "refresh", {})
+
+    async def current_url(self) -> str:
+        return await self.session_command("GET", "url")
+
+    async def find_element(self, locator: str) -> str:
+        """Return the id of the first element matching a CSS selector."""
+        value = await self.session_command(
+            "POST", "element", {"using": "css selector", "value": locator}
+        )
+        return value[ELEMENT_KEY]
+
+    async def find_elements(self, locator: str) -> List[str]:
+        """Return the ids of every element matching a CSS selector."""
+        values = await self.session_command(
+            "POST", "elements", {"using": "css selector", "value": locator}
+        )
+        return [value[ELEMENT_KEY] for value in values]
+
+    async def element_command(
+        self, method: str, element: str, name: str, body: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Send a command to an element, e.g. ("POST", element, "click")."""
+        return await self.session_command(method, f"element/{element}/{name}", body)
+
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        return await self.session_command(
+            "POST", "execute/sync", {"script": script, "args": list(args)}
+        )
+
+    async def execute_async_script(self, script: str, *args: Any) -> Any:
+        return await self.session_command(
+            "POST", "execute/async", {"script": script, "args": list(args)}
+        )
+
+    async def set_script_timeout(self, seconds: float) -> None:
+        await self.session_command("POST", "timeouts", {"script": int(seconds * 1000)})
+
+    async def add_cookie(self, cookie: Dict[str, Any]) -> None:
+        await self.session_command("POST", "cookie", {"cookie": cookie})
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            "127.0.0.1", self._port
+        )
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _exchange(
+        self, method: str, path: str, payload: bytes
+    ) -> Tuple[int, bytes]:
+        self._writer.write(
+            (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: 127.0.0.1:{self._port}\r\n"
+                "Connection: keep-alive\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+            ).encode()
+            + payload
+        )
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = b""
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data += chunk[:-2]
+        else:
+            data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self._disconnect()
+        return status, data
+
+
+def css_string(value: str) -> str:
+    """Return the value as a quoted CSS string, e.g. for an attribute selector.
+
+    Arguments:
+        value -- the string to quote
+    """
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'"{escaped}"'
+
+
+class AsyncElementHandler:
+    """Async counterparts of the ElementHandler operations, driving one AsyncWebDriver.
+
+    Attributes:
+        timeout -- seconds to wait for elements before timing out
+        poll_frequency -- seconds between checks while waiting for an element
+        page -- the page the browser is on, or None if unknown
+        layout -- the layout selected on the page, or None for its default one
+    """
+
+    timeout = 5
+    poll_frequency = 0.05
+
+    def __init__(self, driver: AsyncWebDriver):
+        """
+        Arguments:
+            driver -- the started driver to drive
+        """
+        self.driver = driver
+        self.page: Optional[str] = None
+        self.layout: Optional[str] = None
+        # [id, URL] of the document at the last navigation or readiness wait.
+        self._location: Optional[List[str]] = None
+
+    async def navigate(self, url: str) -> None:
+        """Load a URL in the browser.
+
+        Arguments:
+            url -- the URL to load
+        """
+        await self.driver.get(url)
+        self.page = self.layout = None
+        self._location = await self.driver.execute_script(TRACKER_SCRIPT)
+
+    async def refresh(self) -> None:
+        """Reload the current page."""
+        await self.driver.refresh()
+        self.page = self.layout = None
+        self._location = await self.driver.execute_script(TRACKER_SCRIPT)
+
+    async def visit(
+        self, name: str, layout: Optional[str] = None, route: Route = Route()
+    ) -> None:
+        """Open a page by its route, or through the sidebar, see Page.visit.
+
+        Sessions are reset onto the base URL before every test, so unlike
+        Page.visit this never finds the page already open.
+
+        Arguments:
+            name -- the page's name, the path of its sidebar link
+            layout -- the layout that will be selected next, if any
+            route -- where the page can be loaded from directly
+        """
+        if layout is not None and route.layout_url:
+            await self._load(route.layout_url.format(layout=parse.quote(layout)), route.ready)
+            self.page, self.layout = name, layout
+            return
+        if route.url:
+            await self._load(route.url, route.ready)
+        else:
+            await self.click(Page.sidebar_link_locator.format(name))
+            await self.wait_until_ready(PAGE_CHANGED)
+        self.page = name
+
+    async def select_layout(self, layout: str) -> None:
+        """Go to a layout of the open page unless it is already selected, see Page.select_layout.
+
+        Arguments:
+            layout -- the layout's name
+        """
+        if self.page is not None and self.layout == layout:
+            return
+        await self.click(Page.caret_button.locator)
+        await self.send_keys(Page.filter_button.locator, layout)
+        await self.click(Page.layout_option_locator)
+        await self.wait_until_ready(PAGE_CHANGED)
+        self.layout = layout
+
+    async def _load(self, path: str, ready: Optional[str]) -> None:
+        """Load a path of the current site and wait for its content, see Page._load."""
+        current_url = await self.driver.current_url()
+        url = parse.urljoin(current_url, path)
+        await self.navigate(url)
+        if parse.urldefrag(url)[0] == parse.urldefrag(current_url)[0]:
+            # Only the fragment changed, which does not load the page again.
+            await self.refresh()
+        if ready:
+            await self.get_element(ready)
+        else:
+            await self.wait_until_ready(PAGE_LOADED)
+
+    @contextlib.contextmanager
+    def waiting(
+        self, timeout: Optional[float] = None, poll: Optional[float] = None
+    ) -> Generator[None, None, None]:
+        """Use a different timeout and poll frequency inside the context, see ElementHandler.waiting."""
+        previous = self.timeout, self.poll_frequency
+        if timeout is not None:
+            self.timeout = timeout
+        if poll is not None:
+            self.poll_frequency = poll
+        try:
+            yield
+        finally:
+            self.timeout, self.poll_frequency = previous
+
+    @contextlib.asynccontextmanager
+    async def _script_timeout(self, seconds: float) -> AsyncGenerator[None, None]:
+        """Let async scripts run for the given seconds, see ElementHandler._script_timeout."""
+        if seconds <= DEFAULT_SCRIPT_TIMEOUT:
+            yield
+            return
+        await self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            await self.driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+
+    async def _until(self, condition: Callable[[], Awaitable[Any]], what: str) -> Any:
+        """Return the first truthy result of the condition, checked until the timeout."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                result = await condition()
+            except (NoSuchElementException, StaleElementReferenceException):
+                result = None
+            if result:
+                return result
+            if time.monotonic() > deadline:
+                raise TimeoutException(f"Timed out waiting for {what}")
+            await asyncio.sleep(self.poll_frequency)
+
+    async def get_element(self, locator: str) -> str:
+        """Pause until element is present then return its id.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+        """
+        return await self._until(lambda: self.driver.find_element(locator), locator)
+
+    async def click(self, locator: str) -> None:
+        """Pause until element is clickable then click it.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+        """
+
+        async def click() -> bool:
+            element = await self.driver.find_element(locator)
+            if not (
+                await self.driver.element_command("GET", element, "displayed")
+                and await self.driver.element_command("GET", element, "enabled")
+            ):
+                return False
+            try:
+                await self.driver.element_command("POST", element, "click")
+            except (ElementClickInterceptedException, ElementNotInteractableException):
+                return False
+            return True
+
+        await self._until(click, locator)
+
+    async def send_keys(self, locator: str, keys: str) -> None:
+        """Pause until element is present and replace its text with the keys.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+            keys -- the key input to send to the element
+        """
+        element = await self.get_element(locator)
+        await self.driver.element_command("POST", element, "clear")
+        await self.driver.element_command("POST", element, "value", {"text": keys})
+
+    async def select(self, locator: str, value: str) -> None:
+        """Pause until select element is present then select a value in it.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+            value -- the option you wish to select
+        """
+        await self.click(f"{locator} option[value={css_string(str(value))}]")
+
+    async def is_selected(self, locator: str) -> bool:
+        """Return whether a checkbox is checked or an option selected.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+        """
+        element = await self.get_element(locator)
+        return await self.driver.element_command("GET", element, "selected")
+
+    async def element_is_present(self, locator: str) -> bool:
+        """Return whether an element is present or not.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+        """
+        try:
+            await self.get_element(locator)
+        except TimeoutException:
+            return False
+        else:
+            return True
+
+    async def perform(self, locator: str, action: str, value: Any = None) -> None:
+        """Apply one action to an element, see ElementHandler.perform."""
+        if action == "click":
+            await self.click(locator)
+        elif action == "set":
+            await self.send_keys(locator, value)
+        elif action == "select":
+            await self.select(locator, value)
+        elif action == "check":
+            if await self.is_selected(locator) != value:
+                await self.click(locator)
+        else:
+            raise ValueError(f"Unknown action: {action}")
+
+    async def run_batch(
+        self, operations: Sequence[Tuple[str, str, Any]]
+    ) -> List[BatchResult]:
+        """Apply a list of actions in a single round trip, see ElementHandler.run_batch."""
+        if not operations:
+            return []
+        async with self._script_timeout(self.timeout * len(operations) + 1):
+            outcomes = await self.driver.execute_async_script(
+                BATCH_SCRIPT, [list(operation) for operation in operations], self.timeout
+            )
+        outcomes += [[False, "skipped", 0.0]] * (len(operations) - len(outcomes))
+        return [
+            BatchResult(locator, action, *outcome)
+            for (locator, action, _), outcome in zip(operations, outcomes)
+        ]
+
+    async def perform_all(self, operations: Sequence[Tuple[str, str, Any]]) -> None:
+        """Apply a list of actions in one round trip, redoing any that fail one at a time."""
+        results = await self.run_batch(operations)
+        applied = 0
+        for result in results:
+            if not result.ok:
+                break
+            applied += 1
+        if applied < len(operations):
+            with self.waiting(timeout=max(self.timeout - results[applied].waited, 0)):
+                await self.perform(*operations[applied])
+        for operation in operations[applied + 1 :]:
+            await self.perform(*operation)
+
+    async def read_values(self, fields: Dict[str, Tuple[str, str]]) -> Dict[str, Any]:
+        """Return the values of many inputs read in one round trip, see ElementHandler.read_values."""
+        if not fields:
+            return {}
+        return await self.driver.execute_script(
+            READ_VALUES_SCRIPT, {name: list(field) for name, field in fields.items()}
+        )
+
+    async def wait_until_ready(
+        self, condition: ReadinessCondition, target: Optional[str] = None
+    ) -> bool:
+        """Pause until the application is idle, see ElementHandler.wait_until_ready."""
+        deadline = time.monotonic() + self.timeout
+        previous = self._location if condition.navigation else None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                async with self._script_timeout(remaining + 1):
+                    location = await self.driver.execute_async_script(
+                        IDLE_SCRIPT,
+                        target,
+                        condition.quiet_period,
+                        condition.network_idle,
+                        condition.transitions,
+                        previous,
+                        remaining,
+                    )
+            except JavascriptException:
+                # The document was replaced by a navigation, wait on the new one.
+                continue
+            if location is None:
+                break
+            self._location = location
+            return True
+        raise TimeoutException(
+            f"The page was not {condition.name} within {self.timeout:.1f} seconds."
+        )
+
+
+async def execute(handler: AsyncElementHandler, test: TestPlan) -> TestResult:
+    """Run one compiled flow test and return its result instead of raising.
+
+    Arguments:
+        handler -- handler of the session to run the test in
+        test -- the compiled test
+    """
+    start_time = time.monotonic()
+
+    async def run_steps() -> None:
+        for step in test.steps:
+            await step.run(handler)
+
+    try:
+        await asyncio.wait_for(run_steps(), test.budget)
+    except Exception:  # pylint: disable=broad-except
+        return TestResult(
+            test.index, "failed", time.monotonic() - start_time, traceback.format_exc()
+        )
+    return TestResult(test.index, "passed", time.monotonic() - start_time)
+
+
+async def restore_login(handler: AsyncElementHandler, base_url: str, entry: Dict) -> bool:
+    """Load a saved login into the session and return whether it is logged in.
+
+    Arguments:
+        handler -- handler of the session to log in
+        base_url -- URL of the layout manager
+        entry -- a saved login as returned by AuthCache.load
+    """
+    await handler.navigate(base_url + LayoutManager.restore_path)
+    for cookie in entry["cookies"]:
+        await handler.driver.add_cookie(cookie)
+    await handler.driver.execute_script(LOAD_STORAGE_SCRIPT, entry["storage"])
+    await handler.navigate(base_url)
+    return (await handler.driver.current_url()).startswith(
+        base_url
+    ) and await handler.element_is_present(LayoutManager.logged_in_locator)
+
+
+async def reset(handler: AsyncElementHandler, base_url: str) -> None:
+    """Close extra windows, clear storage except the login and return to the base URL.
+
+    Arguments:
+        handler -- handler of the session to reset
+        base_url -- URL of the layout manager
+    """
+    driver = handler.driver
+    handles = await driver.session_command("GET", "window/handles")
+    for handle in handles[1:]:
+        await driver.session_command("POST", "window", {"handle": handle})
+        await driver.session_command("DELETE", "window")
+    await driver.session_command("POST", "window", {"handle": handles[0]})
+    await driver.execute_script(RESET_STORAGE_SCRIPT, list(SessionPool.auth_keys))
+    await handler.navigate(base_url)
+
+
+async def run_concurrent(
+    tests: Iterable[TestPlan],
+    concurrency: int,
+    config_data: Dict,
+    site: str,
+    driver_factory: Optional[Callable[[], AsyncWebDriver]] = None,
+    journal: Optional[Journal] = None,
+) -> List[TestResult]:
+    """Run the tests as coroutines across up to concurrency browser sessions.
+
+    Sessions log in by restoring the saved login, so one must have been saved
+    beforehand. A session that cannot start or log in is dropped and its share
+    of the tests goes to the others. A session that fails outside of a test,
+    e.g. while resetting the browser, reports the test it held as crashed.
+
+    Arguments:
+        tests -- the compiled tests to run, a list or a stream
+        concurrency -- maximum number of browser sessions driven at once
+        config_data -- the parsed config file
+        site -- the site from the flow file
+        driver_factory -- callable returning a new, not yet started AsyncWebDriver
+        journal -- journal to record each result in as soon as its test finishes
+    """
+    if driver_factory is None:
+        profile = LaunchProfile.from_config(config_data.get("browser"))
+        driver_factory = functools.partial(
+            AsyncWebDriver, profile.options().to_capabilities()
+        )
+    base_url = LayoutManager.base_url_for(config_data["environment"], site)
+    entry = AuthCache().load(config_data["environment"], site)
+    take = take_from(tests)
+    finished: Dict[int, TestResult] = {}
+
+    def record(result: TestResult) -> None:
+        finished[result.index] = result
+        print(format_result(result), flush=True)
+        if journal is not None:
+            journal.record(result)
+
+    async def session(number: int) -> None:
+        driver = driver_factory()
+        handler = AsyncElementHandler(driver)
+        test = None
+        try:
+            await driver.start()
+            if entry is None or not await restore_login(handler, base_url, entry):
+                print(f"session {number}: no valid saved login", flush=True)
+                return
+            while True:
+                test = take()
+                if test is None:
+                    return
+                await reset(handler, base_url)
+                record(await execute(handler, test))
+                test = None
+        except Exception as error:  # pylint: disable=broad-except
+            # Whatever ends this session must not end the others through gather.
+            if test is None:
+                print(f"session {number}: {error!r}", flush=True)
+            else:
+                record(
+                    TestResult(test.index, "crashed", 0.0, f"session {number}: {error!r}")
+                )
+        finally:
+            await driver.quit()
+
+    await asyncio.gather(
+        *(session(number) for number in range(concurrency_for(tests, concurrency)))
+    )
+    while True:
+        test = take()
+        if test is None:
+            break
+        record(
+            TestResult(test.index, "crashed", 0.0, "No live sessions were left to run it.")
+        )
+    return [finished[index] for index in sorted(finished)]
+
+
+def run_async(
+    tests: Iterable[TestPlan],
+    concurrency: int,
+    config_data: Dict,
+    site: str,
+    journal: Optional[Journal] = None,
+) -> List[TestResult]:
+    """Run the tests on the asyncio engine, see run_concurrent."""
+    return asyncio.run(
+        run_concurrent(tests, concurrency, config_data, site, journal=journal)
+    )
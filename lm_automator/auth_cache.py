@@ -0,0 +1,128 @@
+"""Contains the AuthCache class."""
+
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from lm_automator.common import CACHE_DIR
+
+
+# Returns the contents of local and session storage.
+DUMP_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    Object.keys(storage).forEach(function (key) { items[key] = storage.getItem(key); });
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Writes previously dumped items back into local and session storage.
+LOAD_STORAGE_SCRIPT = """
+var storage = arguments[0];
+Object.keys(storage.local).forEach(function (key) {
+    window.localStorage.setItem(key, storage.local[key]);
+});
+Object.keys(storage.session).forEach(function (key) {
+    window.sessionStorage.setItem(key, storage.session[key]);
+});
+"""
+
+
+class AuthCache:
+    """Stores the cookies and storage of a logged in browser on disk, keyed by environment and site.
+
+    Attributes:
+        max_age -- seconds after which a saved login is no longer trusted
+    """
+
+    max_age = 8 * 60 * 60
+
+    def __init__(self, directory: pathlib.Path = CACHE_DIR.joinpath("auth")):
+        """
+        Arguments:
+            directory -- directory the logins are saved in
+        """
+        self.directory = directory
+
+    def path(self, environment: str, site: str) -> pathlib.Path:
+        """Return the file the login for an environment and site is saved in."""
+        return self.directory.joinpath(f"{environment}-{site}.json")
+
+    def save(self, environment: str, site: str, driver: WebDriver) -> None:
+        """Save the cookies and storage of the page the driver is on.
+
+        Arguments:
+            environment -- the layout manager environment, e.g. dev
+            site -- the site that was logged in to
+            driver -- a driver that is logged in and on the layout manager
+        """
+        entry = {
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "storage": driver.execute_script(DUMP_STORAGE_SCRIPT),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(environment, site)
+        # The file holds live credentials, so keep it private to the user.
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(entry, file)
+
+    def load(self, environment: str, site: str) -> Optional[Dict]:
+        """Return the saved login, or None if there is none or it has expired.
+
+        A saved login that cannot be read, e.g. a file cut short, is deleted, so
+        the caller logs in afresh and saves a new one.
+
+        Arguments:
+            environment -- the layout manager environment, e.g. dev
+            site -- the site that was logged in to
+        """
+        try:
+            with open(self.path(environment, site), "r") as file:
+                entry = json.load(file)
+        except OSError:
+            return None
+        except ValueError:
+            self.clear(environment, site)
+            return None
+
+        now = time.time()
+        try:
+            if not isinstance(entry["storage"], dict):
+                raise TypeError("storage must be a mapping")
+            cookie_expired = any(
+                cookie.get("expiry", now + 1) <= now for cookie in entry["cookies"]
+            )
+            expired = cookie_expired or now - entry["saved_at"] > self.max_age
+        except (KeyError, TypeError, AttributeError):
+            self.clear(environment, site)
+            return None
+        return None if expired else entry
+
+    def clear(self, environment: str, site: str) -> None:
+        """Forget the saved login for an environment and site."""
+        try:
+            self.path(environment, site).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def restore(driver: WebDriver, entry: Dict) -> None:
+        """Load a saved login into the page the driver is on.
+
+        Cookies can only be set for the domain of the current page, so the driver
+        must already be on the layout manager's domain.
+
+        Arguments:
+            driver -- the driver to restore the login into
+            entry -- a saved login as returned by load
+        """
+        for cookie in entry["cookies"]:
+            driver.add_cookie(cookie)
+        driver.execute_script(LOAD_STORAGE_SCRIPT, entry["storage"])
@@ -0,0 +1,296 @@
+"""Benchmarks ElementHandler and the input classes against the bundled test site.
+
+Usage:
+    python -m lm_automator.benchmark --output results.json
+    python -m lm_automator.benchmark --output results.json --baseline baseline.json
+    python -m lm_automator.benchmark --output thin.json --baseline results.json --transport thin
+    python -m lm_automator.benchmark --output poll.json --baseline results.json --wait_mode poll
+    python -m lm_automator.benchmark --output results.json --startup --config_file config.yml
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import yaml
+
+from lm_automator.common import DriverSession, LaunchProfile
+from lm_automator.element_handler import ElementHandler
+from lm_automator.inputs import Button, Checkbox, Select, Text
+
+TEST_SITE = pathlib.Path(__file__).parent.joinpath("tests", "test-site.html")
+# Latency changes smaller than this are timer noise, however large as a fraction
+# of a baseline close to zero.
+NOISE_MS = 0.1
+
+
+class Benchmark(NamedTuple):
+    """An operation to time, with what has to happen before each run of it.
+
+    Attributes:
+        name -- name the results are reported under
+        run -- the operation being timed
+        setup -- called before each run, outside of the timing
+    """
+
+    name: str
+    run: Callable[[], None]
+    setup: Callable[[], None] = ElementHandler.invalidate_cache
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the benchmarks, which expect the test site to be loaded."""
+    text = Text("#region #component #input")
+    checkbox = Checkbox("#region #component #checkbox")
+    button = Button("#region #component #button")
+    select = Select("#region #component #select-3")
+
+    def enter_frame() -> None:
+        with ElementHandler.enter_frame("iframe"):
+            pass
+
+    def set_checkbox() -> None:
+        checkbox.value = not checkbox.value
+
+    return [
+        Benchmark(
+            "command round trip",
+            lambda: ElementHandler.session.driver.execute_script("return 1;"),
+        ),
+        Benchmark("get_element", lambda: ElementHandler.get_element(".main-content")),
+        Benchmark(
+            "get_element (cached)",
+            lambda: ElementHandler.get_element(".main-content"),
+            setup=lambda: None,
+        ),
+        Benchmark("get_all_elements", lambda: ElementHandler.get_all_elements("p")),
+        Benchmark("click_element", lambda: ElementHandler.click_element("#button-1")),
+        Benchmark(
+            "send_keys_to_element",
+            lambda: ElementHandler.send_keys_to_element("#input", "benchmark"),
+        ),
+        Benchmark(
+            "select_value_from_element",
+            lambda: ElementHandler.select_value_from_element("#select-1", "saab"),
+        ),
+        Benchmark("enter_frame", enter_frame),
+        Benchmark(
+            "drag_element_to_element",
+            lambda: ElementHandler.drag_element_to_element("#draggable", "#drop-zone"),
+            setup=ElementHandler.refresh,
+        ),
+        Benchmark(
+            "drag_element_by_offset",
+            lambda: ElementHandler.drag_element_by_offset("#draggable", 100, 100),
+            setup=ElementHandler.refresh,
+        ),
+        Benchmark("Text.value", lambda: text.value),
+        Benchmark("Text.value=", lambda: setattr(text, "value", "benchmark")),
+        Benchmark("Checkbox.value", lambda: checkbox.value),
+        Benchmark("Checkbox.value=", set_checkbox),
+        Benchmark("Button.click", button.click),
+        Benchmark("Select.value", lambda: select.value),
+        Benchmark("Select.value=", lambda: setattr(select, "value", "blue")),
+    ]
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Return the percentile of the samples, interpolating between the closest ranks.
+
+    Arguments:
+        samples -- the measured values
+        fraction -- the percentile as a fraction, e.g. 0.95
+    """
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * fraction
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Return the latency distribution of samples measured in milliseconds."""
+    return {
+        "p50": percentile(samples, 0.50),
+        "p95": percentile(samples, 0.95),
+        "p99": percentile(samples, 0.99),
+        "mean": sum(samples) / len(samples),
+        "runs": len(samples),
+    }
+
+
+def measure(benchmark: Benchmark, runs: int) -> Dict[str, float]:
+    """Time a benchmark and return its latency distribution in milliseconds.
+
+    Arguments:
+        benchmark -- the benchmark to time
+        runs -- number of timed runs
+    """
+    samples = []
+    for _ in range(runs):
+        benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return summarize(samples)
+
+
+def measure_startup(
+    profile: LaunchProfile, runs: int, url: str
+) -> Dict[str, Dict[str, float]]:
+    """Time launching Firefox with a profile and loading a page in it.
+
+    Arguments:
+        profile -- the launch profile to measure
+        runs -- number of browsers to launch
+        url -- the page to load in each browser
+    """
+    cold_start, page_load = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        driver = profile.launch()
+        cold_start.append((time.perf_counter() - start) * 1e3)
+        try:
+            start = time.perf_counter()
+            driver.get(url)
+            page_load.append((time.perf_counter() - start) * 1e3)
+        finally:
+            driver.quit()
+    return {"cold_start": summarize(cold_start), "page_load": summarize(page_load)}
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Return a description of every benchmark that got slower than the threshold allows.
+
+    Slowdowns of at most NOISE_MS are ignored, and slowdowns from a baseline
+    below NOISE_MS are described in milliseconds rather than as a percentage.
+
+    Arguments:
+        results -- latency distributions of this run by benchmark name
+        baseline -- latency distributions to compare against by benchmark name
+        threshold -- allowed slowdown as a fraction, e.g. 0.2 for 20%
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for statistic in ("p50", "p95"):
+            old, new = baseline[name][statistic], result[statistic]
+            if new <= old * (1 + threshold) or new - old <= NOISE_MS:
+                continue
+            if old < NOISE_MS:
+                change = f"+{new - old:.2f}ms"
+            else:
+                change = f"+{(new / old - 1) * 100:.0f}%"
+            regressions.append(f"{name} {statistic}: {old:.2f}ms -> {new:.2f}ms ({change})")
+    return regressions
+
+
+def run(
+    runs: int,
+    names: Optional[Sequence[str]] = None,
+    session: Optional[DriverSession] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Run the benchmarks in a browser and return their latency distributions.
+
+    Arguments:
+        runs -- number of timed runs of each benchmark
+        names -- only run the benchmarks with these names
+        session -- session to run in, a new headless Firefox by default
+    """
+    session = session or DriverSession(LaunchProfile(headless=True).launch)
+    ElementHandler.use_session(session)
+    try:
+        ElementHandler.navigate(TEST_SITE.as_uri())
+        results = {}
+        for benchmark in benchmarks():
+            if names and benchmark.name not in names:
+                continue
+            results[benchmark.name] = measure(benchmark, runs)
+        return results
+    finally:
+        session.quit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", dest="output", action="store", required=True)
+    parser.add_argument("--baseline", dest="baseline", action="store")
+    parser.add_argument("--threshold", dest="threshold", type=float, default=0.2)
+    parser.add_argument("--runs", dest="runs", type=int, default=50)
+    parser.add_argument("--only", dest="only", action="append")
+    parser.add_argument(
+        "--transport",
+        dest="transport",
+        action="store",
+        choices=("selenium", "thin"),
+        default="selenium",
+        help="connection the benchmarked browser's commands are sent through",
+    )
+    parser.add_argument(
+        "--wait_mode",
+        dest="wait_mode",
+        action="store",
+        choices=("observer", "poll"),
+        default=ElementHandler.wait_mode,
+        help="how ElementHandler waits for elements, compare both to see the polling penalty",
+    )
+    parser.add_argument(
+        "--startup",
+        dest="startup",
+        action="store_true",
+        help="measure cold start and page load times of each launch profile instead",
+    )
+    parser.add_argument("--config_file", dest="config_file", action="store")
+    parser.add_argument("--url", dest="url", action="store", default=TEST_SITE.as_uri())
+    args = parser.parse_args()
+    ElementHandler.wait_mode = args.wait_mode
+
+    if args.startup:
+        profiles = {"default": LaunchProfile(), "headless": LaunchProfile(headless=True)}
+        if args.config_file:
+            with open(args.config_file, "r") as file:
+                profiles["configured"] = LaunchProfile.from_config(
+                    yaml.safe_load(file).get("browser")
+                )
+        results = {
+            f"{name} {metric}": distribution
+            for name, profile in profiles.items()
+            for metric, distribution in measure_startup(
+                profile, args.runs, args.url
+            ).items()
+        }
+    else:
+        results = run(
+            args.runs,
+            args.only,
+            DriverSession(LaunchProfile(headless=True, transport=args.transport).launch),
+        )
+    with open(args.output, "w") as file:
+        json.dump({"benchmarks": results}, file, indent=2)
+
+    print(f"{'benchmark':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<30} {result['p50']:>9.2f} {result['p95']:>9.2f} {result['p99']:>9.2f}"
+        )
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["benchmarks"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
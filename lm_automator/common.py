@@ -1,3 +1,197 @@
+"""Contains the DriverSession class and the default session shared by the framework."""
+
+import inspect
+import os
+import pathlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
 from selenium import webdriver
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from lm_automator.transport import ThinConnection
+
+
+CACHE_DIR = pathlib.Path(
+    os.environ.get(
+        "LM_AUTOMATOR_CACHE", pathlib.Path.home().joinpath(".cache", "lm_automator")
+    )
+)
+
+
+class LaunchProfile:
+    """Describes how to launch Firefox, as configured under browser in the config file.
+
+    Attributes:
+        headless -- run without a window
+        page_load_strategy -- "normal", "eager" or "none"
+        disable_images -- do not load images
+        disable_fonts -- do not load web fonts
+        disable_media -- do not autoplay audio or video
+        disable_animations -- turn off smooth scrolling and ask pages for reduced motion
+        profile -- directory of a pre-built Firefox profile to start from
+        window_size -- (width, height) of the window
+        transport -- "selenium" to send commands through Selenium's connection, or
+            "thin" for the lighter ThinConnection
+    """
+
+    def __init__(
+        self,
+        headless: bool = False,
+        page_load_strategy: str = "normal",
+        disable_images: bool = False,
+        disable_fonts: bool = False,
+        disable_media: bool = False,
+        disable_animations: bool = False,
+        profile: Optional[str] = None,
+        window_size: Optional[Tuple[int, int]] = None,
+        transport: str = "selenium",
+    ):
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.disable_images = disable_images
+        self.disable_fonts = disable_fonts
+        self.disable_media = disable_media
+        self.disable_animations = disable_animations
+        self.profile = profile
+        self.window_size = window_size
+        self.transport = transport
+
+    @classmethod
+    def from_config(cls, browser_config: Optional[Dict[str, Any]]) -> "LaunchProfile":
+        """Return the profile described by the browser section of the config file.
+
+        Raises a ValueError naming the first key that is not an option of the profile.
+
+        Arguments:
+            browser_config -- the browser section, or None for Firefox's defaults
+        """
+        if browser_config is not None and not isinstance(browser_config, dict):
+            raise ValueError("The browser section of the config file must be a mapping.")
+        browser_config = dict(browser_config or {})
+        options = inspect.signature(cls).parameters
+        for key in browser_config:
+            if key not in options:
+                raise ValueError(
+                    f"Unknown browser option {key!r}, expected one of: "
+                    + ", ".join(options)
+                    + "."
+                )
+        if browser_config.get("window_size"):
+            browser_config["window_size"] = tuple(browser_config["window_size"])
+        if browser_config.get("profile"):
+            browser_config["profile"] = os.path.expanduser(browser_config["profile"])
+        return cls(**browser_config)
+
+    def preferences(self) -> Dict[str, Any]:
+        """Return the Firefox preferences the profile sets."""
+        preferences: Dict[str, Any] = {}
+        if self.disable_images:
+            preferences["permissions.default.image"] = 2
+        if self.disable_fonts:
+            preferences["browser.display.use_document_fonts"] = 0
+            preferences["gfx.downloadable_fonts.enabled"] = False
+        if self.disable_media:
+            preferences["media.autoplay.default"] = 5
+        if self.disable_animations:
+            preferences["general.smoothScroll"] = False
+            preferences["ui.prefersReducedMotion"] = 1
+            preferences["toolkit.cosmeticAnimations.enabled"] = False
+        return preferences
+
+    def options(self) -> webdriver.FirefoxOptions:
+        """Return the Firefox options the profile launches with."""
+        options = webdriver.FirefoxOptions()
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless:
+            options.add_argument("-headless")
+        if self.window_size:
+            options.add_argument(f"--width={self.window_size[0]}")
+            options.add_argument(f"--height={self.window_size[1]}")
+        if self.profile:
+            # Copied by Selenium, so parallel workers can share the same directory.
+            options.profile = webdriver.FirefoxProfile(self.profile)
+        for name, value in self.preferences().items():
+            options.set_preference(name, value)
+        return options
+
+    def launch(self) -> WebDriver:
+        """Launch Firefox with the profile."""
+        driver = webdriver.Firefox(options=self.options())
+        if self.transport == "thin":
+            driver.command_executor = ThinConnection(driver.service.service_url)
+        elif self.transport != "selenium":
+            driver.quit()
+            raise ValueError(f"Unknown transport: {self.transport}")
+        return driver
+
+
+class DriverSession:
+    """Lazily launches a WebDriver the first time it is needed.
+
+    The session also remembers where its browser is, so navigation that would
+    not change anything can be skipped.
+
+    Attributes:
+        page -- the page the browser is on, or None if unknown
+        layout -- the layout selected on the page, or None for its default one
+        dirty -- whether the page was changed since it was loaded
+        _factory -- callable returning a new WebDriver instance
+        _driver -- the running WebDriver, or None if the browser has not been started
+    """
+
+    def __init__(self, factory: Callable[[], WebDriver] = LaunchProfile().launch):
+        """
+        Arguments:
+            factory -- callable returning a new WebDriver instance
+        """
+        self._factory = factory
+        self._driver: Optional[WebDriver] = None
+        self.page: Optional[str] = None
+        self.layout: Optional[str] = None
+        self.dirty = False
+
+    @property
+    def driver(self) -> WebDriver:
+        """Return the session's WebDriver, launching the browser on first use."""
+        if self._driver is None:
+            self._driver = self._factory()
+        return self._driver
+
+    @property
+    def started(self) -> bool:
+        """Return whether the browser has been launched."""
+        return self._driver is not None
+
+    def at(self, page: str, layout: Optional[str] = None) -> bool:
+        """Return whether the browser shows a page and layout without changes.
+
+        Arguments:
+            page -- name of the page
+            layout -- name of the layout, or None for the page's default one
+        """
+        return (
+            not self.dirty
+            and self.page is not None
+            and (self.page, self.layout) == (page, layout)
+        )
+
+    def arrived(self, page: Optional[str], layout: Optional[str] = None) -> None:
+        """Record that the browser freshly loaded a page and layout.
+
+        Arguments:
+            page -- name of the page, or None if it is unknown
+            layout -- name of the layout, or None for the page's default one
+        """
+        self.page = page
+        self.layout = layout
+        self.dirty = False
+
+    def quit(self) -> None:
+        """Close the browser if it was launched."""
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+        self.arrived(None)
+
 
-DRIVER = webdriver.Firefox()
+SESSION = DriverSession()
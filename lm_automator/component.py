@@ -1,22 +1,36 @@
+from typing import Any, Dict, Optional, Tuple
+
 from lm_automator.widget import Widget
 from lm_automator.inputs import Button
-from lm_automator.element_handler import wait_after_for_timeout
+from lm_automator.element_handler import (
+    ElementHandler,
+    wait_after_until_ready,
+    with_widget_waits,
+)
+from lm_automator.readiness import COMPONENT_TOGGLED
 
 
 class Component(Widget):
 
+    __slots__ = ("position", "inputs", "_edit", "_delete", "_confirm")
+
     def __init__(
         self,
         locator: str,
-        position: int
+        position: int,
+        inputs: Optional[Dict[str, Tuple[str, str]]] = None,
+        timeout: Optional[float] = None,
+        poll: Optional[float] = None,
     ):
-        super().__init__(locator)
+        super().__init__(locator, timeout, poll)
         self.position = position
-        self._edit = Button(self.locator + " .fa-pencil")
-        self._delete = Button(self.locator + " .fa-times")
-        self._confirm = Button(".swal2-confirm.swal2-styled")
+        self.inputs = inputs or {}
+        self._edit = Button(self.locator + " .fa-pencil", timeout, poll)
+        self._delete = Button(self.locator + " .fa-times", timeout, poll)
+        self._confirm = Button(".swal2-confirm.swal2-styled", timeout, poll)
 
-    @wait_after_for_timeout(reason="Ensure menu is fully expanded.")
+    @with_widget_waits
+    @wait_after_until_ready(COMPONENT_TOGGLED)
     def edit(self) -> None:
         """Edit the component.
 
@@ -25,6 +39,7 @@ class Component(Widget):
 		"""
         self._edit.click()
 
+    @with_widget_waits
     def delete(self) -> None:
         """Delete the component.
 
@@ -32,7 +47,37 @@ class Component(Widget):
 		1. Click the delete button of the component you wish to delete.
 		"""
         self._delete.click()
-        self._confirm.click()
+        self._confirm.click(changes_layout=True)
+
+    @with_widget_waits
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the values of all of the component's inputs, read in a single round trip.
+
+        Values are in the form flow actions write them: the text of text fields,
+        whether checkboxes are checked and the selected option's value of selects.
+        Inputs that cannot be found are None and buttons are left out.
+        """
+        return ElementHandler.read_values(self.fields())
+
+    def fields(self) -> Dict[str, Tuple[str, str]]:
+        """Return the (locator, input type) of each input with a value, by name."""
+        return {
+            name: (f"{self.locator} {locator}", type_)
+            for name, (type_, locator) in self.inputs.items()
+            if type_ != "button"
+        }
+
+    @property
+    def edit_button(self) -> Button:
+        return self._edit
+
+    @property
+    def delete_button(self) -> Button:
+        return self._delete
+
+    @property
+    def confirm_button(self) -> Button:
+        return self._confirm
 
     @property
     def locator(self) -> str:
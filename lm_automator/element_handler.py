@@ -1,6 +1,18 @@
 """Contains the ElementHandler class."""
 
-from typing import List, Generator, Any
+import re
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from contextlib import contextmanager
 from functools import wraps
 
@@ -8,31 +20,423 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import (
+    TimeoutException,
+    JavascriptException,
+    StaleElementReferenceException,
+)
 from selenium.webdriver.common.action_chains import ActionChains
 
-from lm_automator.common import DRIVER
+from lm_automator.common import SESSION, DriverSession
+from lm_automator.readiness import ReadinessCondition, IDLE_SCRIPT, TRACKER_SCRIPT
+
+
+# Script timeout of a new WebDriver session, in seconds.
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# Locators that select an element by its position. When elements are added,
+# removed or moved, a cached element can stay attached yet no longer be at
+# that position, so these are never cached.
+POSITIONAL = re.compile(r":(nth-|first-|last-|only-)")
+
+
+# Runs (locator, action, value) operations in order, waiting for each element
+# like the single element methods do, and stops at the first failure.
+BATCH_SCRIPT = """
+var operations = arguments[0], timeout = arguments[1] * 1000,
+    done = arguments[arguments.length - 1], results = [];
+
+function interactable(element) {
+    return element.getClientRects().length > 0 && !element.disabled;
+}
+
+function fire(element, type) {
+    element.dispatchEvent(new Event(type, {bubbles: true}));
+}
+
+function press(element, type) {
+    element.dispatchEvent(new KeyboardEvent(type, {bubbles: true}));
+}
+
+// Set the value through the prototype's setter, the one frameworks such as
+// React watch, and fire the key events typing into the input would.
+function type(element, value) {
+    var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), "value");
+    element.focus();
+    press(element, "keydown");
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(element, value);
+    } else {
+        element.value = value;
+    }
+    fire(element, "input");
+    press(element, "keyup");
+    fire(element, "change");
+}
+
+function apply(element, action, value) {
+    if (action === "click") {
+        element.click();
+    } else if (action === "set") {
+        type(element, String(value));
+    } else if (action === "select") {
+        var option = Array.prototype.find.call(element.options, function (option) {
+            return option.value === value;
+        });
+        if (!option) throw new Error("Cannot locate option with value: " + value);
+        element.value = value;
+        fire(element, "input");
+        fire(element, "change");
+    } else if (action === "check") {
+        if (element.checked !== value) element.click();
+    } else {
+        throw new Error("Unknown action: " + action);
+    }
+}
+
+// Each result also has the seconds its operation waited for the element.
+function run(index, started) {
+    if (index === operations.length) return done(results);
+    var operation = operations[index], element = document.querySelector(operation[0]);
+    var ready = element && (operation[1] === "set" || operation[1] === "select"
+        || interactable(element));
+    var waited = (Date.now() - started) / 1000;
+    if (!ready) {
+        if (Date.now() < started + timeout) {
+            return setTimeout(function () { run(index, started); }, 50);
+        }
+        results.push([false, "Timed out waiting for " + operation[0], waited]);
+        return done(results);
+    }
+    try {
+        element.scrollIntoView({block: "center"});
+        apply(element, operation[1], operation[2]);
+    } catch (error) {
+        results.push([false, String(error), waited]);
+        return done(results);
+    }
+    results.push([true, null, waited]);
+    run(index + 1, Date.now());
+}
+
+run(0, Date.now());
+"""
+
+
+# Resolves with the element(s) or true the moment the elements matching the
+# locator meet the condition, or with null once the timeout runs out. A
+# MutationObserver rechecks on every DOM change, and a slow interval catches
+# what it cannot see, such as CSS transitions ending.
+WAIT_SCRIPT = """
+var locator = arguments[0], condition = arguments[1], count = arguments[2],
+    timeout = arguments[3] * 1000, done = arguments[arguments.length - 1];
+
+function visible(element) {
+    if (element.getClientRects().length === 0) return false;
+    var style = window.getComputedStyle(element);
+    return style.visibility !== "hidden" && style.opacity !== "0";
+}
+
+function check() {
+    var elements = document.querySelectorAll(locator), first = elements[0];
+    switch (condition) {
+        case "present": return first || null;
+        case "all": return elements.length ? Array.prototype.slice.call(elements) : null;
+        case "visible": return first && visible(first) ? first : null;
+        case "clickable": return first && visible(first) && !first.disabled ? first : null;
+        case "hidden": return !first || !visible(first) ? true : null;
+        case "at-least": return elements.length >= count ? true : null;
+        case "exactly": return elements.length === count ? true : null;
+    }
+    throw new Error("Unknown condition: " + condition);
+}
+
+var result = check();
+if (result) return done(result);
+
+var observer, interval, timer;
+function finish(result) {
+    observer.disconnect();
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+function recheck() {
+    var result = check();
+    if (result) finish(result);
+}
+observer = new MutationObserver(recheck);
+observer.observe(document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+interval = setInterval(recheck, 100);
+timer = setTimeout(function () { finish(null); }, timeout);
+"""
+
+
+# Returns the value of each (locator, input type) field by name.
+READ_VALUES_SCRIPT = """
+var fields = arguments[0], values = {};
+Object.keys(fields).forEach(function (name) {
+    var element = document.querySelector(fields[name][0]), type = fields[name][1];
+    if (!element) {
+        values[name] = null;
+    } else if (type === "checkbox") {
+        values[name] = element.checked;
+    } else {
+        values[name] = element.value;
+    }
+});
+return values;
+"""
+
+
+class BudgetExceeded(Exception):
+    """Raised when a test has used up its time budget before a wait could start."""
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one operation of a batch.
+
+    Attributes:
+        locator -- CSS selector the operation was applied to
+        action -- "click", "set", "select" or "check"
+        ok -- whether the operation was applied
+        error -- why the operation failed, "skipped" if an earlier one failed
+        waited -- seconds the operation waited for its element in the browser
+    """
+
+    locator: str
+    action: str
+    ok: bool
+    error: Optional[str] = None
+    waited: float = 0.0
 
 
 class ElementHandler:
     """Contains various methods for retrieving and interacting with HTML elements on a page.
 
     Attributes:
-        _wait -- a class level WebDriverWait object for use with expected conditions
+        session -- the DriverSession whose browser the handler drives
+        timeout -- seconds to wait for expected conditions before timing out
+        poll -- seconds between checks of an expected condition
+        wait_mode -- "observer" to wait with a MutationObserver injected into the page,
+            "poll" to check with WebDriverWait every poll seconds
+        deadline -- time.monotonic() at which the current test's budget runs out, if any
+        _elements -- elements already looked up on the current page, by locator
+        _cache_stats -- number of element cache hits, misses and stale elements
     """
 
-    _wait = WebDriverWait(DRIVER, 5)
+    session = SESSION
+    timeout = 5
+    poll = 0.5
+    wait_mode = "observer"
+    deadline: Optional[float] = None
+    _elements: Dict[str, WebElement] = {}
+    # [id, URL] of the document at the last navigation or readiness wait.
+    _location: Optional[List[str]] = None
+    _cache_stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    @classmethod
+    def use_session(cls, session: DriverSession) -> None:
+        """Drive the given session's browser from now on.
+
+        Arguments:
+            session -- the DriverSession to drive
+        """
+        cls.session = session
+        cls.invalidate_cache()
+
+    @classmethod
+    def navigate(cls, url: str) -> None:
+        """Load a URL in the browser and forget the elements of the previous page.
+
+        Arguments:
+            url -- the URL to load
+        """
+        cls.session.driver.get(url)
+        cls.session.arrived(None)
+        cls.invalidate_cache()
+        cls._track()
+
+    @classmethod
+    def refresh(cls) -> None:
+        """Reload the current page and forget its elements."""
+        cls.session.driver.refresh()
+        cls.session.arrived(None)
+        cls.invalidate_cache()
+        cls._track()
+
+    @classmethod
+    def _track(cls) -> None:
+        """Count the requests of a freshly loaded document from its first action on."""
+        cls._location = cls.session.driver.execute_script(TRACKER_SCRIPT)
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Forget every cached element.
+
+        Call after navigating, switching frames or any action that re-renders the page.
+        """
+        cls._elements.clear()
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, int]:
+        """Return the number of element cache hits, misses and stale elements."""
+        return dict(cls._cache_stats)
+
+    @classmethod
+    def with_element(cls, locator: str, function: Callable[[WebElement], Any]) -> Any:
+        """Call a function with an element and return its result.
+
+        If the element turns out to be stale it is looked up again and the function
+        is called once more, so callers never see a stale cached element.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+            function -- called with the element
+        """
+        try:
+            return function(cls.get_element(locator))
+        except StaleElementReferenceException:
+            cls._elements.pop(locator, None)
+            cls._cache_stats["stale"] += 1
+            return function(cls.get_element(locator))
+
+    @classmethod
+    @contextmanager
+    def waiting(
+        cls, timeout: Optional[float] = None, poll: Optional[float] = None
+    ) -> Generator:
+        """Use a different timeout and poll frequency for the waits inside the context.
+
+        Arguments:
+            timeout -- seconds to wait for expected conditions, None to keep the current one
+            poll -- seconds between checks of a condition, None to keep the current one
+        """
+        previous = cls.timeout, cls.poll
+        if timeout is not None:
+            cls.timeout = timeout
+        if poll is not None:
+            cls.poll = poll
+        try:
+            yield
+        finally:
+            cls.timeout, cls.poll = previous
+
+    @classmethod
+    @contextmanager
+    def budget(cls, seconds: Optional[float]) -> Generator:
+        """Cut every wait inside the context short so it all takes at most the given time.
+
+        Once the budget is used up the next wait raises BudgetExceeded instead of
+        letting a stuck test run into one timeout after another.
+
+        Arguments:
+            seconds -- the time budget, or None for no budget
+        """
+        previous = cls.deadline
+        if seconds is not None:
+            cls.deadline = time.monotonic() + seconds
+        try:
+            yield
+        finally:
+            cls.deadline = previous
+
+    @classmethod
+    def _timeout(cls) -> float:
+        """Return the timeout for the next wait, cut short by the budget."""
+        if cls.deadline is None:
+            return cls.timeout
+        remaining = cls.deadline - time.monotonic()
+        if remaining <= 0:
+            raise BudgetExceeded("The test used up its time budget.")
+        return min(cls.timeout, remaining)
+
+    @classmethod
+    def _wait(cls) -> WebDriverWait:
+        """Return a WebDriverWait bound to the current session for use with expected conditions."""
+        return WebDriverWait(cls.session.driver, cls._timeout(), poll_frequency=cls.poll)
+
+    @classmethod
+    @contextmanager
+    def _script_timeout(cls, seconds: float) -> Generator:
+        """Let async scripts run for the given seconds inside the context.
+
+        The scripts bound their own waits, so the session's timeout is only
+        raised for waits longer than the default, and restored afterwards.
+        Setting it is a round trip, so it is left alone otherwise.
+        """
+        if seconds <= DEFAULT_SCRIPT_TIMEOUT:
+            yield
+            return
+        driver = cls.session.driver
+        driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+
+    @classmethod
+    def _until(
+        cls, locator: str, condition: str, poll: Callable[[], Any], count: int = 0
+    ) -> Any:
+        """Wait for a condition on the elements matching a locator and return the result.
+
+        In observer mode the page resolves the wait the moment the condition
+        holds, in a single round trip. poll is the WebDriverWait based wait used
+        in poll mode and whenever the script cannot run.
+
+        Arguments:
+            locator -- CSS selector for locating the elements
+            condition -- "present", "all", "visible", "clickable", "hidden",
+                "at-least" or "exactly", see WAIT_SCRIPT
+            poll -- waits for the same condition by polling
+            count -- the number of elements for "at-least" and "exactly"
+        """
+        if cls.wait_mode != "observer":
+            return poll()
+        timeout = cls._timeout()
+        try:
+            with cls._script_timeout(timeout + 1):
+                result = cls.session.driver.execute_async_script(
+                    WAIT_SCRIPT, locator, condition, count, timeout
+                )
+        except JavascriptException:
+            # E.g. a navigation replaced the document, or the selector is invalid.
+            return poll()
+        if result is None:
+            raise TimeoutException(f"Timed out waiting for {locator} to be {condition}.")
+        return result
 
     @classmethod
     def get_element(cls, locator: str) -> WebElement:
         """Pause until element is present then return it.
 
+        Elements are cached by locator until the cache is invalidated, so repeated
+        lookups of the same element do not go to the browser. Positional locators
+        are looked up every time, see POSITIONAL.
+
         Arguments:
             locator -- CSS selector for locating the element
         """
-        return cls._wait.until(
-            expected_conditions.presence_of_element_located((By.CSS_SELECTOR, locator))
+        element = cls._elements.get(locator)
+        if element is not None:
+            cls._cache_stats["hits"] += 1
+            return element
+        cls._cache_stats["misses"] += 1
+        element = cls._until(
+            locator,
+            "present",
+            lambda: cls._wait().until(
+                expected_conditions.presence_of_element_located(
+                    (By.CSS_SELECTOR, locator)
+                )
+            ),
         )
+        if not POSITIONAL.search(locator):
+            cls._elements[locator] = element
+        return element
 
     @classmethod
     def get_all_elements(cls, locator: str) -> List[WebElement]:
@@ -41,22 +445,37 @@ class ElementHandler:
         Arguments:
             locator -- CSS selector for locating the elements
         """
-        return cls._wait.until(
-            expected_conditions.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, locator)
-            )
+        return cls._until(
+            locator,
+            "all",
+            lambda: cls._wait().until(
+                expected_conditions.presence_of_all_elements_located(
+                    (By.CSS_SELECTOR, locator)
+                )
+            ),
         )
 
     @classmethod
-    def click_element(cls, locator: str) -> None:
+    def click_element(cls, locator: str, *, changes_layout: bool = False) -> None:
         """Pause until element is clickable then click it.
 
         Arguments:
             locator -- CSS selector for locating the element
+            changes_layout -- whether the click re-renders the page, invalidating the cache
         """
-        cls._wait.until(
-            expected_conditions.element_to_be_clickable((By.CSS_SELECTOR, locator))
+        cls.session.dirty = True
+        cls._until(
+            locator,
+            "clickable",
+            lambda: cls.with_element(
+                locator,
+                lambda element: cls._wait().until(
+                    expected_conditions.element_to_be_clickable(element)
+                ),
+            ),
         ).click()
+        if changes_layout:
+            cls.invalidate_cache()
 
     @classmethod
     def wait_for_at_least_number_of_elements_to_be_present(
@@ -71,9 +490,14 @@ class ElementHandler:
         if number_of_elements <= 0:
             raise ValueError("Please provide a whole number greater than 0.")
 
-        cls._wait.until(
-            lambda driver: len(DRIVER.find_elements(By.CSS_SELECTOR, locator))
-            >= number_of_elements
+        cls._until(
+            locator,
+            "at-least",
+            lambda: cls._wait().until(
+                lambda driver: len(driver.find_elements(By.CSS_SELECTOR, locator))
+                >= number_of_elements
+            ),
+            number_of_elements,
         )
 
     @classmethod
@@ -89,9 +513,14 @@ class ElementHandler:
         if number_of_elements <= 0:
             raise ValueError("Please provide a whole number greater than 0.")
 
-        cls._wait.until(
-            lambda driver: len(DRIVER.find_elements(By.CSS_SELECTOR, locator))
-            == number_of_elements
+        cls._until(
+            locator,
+            "exactly",
+            lambda: cls._wait().until(
+                lambda driver: len(driver.find_elements(By.CSS_SELECTOR, locator))
+                == number_of_elements
+            ),
+            number_of_elements,
         )
 
     @classmethod
@@ -106,6 +535,52 @@ class ElementHandler:
         except TimeoutException:
             pass
 
+    @classmethod
+    def wait_until_ready(
+        cls, condition: ReadinessCondition, target: Optional[str] = None
+    ) -> bool:
+        """Pause until the application is idle, at most for the predefined timeout duration.
+
+        Return True once the page is ready and raise TimeoutException if it did not
+        become ready in time. For a condition with navigation the page first has
+        to show another document or URL than at the last navigation or wait.
+
+        Arguments:
+            condition -- the readiness condition describing what idle means
+            target -- CSS selector of the element whose transitions must finish
+        """
+        # Readiness waits follow actions that change the page.
+        cls.invalidate_cache()
+        driver = cls.session.driver
+        timeout = cls._timeout()
+        deadline = time.monotonic() + timeout
+        previous = cls._location if condition.navigation else None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                with cls._script_timeout(remaining + 1):
+                    location = driver.execute_async_script(
+                        IDLE_SCRIPT,
+                        target,
+                        condition.quiet_period,
+                        condition.network_idle,
+                        condition.transitions,
+                        previous,
+                        remaining,
+                    )
+            except JavascriptException:
+                # The document was replaced by a navigation, wait on the new one.
+                continue
+            if location is None:
+                break
+            cls._location = location
+            return True
+        raise TimeoutException(
+            f"The page was not {condition.name} within {timeout:.1f} seconds."
+        )
+
     @classmethod
     def wait_for_element_to_disappear(cls, locator: str, *, reason: str) -> None:
         """Pause for the predefined timeout duration.
@@ -113,10 +588,14 @@ class ElementHandler:
         Arguments:
             reason -- explanation as to why the wait is being used (generic waits are bad practice)
         """
-        cls._wait.until(
-            expected_conditions.invisibility_of_element_located(
-                (By.CSS_SELECTOR, locator)
-            )
+        cls._until(
+            locator,
+            "hidden",
+            lambda: cls._wait().until(
+                expected_conditions.invisibility_of_element_located(
+                    (By.CSS_SELECTOR, locator)
+                )
+            ),
         )
 
     @classmethod
@@ -127,9 +606,12 @@ class ElementHandler:
             locator -- CSS selector for locating the element
             keys -- the key input to send to the element
         """
-        element = cls.get_element(locator)
-        element.clear()
-        element.send_keys(keys)
+        def send_keys(element: WebElement) -> None:
+            element.clear()
+            element.send_keys(keys)
+
+        cls.session.dirty = True
+        cls.with_element(locator, send_keys)
 
     @classmethod
     def get_element_as_select(cls, locator: str) -> Select:
@@ -138,7 +620,7 @@ class ElementHandler:
         Arguments:
             locator -- CSS selector for locating the element
         """
-        return Select(cls.get_element(locator))
+        return cls.with_element(locator, Select)
 
     @classmethod
     def get_all_elements_as_selects(cls, locator: str) -> List[Select]:
@@ -157,7 +639,8 @@ class ElementHandler:
             locator -- CSS selector for locating the element
             value -- the option you wish to select
         """
-        Select(cls.get_element(locator)).select_by_value(value)
+        cls.session.dirty = True
+        cls.with_element(locator, lambda element: Select(element).select_by_value(value))
 
     @classmethod
     def element_is_present(cls, locator: str) -> bool:
@@ -167,7 +650,8 @@ class ElementHandler:
             locator -- CSS selector for locating the element
         """
         try:
-            cls.get_element(locator)
+            # A cached element may have been removed since, so check it is still attached.
+            cls.with_element(locator, lambda element: element.is_enabled())
         except TimeoutException:
             return False
         else:
@@ -181,7 +665,16 @@ class ElementHandler:
             locator -- CSS selector for locating the element
         """
         try:
-            cls._wait.until(expected_conditions.visibility_of(cls.get_element(locator)))
+            cls._until(
+                locator,
+                "visible",
+                lambda: cls.with_element(
+                    locator,
+                    lambda element: cls._wait().until(
+                        expected_conditions.visibility_of(element)
+                    ),
+                ),
+            )
         except TimeoutException:
             return False
         else:
@@ -197,9 +690,19 @@ class ElementHandler:
             source_element_locator -- CSS selector for locating the first element
             target_element_locator -- CSS selector for locating the second element
         """
-        source_element = cls.get_element(source_element_locator)
-        target_element = cls.get_element(target_element_locator)
-        ActionChains(DRIVER).drag_and_drop(source_element, target_element).perform()
+        def drag(source_element: WebElement, target_element: WebElement) -> None:
+            ActionChains(cls.session.driver).drag_and_drop(
+                source_element, target_element
+            ).perform()
+
+        cls.session.dirty = True
+        cls.with_element(
+            source_element_locator,
+            lambda source_element: cls.with_element(
+                target_element_locator,
+                lambda target_element: drag(source_element, target_element),
+            ),
+        )
 
     @classmethod
     def drag_element_by_offset(
@@ -211,10 +714,106 @@ class ElementHandler:
             x_offset -- distance to drag element in x direction
             y_offset -- distance to drag element in y direction
         """
-        element = cls.get_element(element_locator)
-        ActionChains(DRIVER).drag_and_drop_by_offset(
-            element, x_offset, y_offset
-        ).perform()
+        cls.session.dirty = True
+        cls.with_element(
+            element_locator,
+            lambda element: ActionChains(cls.session.driver)
+            .drag_and_drop_by_offset(element, x_offset, y_offset)
+            .perform(),
+        )
+
+    @classmethod
+    def perform(cls, locator: str, action: str, value: Any = None) -> None:
+        """Apply one action to an element the same way the input classes do.
+
+        Arguments:
+            locator -- CSS selector for locating the element
+            action -- "click", "set", "select" or "check"
+            value -- the text to set, option to select or checkbox state to check
+        """
+        if action == "click":
+            cls.click_element(locator)
+        elif action == "set":
+            cls.send_keys_to_element(locator, value)
+        elif action == "select":
+            cls.select_value_from_element(locator, value)
+        elif action == "check":
+            if cls.with_element(locator, lambda element: element.is_selected()) != value:
+                cls.click_element(locator)
+        else:
+            raise ValueError(f"Unknown action: {action}")
+
+    @classmethod
+    def run_batch(
+        cls, operations: Sequence[Tuple[str, str, Any]]
+    ) -> List[BatchResult]:
+        """Apply a list of actions in order in a single round trip to the browser.
+
+        Clicks and checks wait for their element to be visible and enabled, sets
+        fire the key, input and change events typing would, and selects fire
+        input and change events. The batch stops at the first
+        operation that fails and the remaining ones are reported as skipped.
+
+        Arguments:
+            operations -- (locator, action, value) tuples, see perform
+        """
+        if not operations:
+            return []
+        driver = cls.session.driver
+        cls.session.dirty = True
+        timeout = cls._timeout()
+        with cls._script_timeout(timeout * len(operations) + 1):
+            outcomes = driver.execute_async_script(
+                BATCH_SCRIPT, [list(operation) for operation in operations], timeout
+            )
+        outcomes += [[False, "skipped", 0.0]] * (len(operations) - len(outcomes))
+        return [
+            BatchResult(locator, action, *outcome)
+            for (locator, action, _), outcome in zip(operations, outcomes)
+        ]
+
+    @classmethod
+    def perform_all(
+        cls, operations: Sequence[Tuple[str, str, Any]], *, changes_layout: bool = False
+    ) -> None:
+        """Apply a list of actions in one round trip, redoing any that fail one at a time.
+
+        Falling back to perform from the first failed operation on gives the
+        usual waits and exceptions whenever the batch could not be applied. The
+        failed operation is only given the part of its timeout the batch left.
+
+        Arguments:
+            operations -- (locator, action, value) tuples, see perform
+            changes_layout -- whether the actions re-render the page, invalidating the cache
+        """
+        results = cls.run_batch(operations)
+        applied = 0
+        for result in results:
+            if not result.ok:
+                break
+            applied += 1
+        if applied < len(operations):
+            with cls.waiting(timeout=max(cls.timeout - results[applied].waited, 0)):
+                cls.perform(*operations[applied])
+        for operation in operations[applied + 1 :]:
+            cls.perform(*operation)
+        if changes_layout:
+            cls.invalidate_cache()
+
+    @classmethod
+    def read_values(cls, fields: Dict[str, Tuple[str, str]]) -> Dict[str, Any]:
+        """Return the values of many inputs read in a single round trip.
+
+        Arguments:
+            fields -- (locator, input type) of each input by name, where the type is
+                "text", "checkbox" or "select"; checkboxes read as booleans, the
+                other types as their value
+        """
+        if not fields:
+            return {}
+        return cls.session.driver.execute_script(
+            READ_VALUES_SCRIPT, {name: list(field) for name, field in fields.items()}
+        )
 
     @classmethod
     @contextmanager
@@ -224,13 +823,15 @@ class ElementHandler:
         Arguments:
             locator -- CSS selector for locating the element
         """
-        cls._wait.until(
+        cls._wait().until(
             expected_conditions.frame_to_be_available_and_switch_to_it(
                 (By.CSS_SELECTOR, locator)
             )
         )
+        cls.invalidate_cache()
         yield
-        DRIVER.switch_to.default_content()
+        cls.session.driver.switch_to.default_content()
+        cls.invalidate_cache()
 
 
 def wait_after_for_timeout(*, reason: str):
@@ -245,6 +846,31 @@ def wait_after_for_timeout(*, reason: str):
     return concrete_decorator
 
 
+def wait_after_until_ready(condition: ReadinessCondition):
+    def concrete_decorator(function):
+        @wraps(function)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            function(self, *args, **kwargs)
+            ElementHandler.wait_until_ready(condition, self.locator)
+
+        return wrapper
+
+    return concrete_decorator
+
+
+def with_widget_waits(function):
+    """Run a widget method with the timeout and poll frequency the widget was given."""
+
+    @wraps(function)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        if self.timeout is None and self.poll is None:
+            return function(self, *args, **kwargs)
+        with ElementHandler.waiting(self.timeout, self.poll):
+            return function(self, *args, **kwargs)
+
+    return wrapper
+
+
 def wait_before_for_timeout(*, reason: str):
     def concrete_decorator(function):
         @wraps(function)
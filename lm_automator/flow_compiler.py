@@ -0,0 +1,832 @@
+"""Contains the compiler that turns flow and model files into a validated execution plan."""
+
+import hashlib
+import itertools
+import json
+import os
+import pathlib
+import pickle
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import yaml
+
+from lm_automator.common import CACHE_DIR
+from lm_automator.component import Component
+from lm_automator.element_handler import ElementHandler
+from lm_automator.inputs import Input
+from lm_automator.layout_manager_factory import LayoutManagerFactory
+from lm_automator.page import Page, Route
+from lm_automator.readiness import COMPONENT_TOGGLED, MENU_EXPANDED
+from lm_automator.region import Region
+
+if TYPE_CHECKING:
+    from lm_automator.async_engine import AsyncElementHandler
+    from lm_automator.simulator import PageState
+
+# Bump whenever the step classes change so stale cached plans are not loaded.
+PLAN_VERSION = 8
+
+# libyaml's loader is many times faster, fall back to the pure Python one without it.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# The input type each input action applies to.
+INPUT_ACTIONS = {"click": "button", "select": "select", "check": "checkbox", "set": "text"}
+
+
+class FlowError(Exception):
+    """Raised when a flow cannot be compiled against its model."""
+
+
+class StateMismatch(AssertionError):
+    """Raised when a component's inputs do not hold the values a flow expects."""
+
+
+class Visit(NamedTuple):
+    """Open a page by its route, or through the sidebar, unless it is already open."""
+
+    page: str
+    layout: Optional[str] = None
+    route: Route = Route()
+
+    def execute(self) -> None:
+        Page.visit(self.page, self.layout, self.route)
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        await handler.visit(self.page, self.layout, self.route)
+
+    def simulate(self, state: "PageState") -> None:
+        state.visit(self.page)
+
+
+class SelectLayout(NamedTuple):
+    """Switch the current page to a layout."""
+
+    layout: str
+
+    def execute(self) -> None:
+        Page.select_layout(self.layout)
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        await handler.select_layout(self.layout)
+
+    def simulate(self, state: "PageState") -> None:
+        state.select_layout(self.layout)
+
+
+class AddComponents(NamedTuple):
+    """Add components to a region from its menu."""
+
+    region_name: str
+    region: Region
+    components: List[str]
+
+    def execute(self) -> None:
+        self.region.add_components(self.components)
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        with handler.waiting(self.region.timeout, self.region.poll):
+            await handler.click(self.region.menu.locator)
+            await handler.wait_until_ready(MENU_EXPANDED, self.region.locator)
+            await handler.perform_all(self.region.menu_operations(self.components))
+            await handler.click(self.region.menu.locator)
+            await handler.wait_until_ready(MENU_EXPANDED, self.region.locator)
+
+    def simulate(self, state: "PageState") -> None:
+        state.add(self.region_name, self.components)
+
+
+class InputAction(NamedTuple):
+    """Click, select, check or set one input of a component."""
+
+    input_name: str
+    input: Input
+    action: str
+    value: Any = None
+
+    @property
+    def operation(self) -> Tuple[str, str, Any]:
+        """The action as an ElementHandler batch operation."""
+        return (self.input.locator, self.action, self.value)
+
+
+class EditComponent(NamedTuple):
+    """Open a component, apply input actions to it and close it again."""
+
+    region_name: str
+    index: int
+    component_name: str
+    component: Component
+    actions: List[InputAction]
+
+    def batches(self) -> Iterator[Tuple[Optional[float], Optional[float], List]]:
+        """Yield the actions as batches of operations on inputs that wait alike.
+
+        Each batch comes with the timeout and poll of its inputs, None where the
+        component's apply.
+        """
+        for (timeout, poll), actions in itertools.groupby(
+            self.actions, lambda action: (action.input.timeout, action.input.poll)
+        ):
+            yield timeout, poll, [action.operation for action in actions]
+
+    def execute(self) -> None:
+        self.component.edit()
+        with ElementHandler.waiting(self.component.timeout, self.component.poll):
+            for timeout, poll, operations in self.batches():
+                with ElementHandler.waiting(timeout, poll):
+                    ElementHandler.perform_all(operations)
+        self.component.edit()
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        component = self.component
+        with handler.waiting(component.timeout, component.poll):
+            await handler.click(component.edit_button.locator)
+            await handler.wait_until_ready(COMPONENT_TOGGLED, component.locator)
+            for timeout, poll, operations in self.batches():
+                with handler.waiting(timeout, poll):
+                    await handler.perform_all(operations)
+            await handler.click(component.edit_button.locator)
+            await handler.wait_until_ready(COMPONENT_TOGGLED, component.locator)
+
+    def simulate(self, state: "PageState") -> None:
+        values = state.component(self.region_name, self.index, self.component_name).values
+        for action in self.actions:
+            if action.action != "click":
+                # Inputs other than checkboxes read back as strings.
+                values[action.input_name] = (
+                    action.value if isinstance(action.value, bool) else str(action.value)
+                )
+
+
+class RemoveComponent(NamedTuple):
+    """Delete the component at a position of a region."""
+
+    region_name: str
+    index: int
+    component: Component
+
+    def execute(self) -> None:
+        self.component.delete()
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        with handler.waiting(self.component.timeout, self.component.poll):
+            await handler.click(self.component.delete_button.locator)
+            await handler.click(self.component.confirm_button.locator)
+
+    def simulate(self, state: "PageState") -> None:
+        state.remove(self.region_name, self.index)
+
+
+class AssertState(NamedTuple):
+    """Check the values of a component's inputs against a single snapshot."""
+
+    region_name: str
+    index: int
+    component_name: str
+    component: Component
+    expected: Dict[str, Any]
+
+    def execute(self) -> None:
+        self.check(self.component.snapshot())
+
+    async def run(self, handler: "AsyncElementHandler") -> None:
+        self.check(await handler.read_values(self.component.fields()))
+
+    def simulate(self, state: "PageState") -> None:
+        component = state.component(self.region_name, self.index, self.component_name)
+        # Inputs the test never wrote hold whatever the CMS defaults to, assume it matches.
+        self.check({**self.expected, **component.values})
+
+    def check(self, snapshot: Dict[str, Any]) -> None:
+        """Raise StateMismatch unless the snapshot holds every expected value.
+
+        Arguments:
+            snapshot -- the component's input values by name
+        """
+        mismatches = [
+            f"{name}: expected {value!r}, found {snapshot.get(name)!r}"
+            for name, value in self.expected.items()
+            if snapshot.get(name) != value
+        ]
+        if mismatches:
+            raise StateMismatch(
+                f"{self.component_name} {self.index} in {self.region_name}: "
+                + "; ".join(mismatches)
+            )
+
+
+# Each step runs through ElementHandler with execute, on the async engine with
+# run and against a PageState with simulate.
+Step = Union[
+    Visit, SelectLayout, AddComponents, EditComponent, RemoveComponent, AssertState
+]
+
+
+class Savings(NamedTuple):
+    """What optimizing a test's steps saved.
+
+    Attributes:
+        steps -- steps and input actions that no longer run
+        waits -- readiness waits that no longer happen, after opening menus and components
+    """
+
+    steps: int = 0
+    waits: int = 0
+
+    def __add__(self, other: "Savings") -> "Savings":  # type: ignore
+        return Savings(self.steps + other.steps, self.waits + other.waits)
+
+
+def optimize(steps: List[Step]) -> Tuple[List[Step], Savings]:
+    """Return the steps with the redundant work of hand written flows removed.
+
+    Adjacent adds to the same region share one opening of its menu, and
+    consecutive edits of the same component share one opening of the
+    component. Sets, selects and checks writing the value an earlier action of
+    the test left the input holding are dropped, as is an edit left with no
+    actions. A click may change any input of its component and removing a
+    component moves the ones after it, so both forget what the inputs hold.
+
+    Arguments:
+        steps -- the compiled steps of a test
+    """
+    optimized: List[Step] = []
+    savings = Savings()
+    # Values the test wrote to inputs, by (region, index, component, input) name.
+    written: Dict[Tuple[str, int, str, str], Any] = {}
+    for step in steps:
+        previous = optimized[-1] if optimized else None
+        if isinstance(step, (Visit, SelectLayout)):
+            written.clear()
+        elif isinstance(step, RemoveComponent):
+            written = {
+                key: value for key, value in written.items() if key[0] != step.region_name
+            }
+        elif isinstance(step, AddComponents):
+            if (
+                isinstance(previous, AddComponents)
+                and previous.region_name == step.region_name
+            ):
+                optimized[-1] = previous._replace(
+                    components=previous.components + step.components
+                )
+                # The menu is opened and closed once less, each followed by a wait.
+                savings += Savings(1, 2)
+                continue
+        elif isinstance(step, EditComponent):
+            component = (step.region_name, step.index, step.component_name)
+            actions = []
+            for action in step.actions:
+                if action.action == "click":
+                    written = {
+                        key: value
+                        for key, value in written.items()
+                        if key[:3] != component
+                    }
+                    actions.append(action)
+                    continue
+                key = component + (action.input_name,)
+                if key in written and written[key] == action.value:
+                    savings += Savings(1, 0)
+                    continue
+                written[key] = action.value
+                actions.append(action)
+            if step.actions and not actions:
+                # Opening and closing the component is all that is left.
+                savings += Savings(1, 2)
+                continue
+            if (
+                isinstance(previous, EditComponent)
+                and (previous.region_name, previous.index, previous.component_name)
+                == component
+            ):
+                optimized[-1] = previous._replace(actions=previous.actions + actions)
+                savings += Savings(1, 2)
+                continue
+            step = step._replace(actions=actions)
+        optimized.append(step)
+    return optimized, savings
+
+
+class TestPlan(NamedTuple):
+    """The compiled steps of one flow test.
+
+    Attributes:
+        index -- position of the test in the flow file
+        page -- the page the test runs on
+        layout -- the layout the test runs on, if any
+        steps -- the steps to execute, starting with the navigation
+        fingerprint -- hash of the test, its site, budget and model entries, see FlowCompiler
+        budget -- seconds the whole test may take, None for no limit
+        savings -- what optimizing the steps saved, see optimize
+    """
+
+    index: int
+    page: str
+    layout: Optional[str]
+    steps: List[Step]
+    fingerprint: str = ""
+    budget: Optional[float] = None
+    savings: Savings = Savings()
+
+
+class Plan(NamedTuple):
+    """The compiled tests of a flow file."""
+
+    site: str
+    tests: List[TestPlan]
+
+
+class FlowCompiler:
+    """Validates flows against a model and resolves every locator and input class up front."""
+
+    def __init__(self, model_data: Dict, optimize: bool = True):
+        """
+        Arguments:
+            model_data -- the parsed model file
+            optimize -- whether to remove redundant steps, see optimize
+        """
+        self._check_model(model_data)
+        self.model_data = model_data
+        self.optimize = optimize
+        self.factory = LayoutManagerFactory(model_data)
+
+    @staticmethod
+    def _check_model(model_data: Dict) -> None:
+        """Raise a FlowError if the model is missing what the compiler looks up in it."""
+        if not isinstance(model_data, dict):
+            raise FlowError("The model must be a mapping.")
+        regions = model_data.get("regions", {})
+        if not isinstance(regions, dict):
+            raise FlowError("The model's regions must be a mapping.")
+        for region_name, region in regions.items():
+            if not isinstance(region, dict) or "locator" not in region:
+                raise FlowError(f"Region {region_name!r} of the model must have a locator.")
+        components = model_data.get("components")
+        if not isinstance(components, dict) or "locator" not in components:
+            raise FlowError("The model must have a mapping of components with a locator.")
+        for component_name, inputs in components.items():
+            if component_name == "locator":
+                continue
+            if not isinstance(inputs, dict):
+                raise FlowError(f"Component {component_name!r} of the model must be a mapping.")
+            for input_name, definition in inputs.items():
+                if input_name in LayoutManagerFactory.SETTINGS:
+                    continue
+                where = f"Input {input_name!r} of component {component_name!r}"
+                if not isinstance(definition, dict) or "locator" not in definition:
+                    raise FlowError(f"{where} must have a locator.")
+                if definition.get("type") not in LayoutManagerFactory.INPUTS:
+                    raise FlowError(
+                        f"{where} must have a type of "
+                        + ", ".join(LayoutManagerFactory.INPUTS)
+                        + "."
+                    )
+
+    def compile(self, flow_data: Dict) -> Plan:
+        """Return the plan for a parsed flow file.
+
+        Arguments:
+            flow_data -- the parsed flow file
+        """
+        if not isinstance(flow_data, dict) or "site" not in flow_data:
+            raise FlowError("The flow must be a mapping with a site.")
+        if not isinstance(flow_data.get("tests"), list):
+            raise FlowError("The flow must have a list of tests.")
+        keys = list(flow_data)
+        if keys[-1] != "tests":
+            # A streamed flow is run before what follows its tests is read.
+            raise FlowError(f"{keys[-1]!r} must come before the tests.")
+        return Plan(
+            flow_data["site"],
+            [
+                self.compile_test(
+                    index, test, flow_data["site"], flow_data.get("budget")
+                )
+                for index, test in enumerate(flow_data["tests"])
+            ],
+        )
+
+    def compile_test(
+        self, index: int, test: Dict, site: str, budget: Optional[float] = None
+    ) -> TestPlan:
+        """Return the plan for one test of a flow.
+
+        Arguments:
+            index -- position of the test in the flow file
+            test -- the test as defined in the flow file
+            site -- the site of the flow
+            budget -- seconds the test may take unless it sets a budget of its own
+        """
+        where = f"tests[{index}]"
+        page = self._require(test, "page", where)
+        budget = test.get("budget", budget)
+        if budget is not None and (
+            not isinstance(budget, (int, float)) or isinstance(budget, bool) or budget <= 0
+        ):
+            raise FlowError(f"{where}: budget must be a number of seconds greater than 0.")
+
+        self.factory.used_entries = {}
+        steps: List[Step] = [
+            Visit(page, test.get("layout"), self._route(page, f"{where}.page"))
+        ]
+        if test.get("layout"):
+            steps.append(SelectLayout(test["layout"]))
+        for number, step in enumerate(self._require(test, "steps", where)):
+            steps.append(self._compile_step(page, step, f"{where}.steps[{number}]"))
+        savings = Savings()
+        if self.optimize:
+            steps, savings = optimize(steps)
+        return TestPlan(
+            index,
+            page,
+            test.get("layout"),
+            steps,
+            self.fingerprint(test, self.factory.used_entries, site, budget),
+            budget,
+            savings,
+        )
+
+    @staticmethod
+    def fingerprint(
+        test: Dict,
+        model_entries: Dict[str, Any],
+        site: str = "",
+        budget: Optional[float] = None,
+    ) -> str:
+        """Return a hash that changes whenever a test or anything it runs against changes.
+
+        The test's position in the flow is left out, so adding or removing other
+        tests does not change it.
+
+        Arguments:
+            test -- the test as defined in the flow file
+            model_entries -- the model entries the test's widgets were built from by path
+            site -- the site the test runs on
+            budget -- seconds the test may take, inherited from the flow or its own
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [PLAN_VERSION, site, budget, test, model_entries],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+    def _compile_step(self, page: str, step: Dict, where: str) -> Step:
+        action = self._require(step, "action", where)
+        if action == "add-components":
+            region_name = self._region(step, where)
+            menu = self.model_data.get("menus", {}).get(page, {}).get(region_name)
+            if menu is None:
+                raise FlowError(
+                    f"{where}: region {region_name!r} has no menu on page {page!r}."
+                )
+            components = self._require(step, "components", where)
+            for component_name in components:
+                if component_name not in menu:
+                    raise FlowError(
+                        f"{where}: {component_name!r} is not in the menu of region"
+                        f" {region_name!r} on page {page!r}."
+                    )
+            return AddComponents(
+                region_name, self.factory.get_region(region_name, page), components
+            )
+
+        if action == "edit-component":
+            region_name = self._region(step, where)
+            index = self._index(step, where)
+            component_name = self._component(step, where)
+            actions = [
+                self._compile_input_action(
+                    region_name, component_name, action, f"{where}.steps[{number}]"
+                )
+                for number, action in enumerate(self._require(step, "steps", where))
+            ]
+            return EditComponent(
+                region_name,
+                index,
+                component_name,
+                self.factory.get_component(region_name, index, component_name),
+                actions,
+            )
+
+        if action == "remove-component":
+            region_name = self._region(step, where)
+            index = self._index(step, where)
+            return RemoveComponent(
+                region_name, index, self.factory.get_component(region_name, index)
+            )
+
+        if action == "assert-state":
+            region_name = self._region(step, where)
+            index = self._index(step, where)
+            component_name = self._component(step, where)
+            expected = self._require(step, "expected", where)
+            if not isinstance(expected, dict) or not expected:
+                raise FlowError(f"{where}: expected must map input names to values.")
+            inputs = self.model_data["components"][component_name]
+            for input_name in expected:
+                if input_name in LayoutManagerFactory.SETTINGS or input_name not in inputs:
+                    raise FlowError(
+                        f"{where}: component {component_name!r} has no input"
+                        f" {input_name!r}."
+                    )
+                if inputs[input_name]["type"] == "button":
+                    raise FlowError(f"{where}: button {input_name!r} has no state.")
+            return AssertState(
+                region_name,
+                index,
+                component_name,
+                self.factory.get_component(region_name, index, component_name),
+                # Inputs other than checkboxes read back as strings.
+                {
+                    name: value if isinstance(value, bool) else str(value)
+                    for name, value in expected.items()
+                },
+            )
+
+        raise FlowError(f"{where}: unknown action {action!r}.")
+
+    def _compile_input_action(
+        self, region_name: str, component_name: str, action: Dict, where: str
+    ) -> InputAction:
+        name = self._require(action, "action", where)
+        input_name = self._require(action, "input", where)
+        definition = self.model_data["components"][component_name].get(input_name)
+        if input_name in LayoutManagerFactory.SETTINGS or definition is None:
+            raise FlowError(
+                f"{where}: component {component_name!r} has no input {input_name!r}."
+            )
+        if name not in INPUT_ACTIONS:
+            raise FlowError(f"{where}: unknown input action {name!r}.")
+        if definition["type"] != INPUT_ACTIONS[name]:
+            raise FlowError(
+                f"{where}: cannot {name} input {input_name!r} of type"
+                f" {definition['type']!r}."
+            )
+        if name != "click" and "value" not in action:
+            raise FlowError(f"{where}: {name} needs a value.")
+        return InputAction(
+            input_name,
+            self.factory.get_input(region_name, component_name, input_name),
+            name,
+            action.get("value"),
+        )
+
+    def _route(self, page: str, where: str) -> Route:
+        entry = self.model_data.get("pages", {}).get(page)
+        if entry is None:
+            return Route()
+        if not isinstance(entry, dict) or not set(entry) <= set(Route._fields):
+            raise FlowError(
+                f"{where}: the route of page {page!r} may only have "
+                + ", ".join(Route._fields)
+                + "."
+            )
+        return self.factory.get_route(page)
+
+    def _region(self, step: Dict, where: str) -> str:
+        region_name = self._require(step, "region", where)
+        if region_name not in self.model_data.get("regions", {}):
+            raise FlowError(f"{where}: unknown region {region_name!r}.")
+        return region_name
+
+    def _component(self, step: Dict, where: str) -> str:
+        component_name = self._require(step, "component", where)
+        if component_name == "locator" or not isinstance(
+            self.model_data["components"].get(component_name), dict
+        ):
+            raise FlowError(f"{where}: unknown component {component_name!r}.")
+        return component_name
+
+    def _index(self, step: Dict, where: str) -> int:
+        index = self._require(step, "index", where)
+        if not isinstance(index, int) or isinstance(index, bool) or index < 1:
+            raise FlowError(f"{where}: index must be a whole number greater than 0.")
+        return index
+
+    @staticmethod
+    def _require(data: Dict, key: str, where: str) -> Any:
+        if not isinstance(data, dict) or key not in data:
+            raise FlowError(f"{where}: missing {key!r}.")
+        return data[key]
+
+
+class FlowReader:
+    """Reads a flow file one test at a time by walking its YAML event stream.
+
+    Only the test being read is held in memory, however many tests the file
+    has, but the site has to come before the tests and nothing may follow them.
+
+    Attributes:
+        site -- the site of the flow, read as soon as the reader is created
+        header -- every other key of the flow that comes before the tests
+    """
+
+    def __init__(self, flow_file: str):
+        """
+        Arguments:
+            flow_file -- path of the flow file
+        """
+        self._file = open(flow_file, "r")
+        # libyaml's loader cannot compose a node at a time, so stream with Python's.
+        self._loader = yaml.SafeLoader(self._file)
+        self.header: Dict[str, Any] = {}
+        try:
+            self.site = self._read_header()
+        except BaseException:
+            self.close()
+            raise
+
+    def tests(self) -> Iterator[Dict]:
+        """Yield the tests of the flow as they are read, then close the file.
+
+        A key following the tests raises FlowError once the tests are read.
+        """
+        loader = self._loader
+        try:
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield loader.construct_document(loader.compose_node(None, None))
+            loader.get_event()
+            if not loader.check_event(yaml.MappingEndEvent):
+                key = loader.construct_document(loader.compose_node(None, None))
+                raise FlowError(f"{key!r} must come before the tests.")
+        except yaml.YAMLError as error:
+            raise FlowError(str(error)) from error
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the flow file."""
+        self._loader.dispose()
+        self._file.close()
+
+    def _read_header(self) -> str:
+        """Read the keys before tests and leave the loader at the first test."""
+        loader = self._loader
+        site = None
+        try:
+            loader.get_event()
+            if not loader.check_event(yaml.DocumentStartEvent):
+                raise FlowError("The flow must be a mapping with a site.")
+            loader.get_event()
+            if not loader.check_event(yaml.MappingStartEvent):
+                raise FlowError("The flow must be a mapping with a site.")
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                key = loader.construct_document(loader.compose_node(None, None))
+                if key == "tests":
+                    if site is None:
+                        raise FlowError(
+                            "The site must come before the tests to stream the flow."
+                        )
+                    if not loader.check_event(yaml.SequenceStartEvent):
+                        raise FlowError("The flow must have a list of tests.")
+                    loader.get_event()
+                    return site
+                value = loader.construct_document(loader.compose_node(None, None))
+                if key == "site":
+                    site = value
+                else:
+                    self.header[key] = value
+        except yaml.YAMLError as error:
+            raise FlowError(str(error)) from error
+        if site is None:
+            raise FlowError("The flow must be a mapping with a site.")
+        raise FlowError("The flow must have a list of tests.")
+
+
+def stream_plan(
+    flow_file: str,
+    model_file: str,
+    model_cache_dir: Optional[pathlib.Path] = CACHE_DIR.joinpath("models"),
+    optimize: bool = True,
+) -> Tuple[str, Iterator[TestPlan]]:
+    """Return the site of a flow and an iterator compiling its tests as they are read.
+
+    Unlike load_plan nothing is cached and an invalid test only raises
+    FlowError once it is reached, but the first test can run as soon as the
+    site has been read.
+
+    Arguments:
+        flow_file -- path of the flow file
+        model_file -- path of the model file
+        model_cache_dir -- directory parsed models are cached in, see load_model
+        optimize -- whether to remove redundant steps, see optimize
+    """
+    compiler = FlowCompiler(load_model(model_file, model_cache_dir), optimize)
+    reader = FlowReader(flow_file)
+    return reader.site, (
+        compiler.compile_test(index, test, reader.site, reader.header.get("budget"))
+        for index, test in enumerate(reader.tests())
+    )
+
+
+def load_model(
+    model_file: str, cache_dir: Optional[pathlib.Path] = CACHE_DIR.joinpath("models")
+) -> Dict:
+    """Return the parsed model file, parsing it only if it changed since it was cached.
+
+    Models are cached by path. A cached model whose modification time and size
+    still match the file is returned without reading the file; otherwise the
+    file's content hash decides whether it has to be parsed again.
+
+    Arguments:
+        model_file -- path of the model file
+        cache_dir -- directory parsed models are cached in, or None to disable caching
+    """
+    path = pathlib.Path(model_file).resolve()
+    if cache_dir is None:
+        return yaml.load(path.read_bytes(), Loader=SafeLoader)
+
+    status = path.stat()
+    cache_file = cache_dir.joinpath(
+        hashlib.sha256(str(path).encode()).hexdigest() + ".pickle"
+    )
+    try:
+        with open(cache_file, "rb") as file:
+            cached = pickle.load(file)
+        cached_stat, cached_hash, data = cached["stat"], cached["hash"], cached["data"]
+    except Exception:  # pylint: disable=broad-except
+        # A cache file that is missing, corrupt or of an older layout is only a miss.
+        cached_stat = cached_hash = None
+    if cached_stat == (status.st_mtime_ns, status.st_size):
+        return data
+
+    content = path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    if cached_hash != digest:
+        data = yaml.load(content, Loader=SafeLoader)
+    _write_cache(
+        cache_file,
+        {"stat": (status.st_mtime_ns, status.st_size), "hash": digest, "data": data},
+    )
+    return data
+
+
+def _write_cache(cache_file: pathlib.Path, value: Any) -> None:
+    """Pickle a value to a cache file, replacing it in one step for concurrent readers."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = cache_file.with_name(f"{cache_file.stem}.{os.getpid()}.tmp")
+    with open(temporary_file, "wb") as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+    temporary_file.replace(cache_file)
+
+
+def load_plan(
+    flow_file: str,
+    model_file: str,
+    cache_dir: Optional[pathlib.Path] = CACHE_DIR.joinpath("plans"),
+    model_cache_dir: Optional[pathlib.Path] = CACHE_DIR.joinpath("models"),
+    optimize: bool = True,
+) -> Plan:
+    """Return the plan for a flow and model file, compiling it only if it is not cached.
+
+    Plans are cached by a hash of both files' contents, so any edit to either
+    file compiles a new plan.
+
+    Arguments:
+        flow_file -- path of the flow file
+        model_file -- path of the model file
+        cache_dir -- directory compiled plans are cached in, or None to disable caching
+        model_cache_dir -- directory parsed models are cached in, see load_model
+        optimize -- whether to remove redundant steps, see optimize
+    """
+    flow_bytes = pathlib.Path(flow_file).read_bytes()
+    model_bytes = pathlib.Path(model_file).read_bytes()
+
+    cache_file = None
+    if cache_dir is not None:
+        key = hashlib.sha256(
+            b"\0".join(
+                [str(PLAN_VERSION).encode(), bytes([optimize]), flow_bytes, model_bytes]
+            )
+        ).hexdigest()
+        cache_file = cache_dir.joinpath(f"{key}.pickle")
+        try:
+            with open(cache_file, "rb") as file:
+                cached = pickle.load(file)
+        except Exception:  # pylint: disable=broad-except
+            # A cache file that is missing or corrupt is only a miss.
+            cached = None
+        if isinstance(cached, Plan):
+            return cached
+
+    plan = FlowCompiler(load_model(model_file, model_cache_dir), optimize).compile(
+        yaml.load(flow_bytes, Loader=SafeLoader)
+    )
+
+    if cache_file is not None:
+        _write_cache(cache_file, plan)
+    return plan
@@ -1,56 +1,248 @@
 import argparse
+import functools
+import pathlib
+import sys
+from typing import Dict, Iterable, Iterator, Optional
 
 import yaml
 
+from lm_automator.async_engine import run_async
+from lm_automator.common import DriverSession, LaunchProfile
+from lm_automator.element_handler import ElementHandler
+from lm_automator.flow_compiler import (
+    FlowError,
+    SafeLoader,
+    Savings,
+    TestPlan,
+    load_plan,
+    stream_plan,
+)
+from lm_automator.journal import Journal, flow_hash
 from lm_automator.layout_manager import LayoutManager
-from lm_automator.page import Page
-from lm_automator.layout_manager_factory import LayoutManagerFactory
+from lm_automator.selection import ResultState
+from lm_automator.session_pool import SessionPool
+from lm_automator.sharding import DurationHistory, parse_shard, shard
+from lm_automator.simulator import run_simulated
+from lm_automator.runner import run_sequential, run_parallel, report
+from lm_automator.tracing import TRACER
 
 
-def generate() -> None:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="")
     parser.add_argument("--flow_file", dest="flow_file", action="store", required=True)
     parser.add_argument("--config_file", dest="config_file", action="store", required=True)
     parser.add_argument("--model_file", dest="model_file", action="store", required=True)
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        action="store",
+        type=int,
+        default=1,
+        help="number of browser worker processes, or sessions of the async engine,"
+        " to run tests in",
+    )
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        action="store",
+        choices=("sync", "async"),
+        default="sync",
+        help="run tests with Selenium, or as coroutines driving geckodriver directly",
+    )
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="compile and run each test as it is read instead of loading the whole flow"
+        " first, for very large flow files",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="skip the tests that passed in the last run of the same flow and model",
+    )
+    parser.add_argument(
+        "--changed-only",
+        dest="changed_only",
+        action="store_true",
+        help="run only the tests that changed, or use changed model entries, or did"
+        " not pass last time",
+    )
+    parser.add_argument(
+        "--no-optimize",
+        dest="optimize",
+        action="store_false",
+        help="run every step as written instead of merging and dropping redundant"
+        " ones, for debugging a flow",
+    )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="check the tests against a simulated page instead of running them in a"
+        " browser, e.g. for components that are not at the index a step uses",
+    )
+    parser.add_argument(
+        "--shard",
+        dest="shard",
+        action="store",
+        type=parse_shard,
+        help="run only shard i of n, e.g. 2/4, splitting the tests so every shard takes"
+        " about as long by the past durations given with --durations",
+    )
+    parser.add_argument(
+        "--durations",
+        dest="durations",
+        action="store",
+        help="JSON lines file of past test durations to shard by, e.g. the duration"
+        " files of several machines concatenated; every shard must be given the same"
+        " file, and without one tests are split by a hash. It is only read, each run"
+        " appends its own durations to durations.jsonl in the cache directory",
+    )
+    parser.add_argument(
+        "--trace",
+        dest="trace",
+        action="store",
+        help="write a chrome://tracing JSON trace of the run to this file",
+    )
+    return parser
+
+
+def load_yaml(path: str) -> Dict:
+    with open(path, "r") as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+def generate() -> None:
+    args = build_parser().parse_args()
+
+    try:
+        if args.stream:
+            site, tests = stream_plan(
+                args.flow_file, args.model_file, optimize=args.optimize
+            )
+        else:
+            plan = load_plan(args.flow_file, args.model_file, optimize=args.optimize)
+            site, tests = plan.site, plan.tests
+    except FlowError as error:
+        sys.exit(f"{args.flow_file}: {error}")
+    flow_error: Optional[FlowError] = None
+
+    def until_flow_error(tests: Iterable[TestPlan]) -> Iterator[TestPlan]:
+        # A streamed test is only compiled once it is reached. An invalid one
+        # ends the stream, so the run reports and records what it finished.
+        nonlocal flow_error
+        try:
+            yield from tests
+        except FlowError as error:
+            flow_error = error
+
+    if args.stream:
+        tests = until_flow_error(tests)
+    journal = Journal(flow_hash(args.flow_file, args.model_file))
+    passed = journal.passed() if args.resume else set()
+    state = ResultState()
+    history = DurationHistory()
+    if args.shard:
+        shared = DurationHistory(pathlib.Path(args.durations)) if args.durations else None
+        tests = shard(tests, *args.shard, shared)
+    fingerprints: Dict[int, str] = {}
+    savings = Savings()
+    resumed = unchanged = 0
+
+    def selected(test: TestPlan) -> bool:
+        nonlocal savings, resumed, unchanged
+        fingerprints[test.index] = test.fingerprint
+        if test.index in passed:
+            resumed += 1
+            return False
+        if args.changed_only and not state.changed(test.fingerprint):
+            unchanged += 1
+            return False
+        savings += test.savings
+        return True
+
+    def print_skipped() -> None:
+        if resumed:
+            print(f"\nSkipped {resumed} tests that passed in the resumed run.")
+        if unchanged:
+            print(f"\nSkipped {unchanged} unchanged tests that passed last time.")
+
+    remaining = (test for test in tests if selected(test))
+    tests = remaining if args.stream else list(remaining)
+    if args.dry_run:
+        # Simulate exactly the tests a real run with these options would run.
+        results = run_simulated(tests)
+        print_skipped()
+        all_passed = report(results)
+        if flow_error is not None:
+            sys.exit(f"{args.flow_file}: {flow_error}")
+        sys.exit(0 if all_passed else 1)
+    if not args.resume:
+        journal.start()
+
+    config_data = load_yaml(args.config_file)
+    profile = LaunchProfile.from_config(config_data.get("browser"))
+    ElementHandler.wait_mode = config_data.get("wait_mode", ElementHandler.wait_mode)
+    if ElementHandler.wait_mode not in ("observer", "poll"):
+        sys.exit(f"Unknown wait_mode {ElementHandler.wait_mode!r}, use observer or poll.")
+    if args.trace:
+        if args.engine == "async":
+            sys.exit("--trace is not supported by the async engine.")
+        TRACER.install()
+
+    if args.engine == "async" or args.workers > 1:
+        # Log in once here if there is no saved session, so the workers can
+        # restore it instead of each waiting for a push approval.
+        layout_manager = LayoutManager(
+            config_data["environment"], site, DriverSession(profile.launch)
+        )
+        if not layout_manager.auth_cache.load(config_data["environment"], site):
+            layout_manager.login(config_data["username"], config_data["password"])
+            layout_manager.session.quit()
+
+    if args.engine == "async":
+        results = run_async(tests, args.workers, config_data, site, journal)
+    elif args.workers > 1:
+        results = run_parallel(
+            tests, args.workers, config_data, site, bool(args.trace), journal
+        )
+    else:
+        pool = SessionPool(
+            config_data["environment"],
+            site,
+            config_data["username"],
+            config_data["password"],
+            session_factory=functools.partial(DriverSession, profile.launch),
+        )
+        try:
+            results = run_sequential(tests, pool, journal)
+        finally:
+            pool.close()
+
+    for result in results:
+        state.record(fingerprints[result.index], result.outcome)
+    state.save()
+    history.record(
+        {
+            fingerprints[result.index]: result.duration
+            for result in results
+            if result.outcome != "crashed"
+        }
+    )
+    print_skipped()
+    if savings.steps:
+        print(
+            f"\nOptimizing the flow saved {savings.steps} steps and {savings.waits} waits."
+        )
+
+    if args.trace:
+        TRACER.write_chrome_trace(args.trace)
+        print(f"\n{TRACER.summary()}")
 
-    with open(parser.parse_args().flow_file, "r") as file:
-        flow_data = yaml.safe_load(file)
-    with open(parser.parse_args().config_file, "r") as file:
-        config_data = yaml.safe_load(file)
-    with open(parser.parse_args().model_file, "r") as file:
-        model_data = yaml.safe_load(file)
-
-    layout_manager = LayoutManager(config_data["environment"], flow_data["site"])
-    layout_manager.login(config_data["username"], config_data["password"])
-
-    factory = LayoutManagerFactory(model_data)
-
-    for test in flow_data["tests"]:
-        Page.visit(test["page"])
-        if test.get("layout"):
-            Page.select_layout(test["layout"])
-
-        for step in test["steps"]:
-            if step["action"] == "add-components":
-                flow_data.get_region(step["region"], test["page"]).add_components(
-                    (step["components"])
-                )
-            elif step["action"] == "edit-component":
-                component = flow_data.get_component(step["region"], step["index"])
-                component.edit()
-                for action in step["steps"]:
-                    input_ = flow_data.get_input(
-                        step["region"], step["component"], action["input"]
-                    )
-                    if action["action"] == "click":
-                        input_.click()
-                    elif action["action"] == "select":
-                        input_.option = action["value"]
-                    elif action["action"] == "check":
-                        input_.checked = action["value"]
-                    elif action["action"] == "set":
-                        input_.value = action["value"]
-                component.edit()
-            elif step["action"] == "remove-component":
-                component = factory.get_component(step["region"], step["index"])
-                component.delete()
+    all_passed = report(results)
+    if flow_error is not None:
+        sys.exit(f"{args.flow_file}: {flow_error}")
+    if not all_passed:
+        sys.exit(1)
@@ -3,13 +3,17 @@
 from abc import ABCMeta, abstractmethod
 from typing import Any
 
+from selenium.webdriver.support.ui import Select as SeleniumSelect
+
 from lm_automator.widget import Widget
-from lm_automator.element_handler import ElementHandler
+from lm_automator.element_handler import ElementHandler, with_widget_waits
 
 
 class Input(Widget, metaclass=ABCMeta):
     """Abstract base class for various HTML input types."""
 
+    __slots__ = ()
+
     @property
     def locator(self) -> str:
         return self._locator
@@ -28,12 +32,18 @@ class Input(Widget, metaclass=ABCMeta):
 class Text(Input):
     """Class for interacting with HTML text fields."""
 
+    __slots__ = ()
+
     @property
+    @with_widget_waits
     def value(self) -> str:
         """Return text in text field."""
-        return ElementHandler.get_element(self.locator).get_attribute("value")
+        return ElementHandler.with_element(
+            self.locator, lambda element: element.get_attribute("value")
+        )
 
     @value.setter
+    @with_widget_waits
     def value(self, value: str) -> None:
         """Add text to text field.
 
@@ -42,33 +52,42 @@ class Text(Input):
         """
         ElementHandler.send_keys_to_element(self.locator, value)
 
+    @with_widget_waits
     def clear(self) -> None:
         """Remove all text from text field."""
-        ElementHandler.get_element(self.locator).clear()
+        ElementHandler.with_element(self.locator, lambda element: element.clear())
 
 
 class Checkbox(Input):
     """Class for interacting with HTML checkboxes."""
 
+    __slots__ = ()
+
     @property
+    @with_widget_waits
     def value(self) -> bool:
         """Return whether a checkbox is checked off."""
-        return ElementHandler.get_element(self.locator).is_selected()
+        return ElementHandler.with_element(
+            self.locator, lambda element: element.is_selected()
+        )
 
     @value.setter
+    @with_widget_waits
     def value(self, value: bool) -> None:
         """"Check or uncheck a checkbox.
 
         Arguments:
             value -- value to determine whether to check or uncheck the checkbox
         """
-        if (value is True and not self.value) or (value is False and self.value):
+        if value != self.value:
             ElementHandler.click_element(self.locator)
 
 
 class Button(Input):
     """Class for interacting with HTML buttons."""
 
+    __slots__ = ()
+
     @property
     def value(self) -> None:
         raise NotImplementedError
@@ -77,22 +96,31 @@ class Button(Input):
     def value(self, value: Any) -> None:
         raise NotImplementedError
 
-    def click(self) -> None:
-        """Click an element."""
-        ElementHandler.click_element(self.locator)
+    @with_widget_waits
+    def click(self, *, changes_layout: bool = False) -> None:
+        """Click an element.
+
+        Arguments:
+            changes_layout -- whether the click re-renders the page
+        """
+        ElementHandler.click_element(self.locator, changes_layout=changes_layout)
 
 
 class Select(Input):
     """Class for interacting with HTML selects."""
 
+    __slots__ = ()
+
     @property
+    @with_widget_waits
     def value(self) -> str:
         """Return selected option of select."""
-        return ElementHandler.get_element_as_select(
-            self.locator
-        ).first_selected_option.text
+        return ElementHandler.with_element(
+            self.locator, lambda element: SeleniumSelect(element).first_selected_option.text
+        )
 
     @value.setter
+    @with_widget_waits
     def value(self, value: str) -> None:
         """Select option of select.
 
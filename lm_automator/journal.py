@@ -0,0 +1,104 @@
+"""Contains the Journal class for resuming interrupted flow runs."""
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import TYPE_CHECKING, Dict, Iterable, Set
+
+from lm_automator.common import CACHE_DIR
+
+if TYPE_CHECKING:
+    from lm_automator.runner import TestResult
+
+
+def flow_hash(flow_file: str, model_file: str) -> str:
+    """Return a hash of the contents of a flow and model file, read in chunks.
+
+    Arguments:
+        flow_file -- path of the flow file
+        model_file -- path of the model file
+    """
+    digest = hashlib.sha256()
+    for path in (flow_file, model_file):
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Journal:
+    """Records the result of every finished test of a flow as a line of JSON.
+
+    Each entry is appended with a single write to a file opened with O_APPEND,
+    so any number of processes can share a journal without interleaving lines.
+    Entries of other flows or earlier runs of the same flow are left in place;
+    start marks where a fresh run begins.
+    """
+
+    def __init__(
+        self, flow_hash: str, path: pathlib.Path = CACHE_DIR.joinpath("journal.jsonl")
+    ):
+        """
+        Arguments:
+            flow_hash -- hash of the flow and model the results belong to, see flow_hash
+            path -- file the entries are appended to
+        """
+        self.flow_hash = flow_hash
+        self.path = path
+
+    def start(self) -> None:
+        """Mark the start of a fresh run, forgetting the results of earlier runs."""
+        self._append({"flow_hash": self.flow_hash, "start": True})
+
+    def record(self, result: "TestResult") -> None:
+        """Append the result of a finished test.
+
+        Arguments:
+            result -- the TestResult of the test
+        """
+        self._append(
+            {
+                "flow_hash": self.flow_hash,
+                "index": result.index,
+                "outcome": result.outcome,
+                "duration": round(result.duration, 3),
+            }
+        )
+
+    def outcomes(self) -> Dict[int, str]:
+        """Return the latest outcome of each test since the last fresh run started."""
+        outcomes: Dict[int, str] = {}
+        for entry in self._entries():
+            if entry.get("flow_hash") != self.flow_hash:
+                continue
+            if entry.get("start"):
+                outcomes = {}
+            else:
+                outcomes[entry["index"]] = entry["outcome"]
+        return outcomes
+
+    def passed(self) -> Set[int]:
+        """Return the indexes of the tests whose latest result since the last fresh run passed."""
+        return {index for index, outcome in self.outcomes().items() if outcome == "passed"}
+
+    def _entries(self) -> Iterable[Dict]:
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash mid-write.
+                        continue
+        except FileNotFoundError:
+            return
+
+    def _append(self, entry: Dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(descriptor, (json.dumps(entry) + "\n").encode())
+        finally:
+            os.close(descriptor)
@@ -1,18 +1,100 @@
+from typing import Optional
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
 from lm_automator.element_handler import ElementHandler
-from lm_automator.common import DRIVER
+from lm_automator.common import DriverSession
+from lm_automator.auth_cache import AuthCache
 
 class LayoutManager:
 
-    def __init__(self, environment: str, site: str):
+    push_timeout = 120
+    restore_timeout = 2
+    # A page on the layout manager's domain that does not redirect to Okta,
+    # so the saved cookies can be set before the layout manager is loaded.
+    restore_path = '/favicon.ico'
+    logged_in_locator = '.main-sidebar'
+
+    def __init__(
+        self,
+        environment: str,
+        site: str,
+        session: Optional[DriverSession] = None,
+        auth_cache: Optional[AuthCache] = None,
+    ):
         self.environment = environment
-        self.base_url = f'https://{self.environment}-layout-cms.{site}.com'
+        self.site = site
+        self.base_url = self.base_url_for(environment, site)
+        self.session = session or ElementHandler.session
+        self.auth_cache = auth_cache or AuthCache()
+        ElementHandler.use_session(self.session)
+
+    @staticmethod
+    def base_url_for(environment: str, site: str) -> str:
+        """Return the URL of the layout manager of a site in an environment."""
+        return f'https://{environment}-layout-cms.{site}.com'
+
+    def login(self, username: str, password: str, interactive: bool = True) -> None:
+        """Log in by restoring a saved session, or through Okta if there is no valid one.
 
-    def login(self, username: str, password: str) -> None:
-        DRIVER.get(self.base_url)
+        Arguments:
+            username -- Okta username
+            password -- Okta password
+            interactive -- prompt for confirmation of the push approval instead of
+                waiting for the layout manager to load (needed where there is no stdin)
+        """
+        if self.restore_login():
+            return
+
+        ElementHandler.navigate(self.base_url)
         ElementHandler.send_keys_to_element('#idp-discovery-username', username)
         ElementHandler.click_element('#idp-discovery-submit')
         ElementHandler.send_keys_to_element('#okta-signin-password', password)
         ElementHandler.click_element('#okta-signin-submit')
         ElementHandler.click_element('.auth-content .button.button-primary')
-        input('Hit enter after approving push:')
-        
\ No newline at end of file
+        if interactive:
+            input('Hit enter after approving push:')
+        elif not self.logged_in(self.push_timeout):
+            raise TimeoutException('The push was not approved in time.')
+        self.auth_cache.save(self.environment, self.site, self.session.driver)
+
+    def restore_login(self) -> bool:
+        """Load the saved session into the browser and return whether it is still logged in."""
+        entry = self.auth_cache.load(self.environment, self.site)
+        if entry is None:
+            return False
+
+        driver = self.session.driver
+        try:
+            ElementHandler.navigate(self.base_url + self.restore_path)
+            AuthCache.restore(driver, entry)
+            ElementHandler.navigate(self.base_url)
+        except WebDriverException:
+            valid = False
+        else:
+            valid = driver.current_url.startswith(self.base_url) and self.logged_in(
+                self.restore_timeout
+            )
+        if not valid:
+            self.auth_cache.clear(self.environment, self.site)
+        return valid
+
+    def logged_in(self, timeout: float) -> bool:
+        """Return whether the layout manager loads within the timeout.
+
+        Arguments:
+            timeout -- seconds to wait for the layout manager to appear
+        """
+        try:
+            WebDriverWait(self.session.driver, timeout).until(
+                expected_conditions.presence_of_element_located(
+                    (By.CSS_SELECTOR, self.logged_in_locator)
+                )
+            )
+        except TimeoutException:
+            return False
+        else:
+            return True
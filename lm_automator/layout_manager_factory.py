@@ -1,38 +1,123 @@
-from typing import Dict
+from typing import Any, Dict, Optional, Tuple, Type
 
 from lm_automator.region import Region
 from lm_automator.inputs import Input, Text, Button, Select, Checkbox
 from lm_automator.component import Component
+from lm_automator.page import Route
 
 
 class LayoutManagerFactory:
 
     INPUTS = {"text": Text, "button": Button, "select": Select, "checkbox": Checkbox}
+    # Keys of regions, components and inputs that set how long their elements are waited for.
+    SETTINGS = ("timeout", "poll")
 
     def __init__(self, model_data: Dict):
         self.model_data = model_data
+        # Flat indexes of the model built once, so lookups are single dict hits.
+        self._region_locators: Dict[str, str] = {
+            name: region["locator"] for name, region in model_data["regions"].items()
+        }
+        self._component_locator: str = model_data["components"]["locator"]
+        # Settings are inherited: inputs use their component's, components their region's.
+        self._region_settings: Dict[str, Dict[str, float]] = {
+            name: self._settings(region) for name, region in model_data["regions"].items()
+        }
+        self._component_settings: Dict[str, Dict[str, float]] = {
+            name: self._settings(inputs)
+            for name, inputs in model_data["components"].items()
+            if name != "locator"
+        }
+        self._input_definitions: Dict[
+            Tuple[str, str], Tuple[Type[Input], str, Dict[str, float]]
+        ] = {
+            (component_name, input_name): (
+                self.INPUTS[input_["type"]],
+                input_["locator"],
+                self._settings(input_),
+            )
+            for component_name, inputs in model_data["components"].items()
+            if component_name != "locator"
+            for input_name, input_ in inputs.items()
+            if input_name not in self.SETTINGS
+        }
+        # Widgets are interned: the same arguments always return the same instance.
+        self._regions: Dict[Tuple[str, str], Region] = {}
+        self._inputs: Dict[Tuple[str, str, str], Input] = {}
+        self._components: Dict[Tuple[str, int, Optional[str]], Component] = {}
+        # The model entries looked up since it was last cleared, by their path in the model.
+        self.used_entries: Dict[str, Any] = {}
 
     def get_region(self, region_name: str, page_name: str) -> Region:
-        return Region(
-            self.model_data["regions"][region_name]["locator"], self.model_data["menus"][page_name][region_name]
-        )
+        self._use("regions", region_name)
+        self._use("menus", page_name, region_name)
+        key = (region_name, page_name)
+        region = self._regions.get(key)
+        if region is None:
+            region = self._regions[key] = Region(
+                self._region_locators[region_name],
+                self.model_data["menus"][page_name][region_name],
+                **self._region_settings[region_name],
+            )
+        return region
+
+    def get_route(self, page_name: str) -> Route:
+        self._use("pages", page_name)
+        return Route(**self.model_data["pages"][page_name])
 
     def get_input(self, region_name: str, component_name: str, input_name: str) -> Input:
-        class_ = self.INPUTS[
-            self.model_data["components"][component_name][input_name]["type"]
-        ]
-        return class_(
-            self.model_data["regions"][region_name]["locator"]
-            + " "
-            + self.model_data["components"]["locator"]
-            + " "
-            + self.model_data["components"][component_name][input_name]["locator"]
-        )
-
-    def get_component(self, region_name: str, position: str) -> Component:
-        return Component(
-            self.model_data["regions"][region_name]["locator"]
-            + " "
-            + self.model_data["components"]["locator"],
-            position
-        )
+        self._use("regions", region_name)
+        self._use("components", "locator")
+        self._use("components", component_name, input_name)
+        key = (region_name, component_name, input_name)
+        input_ = self._inputs.get(key)
+        if input_ is None:
+            class_, locator, settings = self._input_definitions[(component_name, input_name)]
+            input_ = self._inputs[key] = class_(
+                f"{self._region_locators[region_name]} {self._component_locator} {locator}",
+                **{
+                    **self._region_settings[region_name],
+                    **self._component_settings[component_name],
+                    **settings,
+                },
+            )
+        return input_
+
+    def get_component(
+        self, region_name: str, position: int, component_name: Optional[str] = None
+    ) -> Component:
+        self._use("regions", region_name)
+        self._use("components", "locator")
+        if component_name is not None:
+            self._use("components", component_name)
+        key = (region_name, position, component_name)
+        component = self._components.get(key)
+        if component is None:
+            inputs = {}
+            settings = self._region_settings[region_name]
+            if component_name is not None:
+                inputs = {
+                    input_name: (input_["type"], input_["locator"])
+                    for input_name, input_ in self.model_data["components"][
+                        component_name
+                    ].items()
+                    if input_name not in self.SETTINGS
+                }
+                settings = {**settings, **self._component_settings[component_name]}
+            component = self._components[key] = Component(
+                f"{self._region_locators[region_name]} {self._component_locator}",
+                position,
+                inputs,
+                **settings,
+            )
+        return component
+
+    @classmethod
+    def _settings(cls, entry: Dict) -> Dict[str, float]:
+        return {name: entry[name] for name in cls.SETTINGS if name in entry}
+
+    def _use(self, *path: str) -> None:
+        entry = self.model_data
+        for key in path:
+            entry = entry[key]
+        self.used_entries["/".join(path)] = entry
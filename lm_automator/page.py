@@ -1,5 +1,23 @@
+from typing import NamedTuple, Optional
+from urllib import parse
+
 from lm_automator.element_handler import ElementHandler
 from lm_automator.inputs import Button, Text
+from lm_automator.readiness import PAGE_CHANGED, PAGE_LOADED, CHANGES_PUBLISHED
+
+
+class Route(NamedTuple):
+    """Where a page can be loaded from directly, as given by the pages section of the model.
+
+    Attributes:
+        url -- path of the page on the layout manager
+        layout_url -- path of a layout of the page, with {layout} in place of its name
+        ready -- CSS selector of the content to wait for once either is loaded
+    """
+
+    url: Optional[str] = None
+    layout_url: Optional[str] = None
+    ready: Optional[str] = None
 
 
 class Page:
@@ -8,32 +26,65 @@ class Page:
     filter_button = Text(".category-selector input.dropdown-filter")
     publish_button = Button(".content-header .btn-submit")
     confirm_button = Button(".swal2-container .swal2-confirm")
+    layout_option_locator = ".category-selector .dropdown-menu li:nth-child(3)"
+    sidebar_link_locator = '.main-sidebar [href="/{}"]'
 
     @classmethod
     def select_layout(cls, layout: str) -> None:
-        """Go to the specified layout.
+        """Go to the specified layout, unless the browser already shows it unchanged.
 
 		User Flow:
 		1. Click the caret button.
 		2. Enter the layout name into the search bar.
 		3. Click the layouts name.
 		"""
+        session = ElementHandler.session
+        page = session.page
+        if page is not None and session.layout == layout:
+            if session.dirty:
+                cls._reload(page, layout)
+            return
         cls.caret_button.click()
         cls.filter_button.value = layout
-        ElementHandler.click_element(
-            ".category-selector .dropdown-menu li:nth-child(3)"
-        )
-        ElementHandler.wait_for_timeout(reason="Ensure page is fully loaded.")
+        ElementHandler.click_element(cls.layout_option_locator)
+        ElementHandler.wait_until_ready(PAGE_CHANGED)
+        session.arrived(page, layout)
 
     @classmethod
-    def visit(cls, name: str) -> None:
+    def visit(
+        cls, name: str, layout: Optional[str] = None, route: Route = Route()
+    ) -> None:
         """Visit the URL specified by the name parameter.
 
+        Nothing is loaded if the browser already shows the page unchanged,
+        either on its default layout or, when a layout is selected next, on any
+        layout, and an open page that was changed is reloaded. A page with a
+        route is loaded by URL, straight onto the layout if the route has a
+        layout URL.
+
         User Flow:
         1. Click the sidebar item of the page you wish to visit.
+
+        Arguments:
+            name -- the page's name, the path of its sidebar link
+            layout -- the layout that will be selected next, if any
+            route -- where the page can be loaded from directly
         """
-        ElementHandler.click_element(f'.main-sidebar [href="/{name}"]')
-        ElementHandler.wait_for_timeout(reason="Ensure page is fully loaded.")
+        session = ElementHandler.session
+        if session.page == name and (layout is not None or session.layout is None):
+            if session.dirty:
+                cls._reload(name, session.layout)
+            return
+        if layout is not None and route.layout_url:
+            cls._load(route.layout_url.format(layout=parse.quote(layout)), route.ready)
+            session.arrived(name, layout)
+            return
+        if route.url:
+            cls._load(route.url, route.ready)
+        else:
+            ElementHandler.click_element(cls.sidebar_link_locator.format(name))
+            ElementHandler.wait_until_ready(PAGE_CHANGED)
+        session.arrived(name)
 
     @classmethod
     def publish(cls) -> None:
@@ -46,4 +97,28 @@ class Page:
         """
         cls.publish_button.click()
         cls.confirm_button.click()
-        ElementHandler.wait_for_timeout(reason="Ensure published changes reflect in the API.")
+        ElementHandler.wait_until_ready(CHANGES_PUBLISHED)
+
+    @classmethod
+    def _reload(cls, page: str, layout: Optional[str]) -> None:
+        """Load the open page and layout again, discarding the changes made to it.
+
+        Clicking the sidebar link or layout that is already open would not.
+        """
+        ElementHandler.refresh()
+        ElementHandler.wait_until_ready(PAGE_LOADED)
+        ElementHandler.session.arrived(page, layout)
+
+    @classmethod
+    def _load(cls, path: str, ready: Optional[str]) -> None:
+        """Load a path of the current site and wait for the content marking it as ready."""
+        current_url = ElementHandler.session.driver.current_url
+        url = parse.urljoin(current_url, path)
+        ElementHandler.navigate(url)
+        if parse.urldefrag(url)[0] == parse.urldefrag(current_url)[0]:
+            # Only the fragment changed, which does not load the page again.
+            ElementHandler.refresh()
+        if ready:
+            ElementHandler.get_element(ready)
+        else:
+            ElementHandler.wait_until_ready(PAGE_LOADED)
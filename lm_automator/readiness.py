@@ -0,0 +1,113 @@
+"""Contains the named readiness conditions used to detect when the application is idle."""
+
+from typing import NamedTuple
+
+
+class ReadinessCondition(NamedTuple):
+    """Describes what "ready" means after a given user action.
+
+    Attributes:
+        name -- short name of the condition, used in error messages and traces
+        quiet_period -- seconds without DOM mutations before the page counts as idle
+        network_idle -- whether pending XHR and fetch requests must have finished
+        transitions -- whether CSS transitions and animations on the target must have finished
+        navigation -- whether the action leads to another document or URL, which has to
+            be reached before the page can count as idle
+    """
+
+    name: str
+    quiet_period: float = 0.3
+    network_idle: bool = True
+    transitions: bool = False
+    navigation: bool = False
+
+
+PAGE_LOADED = ReadinessCondition("page-loaded")
+PAGE_CHANGED = ReadinessCondition("page-changed", navigation=True)
+MENU_EXPANDED = ReadinessCondition("menu-expanded", quiet_period=0.1, transitions=True)
+COMPONENT_TOGGLED = ReadinessCondition(
+    "component-toggled", quiet_period=0.1, transitions=True
+)
+CHANGES_PUBLISHED = ReadinessCondition("changes-published", quiet_period=0.5)
+
+
+# Counts pending XHR and fetch requests and marks the document with a random
+# id, unless that was already done for this document. Defines track(), which
+# returns the [id, URL] of the document.
+TRACKER = """
+function track() {
+    if (window.__lmAutomatorPending === undefined) {
+        window.__lmAutomatorPending = 0;
+        window.__lmAutomatorDocument = Math.random().toString(36).slice(2);
+        var finish = function () { window.__lmAutomatorPending--; };
+        var send = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            window.__lmAutomatorPending++;
+            this.addEventListener("loadend", finish);
+            return send.apply(this, arguments);
+        };
+        if (window.fetch) {
+            var fetch = window.fetch;
+            window.fetch = function () {
+                window.__lmAutomatorPending++;
+                return fetch.apply(this, arguments).finally(finish);
+            };
+        }
+    }
+    return [window.__lmAutomatorDocument, window.location.href];
+}
+"""
+
+# Installs the request tracker on a freshly loaded document, so requests its
+# first action starts are counted, and returns the document's [id, URL].
+TRACKER_SCRIPT = TRACKER + "return track();"
+
+# Resolves with the document's [id, URL] once it is another document or URL
+# than the previous one (if given), the document is complete, no tracked
+# XHR/fetch is pending, no animation is running on the target and the DOM has
+# been quiet for the window, or with null once the timeout runs out. A
+# document the tracker was not installed on yet gets it here.
+IDLE_SCRIPT = TRACKER + """
+var target = arguments[0], quietPeriod = arguments[1] * 1000,
+    networkIdle = arguments[2], transitions = arguments[3],
+    previous = arguments[4], deadline = Date.now() + arguments[5] * 1000,
+    done = arguments[arguments.length - 1];
+
+var current = track();
+
+var lastMutation = Date.now();
+var observer = new MutationObserver(function () { lastMutation = Date.now(); });
+observer.observe(document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+
+function animating() {
+    if (!transitions || !target) return false;
+    var root = document.querySelector(target);
+    if (!root || !root.getAnimations) return false;
+    return root.getAnimations({subtree: true}).some(function (animation) {
+        return animation.playState === "running";
+    });
+}
+
+function moved() {
+    current = track();
+    return !previous || current[0] !== previous[0] || current[1] !== previous[1];
+}
+
+(function check() {
+    if (moved()
+            && document.readyState === "complete"
+            && (!networkIdle || window.__lmAutomatorPending <= 0)
+            && !animating()
+            && Date.now() - lastMutation >= quietPeriod) {
+        observer.disconnect();
+        done(current);
+    } else if (Date.now() >= deadline) {
+        observer.disconnect();
+        done(null);
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
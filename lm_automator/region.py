@@ -1,17 +1,35 @@
-from typing import List
+from typing import Any, List, Optional, Tuple
 
-from lm_automator.element_handler import ElementHandler, wait_after_for_timeout
+from lm_automator.element_handler import (
+    ElementHandler,
+    wait_after_until_ready,
+    with_widget_waits,
+)
+from lm_automator.readiness import MENU_EXPANDED
 from lm_automator.widget import Widget
 from lm_automator.inputs import Button
 
 
 class Region(Widget):
 
-    def __init__(self, locator: str, menu_items):
-        super().__init__(locator)
-        self.menu = Button(self._locator + " .panel-title .caret")
+    __slots__ = ("menu", "menu_items", "_menu_positions")
+
+    def __init__(
+        self,
+        locator: str,
+        menu_items,
+        timeout: Optional[float] = None,
+        poll: Optional[float] = None,
+    ):
+        super().__init__(locator, timeout, poll)
+        self.menu = Button(self._locator + " .panel-title .caret", timeout, poll)
         self.menu_items = menu_items
+        # Position of each item in the menu, keeping the first of any duplicates.
+        self._menu_positions = {}
+        for position, name in enumerate(menu_items, 1):
+            self._menu_positions.setdefault(name, position)
 
+    @with_widget_waits
     def add_components(self, components: List[str]) -> None:
         """Add components to the region.
 
@@ -21,13 +39,26 @@ class Region(Widget):
         3. Click the menu to close it.
         """
         self.expand_menu()
-        for component_name in components:
-            ElementHandler.click_element(
-                f"{self.locator} .small-box:nth-child({self.menu_items.index(component_name)+1})"
-            )
+        ElementHandler.perform_all(self.menu_operations(components), changes_layout=True)
         self.expand_menu()
 
-    @wait_after_for_timeout(reason="Ensure menu is fully expanded.")
+    def menu_operations(self, components: List[str]) -> List[Tuple[str, str, Any]]:
+        """Return the batch operations clicking each component's menu item.
+
+        Arguments:
+            components -- names of the components to add
+        """
+        return [
+            (
+                f"{self.locator} .small-box:nth-child({self._menu_positions[component_name]})",
+                "click",
+                None,
+            )
+            for component_name in components
+        ]
+
+    @with_widget_waits
+    @wait_after_until_ready(MENU_EXPANDED)
     def expand_menu(self):
         self.menu.click()
 
@@ -0,0 +1,293 @@
+"""Contains functions for running flow tests sequentially or across worker processes."""
+
+import collections.abc
+import functools
+import itertools
+import multiprocessing
+import queue
+import time
+import traceback
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from lm_automator.common import DriverSession, LaunchProfile
+from lm_automator.element_handler import ElementHandler
+from lm_automator.flow_compiler import TestPlan
+from lm_automator.journal import Journal
+from lm_automator.session_pool import SessionPool
+from lm_automator.tracing import TRACER
+
+
+class TestResult(NamedTuple):
+    """Outcome of a single flow test.
+
+    Attributes:
+        index -- position of the test in the flow file
+        outcome -- "passed", "failed" or "crashed"
+        duration -- seconds spent running the test
+        error -- description of the failure, if any
+    """
+
+    index: int
+    outcome: str
+    duration: float
+    error: Optional[str] = None
+
+
+def execute(test: TestPlan) -> TestResult:
+    """Run one compiled flow test and return its result instead of raising.
+
+    Arguments:
+        test -- the compiled test
+    """
+    start_time = time.monotonic()
+    try:
+        with ElementHandler.budget(test.budget):
+            with TRACER.span(f"test {test.index}", "test", test=test.index):
+                for step in test.steps:
+                    with TRACER.span(type(step).__name__, "step", test=test.index):
+                        step.execute()
+    except Exception:  # pylint: disable=broad-except
+        return TestResult(
+            test.index, "failed", time.monotonic() - start_time, traceback.format_exc()
+        )
+    return TestResult(test.index, "passed", time.monotonic() - start_time)
+
+
+def take_from(tests: Iterable[TestPlan]) -> Callable[[], Optional[TestPlan]]:
+    """Return a function returning the next test, or None once there are no more.
+
+    The next test is read ahead, so a streamed test is compiled before its
+    predecessor is handed out and a run knows whether any tests are left.
+
+    Arguments:
+        tests -- the compiled tests, possibly a stream compiling them as they are read
+    """
+    remaining = iter(tests)
+    upcoming = next(remaining, None)
+
+    def take() -> Optional[TestPlan]:
+        nonlocal upcoming
+        test, upcoming = upcoming, next(remaining, None) if upcoming else None
+        return test
+
+    return take
+
+
+def concurrency_for(tests: Iterable[TestPlan], limit: int) -> int:
+    """Return how many browsers to run the tests in, at most limit."""
+    if isinstance(tests, collections.abc.Sized):
+        return min(limit, len(tests))
+    return limit
+
+
+def run_sequential(
+    tests: Iterable[TestPlan], pool: SessionPool, journal: Optional[Journal] = None
+) -> List[TestResult]:
+    """Run the tests one after another, each in a freshly reset session from the pool.
+
+    Arguments:
+        tests -- the compiled tests to run, a list or a stream
+        pool -- pool of logged in browser sessions
+        journal -- journal to record each result in as soon as its test finishes
+    """
+    results = []
+    for test in tests:
+        with pool.acquire():
+            result = execute(test)
+        print(format_result(result), flush=True)
+        if journal is not None:
+            journal.record(result)
+        results.append(result)
+    return results
+
+
+def _worker(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    config_data: Dict,
+    site: str,
+    trace: bool,
+) -> None:
+    """Log in with a browser of its own, then run the tests it is handed until a None arrives.
+
+    An error that ends the worker is sent to the parent before the worker exits.
+    """
+    name = multiprocessing.current_process().name
+    ElementHandler.wait_mode = config_data.get("wait_mode", ElementHandler.wait_mode)
+    if trace:
+        TRACER.install()
+    pool = SessionPool(
+        config_data["environment"],
+        site,
+        config_data["username"],
+        config_data["password"],
+        interactive=False,
+        session_factory=functools.partial(
+            DriverSession, LaunchProfile.from_config(config_data.get("browser")).launch
+        ),
+    )
+    try:
+        pool.start()
+        results.put(("ready", name, None))
+        while True:
+            test = tasks.get()
+            if test is None:
+                break
+            with pool.acquire():
+                result = execute(test)
+            if trace:
+                results.put(("trace", name, TRACER.events))
+                TRACER.events = []
+            results.put(("finished", name, result))
+    except Exception:
+        results.put(("failed", name, traceback.format_exc()))
+        raise
+    finally:
+        pool.close()
+
+
+def run_parallel(
+    tests: Iterable[TestPlan],
+    workers: int,
+    config_data: Dict,
+    site: str,
+    trace: bool = False,
+    journal: Optional[Journal] = None,
+    worker: Callable[..., None] = _worker,
+) -> List[TestResult]:
+    """Run the tests across a pool of worker processes, each with its own browser.
+
+    Tests are handed out one at a time, so a worker that dies takes only its
+    current test with it: that test is reported as crashed and a replacement
+    worker picks up the remaining tests. Why a worker died is printed, and
+    kept with the tests it leaves unrun.
+
+    Arguments:
+        tests -- the compiled tests to run, a list or a stream
+        workers -- number of worker processes
+        config_data -- the parsed config file
+        site -- the site from the flow file
+        trace -- whether the workers record spans and send them to this process's tracer
+        journal -- journal to record each result in as soon as its test finishes
+        worker -- function the worker processes run, taking the arguments of _worker
+    """
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    take = take_from(tests)
+    upcoming = take()
+    processes: Dict[str, Tuple[multiprocessing.Process, multiprocessing.Queue]] = {}
+    running: Dict[str, int] = {}
+    finished: Dict[int, TestResult] = {}
+    errors: Dict[str, str] = {}
+    last_death = ""
+    numbers = itertools.count()
+
+    def start_worker() -> None:
+        tasks: multiprocessing.Queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=worker,
+            args=(tasks, results, config_data, site, trace),
+            name=f"worker-{next(numbers)}",
+            daemon=True,
+        )
+        process.start()
+        processes[process.name] = (process, tasks)
+
+    def hand_out(name: str) -> None:
+        nonlocal upcoming
+        tasks = processes[name][1]
+        if upcoming:
+            running[name] = upcoming.index
+            tasks.put(upcoming)
+            upcoming = take()
+        else:
+            tasks.put(None)
+
+    def record(result: TestResult) -> None:
+        finished[result.index] = result
+        print(format_result(result), flush=True)
+        if journal is not None:
+            journal.record(result)
+
+    for _ in range(concurrency_for(tests, workers) if upcoming else 0):
+        start_worker()
+
+    while upcoming or running:
+        try:
+            message, name, payload = results.get(timeout=1)
+        except queue.Empty:
+            pass
+        else:
+            if message == "trace":
+                TRACER.events.extend(payload)
+                continue
+            if message == "failed":
+                errors[name] = payload
+                continue
+            if message == "finished":
+                running.pop(name, None)
+                record(payload)
+            if name in processes:
+                hand_out(name)
+            continue
+
+        for name, (process, _) in list(processes.items()):
+            if process.is_alive():
+                continue
+            del processes[name]
+            if process.exitcode == 0 and name not in running:
+                # Finished: it was told there were no more tests.
+                continue
+            death = f"{name} exited with code {process.exitcode}"
+            if name in errors:
+                death += f":\n{errors.pop(name)}"
+            if name not in running:
+                # Died before running a test, e.g. the login failed.
+                print(death, flush=True)
+                last_death = death
+                continue
+            index = running.pop(name)
+            record(TestResult(index, "crashed", 0.0, death))
+            if upcoming:
+                start_worker()
+
+        if not processes:
+            while upcoming:
+                record(
+                    TestResult(
+                        upcoming.index,
+                        "crashed",
+                        0.0,
+                        f"No live workers were left to run it. {last_death}".rstrip(),
+                    )
+                )
+                upcoming = take()
+
+    for process, tasks in processes.values():
+        tasks.put(None)
+        process.join()
+    return [finished[index] for index in sorted(finished)]
+
+
+def format_result(result: TestResult) -> str:
+    """Return a one line description of a test result."""
+    return f"test {result.index}: {result.outcome} in {result.duration:.1f}s"
+
+
+def report(results: List[TestResult]) -> bool:
+    """Print the failures and a summary of the results, then return whether every test passed.
+
+    Arguments:
+        results -- results of the tests that were run
+    """
+    for result in results:
+        if result.error:
+            print(f"\n{format_result(result)}\n{result.error}")
+    counts = {
+        outcome: sum(result.outcome == outcome for result in results)
+        for outcome in ("passed", "failed", "crashed")
+    }
+    print(
+        f"\n{len(results)} tests: "
+        + ", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+    )
+    return counts["passed"] == len(results)
@@ -0,0 +1,66 @@
+"""Contains the ResultState class for rerunning only the tests affected by a change."""
+
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Optional
+
+from lm_automator.common import CACHE_DIR
+
+
+class ResultState:
+    """Remembers the last outcome of every test by its fingerprint.
+
+    A test whose fingerprint is known to have passed needs no rerun: neither
+    the test nor any model entry it uses has changed since.
+
+    Attributes:
+        max_age -- seconds after which a fingerprint that has not been run is forgotten
+    """
+
+    max_age = 30 * 24 * 60 * 60
+
+    def __init__(self, path: pathlib.Path = CACHE_DIR.joinpath("results.json")):
+        """
+        Arguments:
+            path -- file the outcomes are saved in
+        """
+        self.path = path
+        try:
+            with open(path, "r") as file:
+                self.results: Dict[str, Dict] = json.load(file)
+        except (OSError, ValueError):
+            self.results = {}
+
+    def outcome(self, fingerprint: str) -> Optional[str]:
+        """Return the last outcome of the test with the fingerprint, or None if it never ran."""
+        result = self.results.get(fingerprint)
+        return result["outcome"] if result else None
+
+    def changed(self, fingerprint: str) -> bool:
+        """Return whether the test with the fingerprint changed or did not pass last time."""
+        return self.outcome(fingerprint) != "passed"
+
+    def record(self, fingerprint: str, outcome: str) -> None:
+        """Remember the outcome of a test.
+
+        Arguments:
+            fingerprint -- the test's fingerprint
+            outcome -- "passed", "failed" or "crashed"
+        """
+        self.results[fingerprint] = {"outcome": outcome, "ran_at": time.time()}
+
+    def save(self) -> None:
+        """Write the outcomes to the state file, forgetting ones older than max_age."""
+        oldest = time.time() - self.max_age
+        self.results = {
+            fingerprint: result
+            for fingerprint, result in self.results.items()
+            if result["ran_at"] >= oldest
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temporary_file, "w") as file:
+            json.dump(self.results, file)
+        temporary_file.replace(self.path)
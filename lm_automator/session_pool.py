@@ -0,0 +1,156 @@
+"""Contains the SessionPool class."""
+
+import queue
+from contextlib import contextmanager
+from typing import Callable, Generator, List, Sequence
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+from lm_automator.common import DriverSession
+from lm_automator.element_handler import ElementHandler
+from lm_automator.layout_manager import LayoutManager
+
+
+# Clears local and session storage except for the given keys.
+RESET_STORAGE_SCRIPT = """
+var keep = arguments[0];
+[window.localStorage, window.sessionStorage].forEach(function (storage) {
+    Object.keys(storage).forEach(function (key) {
+        if (keep.indexOf(key) === -1) storage.removeItem(key);
+    });
+});
+"""
+
+
+class SessionPool:
+    """Hands out warm, logged in browser sessions and cheaply resets them between tests.
+
+    Attributes:
+        auth_keys -- local and session storage keys holding the login, kept across resets
+    """
+
+    auth_keys: Sequence[str] = ("okta-token-storage", "okta-cache-storage")
+
+    def __init__(
+        self,
+        environment: str,
+        site: str,
+        username: str,
+        password: str,
+        size: int = 1,
+        interactive: bool = True,
+        session_factory: Callable[[], DriverSession] = DriverSession,
+    ):
+        """
+        Arguments:
+            environment -- the layout manager environment, e.g. dev
+            site -- the site whose layout manager to log in to
+            username -- Okta username
+            password -- Okta password
+            size -- maximum number of browser sessions kept in the pool
+            interactive -- whether logins may prompt for the push approval
+            session_factory -- callable returning a new, not yet started DriverSession
+        """
+        self.environment = environment
+        self.site = site
+        self.username = username
+        self.password = password
+        self.size = size
+        self.interactive = interactive
+        self.session_factory = session_factory
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._layout_managers: List[LayoutManager] = []
+
+    def start(self) -> None:
+        """Launch and log in every session of the pool up front."""
+        while len(self._layout_managers) < self.size:
+            self._idle.put(self._create())
+
+    @contextmanager
+    def acquire(self) -> Generator[LayoutManager, None, None]:
+        """Yield a logged in session in a clean state and return it to the pool afterwards.
+
+        The session is made the one ElementHandler drives while it is checked out.
+        Dead sessions are replaced with freshly logged in ones.
+        """
+        if self._idle.empty() and len(self._layout_managers) < self.size:
+            layout_manager = self._create()
+        else:
+            layout_manager = self._idle.get()
+
+        if not self.healthy(layout_manager.session):
+            layout_manager = self._replace(layout_manager)
+        try:
+            self.reset(layout_manager)
+        except WebDriverException:
+            layout_manager = self._replace(layout_manager)
+
+        ElementHandler.use_session(layout_manager.session)
+        try:
+            yield layout_manager
+        finally:
+            self._idle.put(layout_manager)
+
+    def reset(self, layout_manager: LayoutManager) -> None:
+        """Clear storage except the login, close extra windows and return to the base URL.
+
+        A page the last test left unchanged stays open, so a next test on the
+        same page and layout does not have to load it again. Its storage is
+        kept with it: the page was loaded with that storage, and clearing it
+        under the open page would leave the two out of step.
+
+        Arguments:
+            layout_manager -- the layout manager whose session to reset
+        """
+        driver = layout_manager.session.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        ElementHandler.use_session(layout_manager.session)
+        if layout_manager.session.page is not None and not layout_manager.session.dirty:
+            return
+        driver.execute_script(RESET_STORAGE_SCRIPT, list(self.auth_keys))
+        ElementHandler.navigate(layout_manager.base_url)
+
+    @staticmethod
+    def healthy(session: DriverSession) -> bool:
+        """Return whether the session's browser still responds.
+
+        A browser whose driver process is gone fails at the connection level
+        rather than with a WebDriverException, so those errors count as well.
+
+        Arguments:
+            session -- the session to check
+        """
+        try:
+            session.driver.current_url  # pylint: disable=pointless-statement
+        except (WebDriverException, HTTPError, OSError):
+            return False
+        else:
+            return True
+
+    def close(self) -> None:
+        """Quit every browser of the pool."""
+        for layout_manager in self._layout_managers:
+            layout_manager.session.quit()
+        self._layout_managers = []
+        self._idle = queue.LifoQueue()
+
+    def _create(self) -> LayoutManager:
+        layout_manager = LayoutManager(
+            self.environment, self.site, self.session_factory()
+        )
+        layout_manager.login(self.username, self.password, self.interactive)
+        self._layout_managers.append(layout_manager)
+        return layout_manager
+
+    def _replace(self, layout_manager: LayoutManager) -> LayoutManager:
+        self._layout_managers.remove(layout_manager)
+        try:
+            layout_manager.session.quit()
+        except WebDriverException:
+            pass
+        return self._create()
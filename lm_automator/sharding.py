@@ -0,0 +1,158 @@
+"""Contains functions for splitting the tests of a flow across machines."""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lm_automator.common import CACHE_DIR
+from lm_automator.flow_compiler import TestPlan
+
+
+class DurationHistory:
+    """Remembers how long each test took, by its fingerprint, as lines of JSON.
+
+    Entries are only ever appended, so the histories of several machines are
+    merged by concatenating their files. A test's expected duration is the
+    mean of all its entries.
+
+    The fingerprint covers the test, its site and budget, the model entries it
+    uses and PLAN_VERSION, so editing any of them or bumping PLAN_VERSION
+    leaves its past durations behind. Until it has run again such a test is
+    expected to take as long as the average test.
+    """
+
+    def __init__(self, path: pathlib.Path = CACHE_DIR.joinpath("durations.jsonl")):
+        """
+        Arguments:
+            path -- file the durations are appended to
+        """
+        self.path = path
+        totals: Dict[str, List[float]] = {}
+        try:
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                        total = totals.setdefault(entry["fingerprint"], [0.0, 0])
+                        total[0] += entry["duration"]
+                        total[1] += 1
+                    except (ValueError, KeyError, TypeError):
+                        # A line cut short by a crash mid-write.
+                        continue
+        except FileNotFoundError:
+            pass
+        self.durations: Dict[str, float] = {
+            fingerprint: total / count for fingerprint, (total, count) in totals.items()
+        }
+
+    def record(self, durations: Dict[str, float]) -> None:
+        """Append the durations of the tests of a run with a single write.
+
+        Arguments:
+            durations -- seconds each test took, by fingerprint
+        """
+        if not durations:
+            return
+        ran_at = round(time.time())
+        lines = "".join(
+            json.dumps(
+                {
+                    "fingerprint": fingerprint,
+                    "duration": round(duration, 3),
+                    "ran_at": ran_at,
+                }
+            )
+            + "\n"
+            for fingerprint, duration in durations.items()
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(descriptor, lines.encode())
+        finally:
+            os.close(descriptor)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Return the shard number, from 1, and the shard count of an i/n argument."""
+    try:
+        number, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not of the form i/n.") from None
+    if not 1 <= number <= count:
+        raise argparse.ArgumentTypeError(f"shard {number} is not between 1 and {count}.")
+    return number, count
+
+
+def hash_shard(test: TestPlan, count: int) -> int:
+    """Return the shard of a test, from 0, by a hash of its fingerprint.
+
+    The same test lands in the same shard on every machine and in every run,
+    wherever it is in the flow.
+    """
+    return int(hashlib.sha256(test.fingerprint.encode()).hexdigest()[:8], 16) % count
+
+
+def assign(tests: List[TestPlan], count: int, history: DurationHistory) -> Dict[int, int]:
+    """Return the shard of each test, from 0, by the test's index.
+
+    Without any history the tests are split by hash_shard. Otherwise the
+    longest tests are packed first, each into the shard with the least work so
+    far, so every shard finishes at about the same time. Tests without history
+    are expected to take as long as the average test with history.
+
+    Arguments:
+        tests -- every test of the flow
+        count -- number of shards
+        history -- the tests' past durations
+    """
+    known = [
+        history.durations[test.fingerprint]
+        for test in tests
+        if test.fingerprint in history.durations
+    ]
+    if not known:
+        return {test.index: hash_shard(test, count) for test in tests}
+    average = sum(known) / len(known)
+    durations = {
+        test.index: history.durations.get(test.fingerprint, average) for test in tests
+    }
+    loads = [(0.0, number) for number in range(count)]
+    shards = {}
+    for test in sorted(tests, key=lambda test: (-durations[test.index], test.index)):
+        load, number = heapq.heappop(loads)
+        shards[test.index] = number
+        heapq.heappush(loads, (load + durations[test.index], number))
+    return shards
+
+
+def shard(
+    tests: Iterable[TestPlan],
+    number: int,
+    count: int,
+    history: Optional[DurationHistory] = None,
+) -> Iterator[TestPlan]:
+    """Return the tests of one shard, in their order in the flow.
+
+    A list of tests is packed by duration, see assign. Every shard must pack
+    by the same history, or shards disagree on where a test goes and run it
+    twice or not at all. So only a history shared by all of them is packed by,
+    never the one each machine appends its own runs to. Without one, and for a
+    stream, which cannot be packed before it has been read, tests are split by
+    hash_shard.
+
+    Arguments:
+        tests -- every test of the flow, a list or a stream
+        number -- the shard to yield, from 1
+        count -- number of shards
+        history -- past durations given to every shard alike, or None
+    """
+    if history is not None and isinstance(tests, list):
+        shards = assign(tests, count, history)
+        return (test for test in tests if shards[test.index] == number - 1)
+    return (test for test in tests if hash_shard(test, count) == number - 1)
@@ -0,0 +1,128 @@
+"""Contains the PageState class for checking flows without a browser."""
+
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from lm_automator.flow_compiler import StateMismatch, TestPlan
+from lm_automator.runner import TestResult, format_result
+
+
+class SimulationError(Exception):
+    """Raised when a step cannot be applied to the simulated page."""
+
+
+class ComponentState(NamedTuple):
+    """A component on the simulated page.
+
+    Attributes:
+        name -- the component's name in the model
+        values -- the values written to its inputs, by input name
+    """
+
+    name: str
+    values: Dict[str, Any]
+
+
+class PageState:
+    """An in-memory model of the page a test runs on.
+
+    Regions hold their components in order, so a component's index is its
+    nth-child position like on the real page. Nothing is known about a layout
+    before a test changes it, so every layout starts out empty.
+    """
+
+    def __init__(self):
+        self.page: Optional[str] = None
+        self.layout: Optional[str] = None
+        self.regions: Dict[str, List[ComponentState]] = {}
+
+    def visit(self, page: str) -> None:
+        """Open a page, on its default layout."""
+        self.page = page
+        self.layout = None
+        self.regions = {}
+
+    def select_layout(self, layout: str) -> None:
+        """Switch the current page to a layout."""
+        self.layout = layout
+        self.regions = {}
+
+    def add(self, region_name: str, components: List[str]) -> None:
+        """Add components to the end of a region, in order.
+
+        Arguments:
+            region_name -- the region's name in the model
+            components -- names of the components to add
+        """
+        self.regions.setdefault(region_name, []).extend(
+            ComponentState(name, {}) for name in components
+        )
+
+    def component(
+        self, region_name: str, index: int, component_name: Optional[str] = None
+    ) -> ComponentState:
+        """Return the component at a position of a region.
+
+        Arguments:
+            region_name -- the region's name in the model
+            index -- the component's position in the region, starting at 1
+            component_name -- the component expected at the position, if any
+        """
+        components = self.regions.get(region_name, [])
+        if index > len(components):
+            raise SimulationError(
+                f"{region_name} has {len(components)} components, there is no"
+                f" component {index}."
+            )
+        component = components[index - 1]
+        if component_name is not None and component.name != component_name:
+            raise SimulationError(
+                f"component {index} of {region_name} is {component.name!r},"
+                f" not {component_name!r}."
+            )
+        return component
+
+    def remove(self, region_name: str, index: int) -> None:
+        """Delete the component at a position of a region, moving the ones after it up.
+
+        Arguments:
+            region_name -- the region's name in the model
+            index -- the component's position in the region, starting at 1
+        """
+        self.component(region_name, index)
+        del self.regions[region_name][index - 1]
+
+
+def simulate(test: TestPlan) -> TestResult:
+    """Apply a compiled test to a simulated page and return its result instead of raising.
+
+    Arguments:
+        test -- the compiled test
+    """
+    start_time = time.monotonic()
+    state = PageState()
+    for step in test.steps:
+        try:
+            step.simulate(state)
+        except (SimulationError, StateMismatch) as error:
+            return TestResult(
+                test.index,
+                "failed",
+                time.monotonic() - start_time,
+                f"{type(step).__name__}: {error}",
+            )
+    return TestResult(test.index, "passed", time.monotonic() - start_time)
+
+
+def run_simulated(tests: Iterable[TestPlan]) -> List[TestResult]:
+    """Simulate the tests one after another and print each result.
+
+    Arguments:
+        tests -- the compiled tests to check, a list or a stream
+    """
+    results = []
+    for test in tests:
+        result = simulate(test)
+        print(format_result(result), flush=True)
+        results.append(result)
+    return results
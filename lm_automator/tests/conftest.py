@@ -3,7 +3,8 @@ import pathlib
 import pytest
 
 from lm_automator.layout_manager import LayoutManager
-from lm_automator.common import DRIVER
+from lm_automator.common import SESSION
+from lm_automator.element_handler import ElementHandler
 
 
 @pytest.fixture(scope="class")
@@ -16,7 +17,7 @@ def login():
 
 @pytest.fixture(scope="class")
 def visit_test_site():
-    DRIVER.get(
+    ElementHandler.navigate(
         "file://"
         + str(pathlib.Path.cwd().joinpath("lm_automator", "tests", "test-site.html"))
     )
@@ -25,4 +26,4 @@ def visit_test_site():
 @pytest.fixture(scope="session", autouse=True)
 def close_browser():
     yield
-    DRIVER.quit()
+    SESSION.quit()
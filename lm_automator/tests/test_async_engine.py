@@ -0,0 +1,281 @@
+import asyncio
+import json
+import pathlib
+import shutil
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+
+from lm_automator import async_engine
+from lm_automator import flow_compiler
+from lm_automator.component import Component
+from lm_automator.inputs import Button, Text
+from lm_automator.page import Route
+
+
+class FakeDriverServer:
+    """Answers W3C commands over HTTP, with responses keyed by (method, path)."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.connections = 0
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode().split()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length)
+            self.requests.append((method, path, json.loads(body) if body else None))
+            status, value = self.responses[(method, path)]
+            data = json.dumps({"value": value}).encode()
+            writer.write(
+                f"HTTP/1.1 {status} OK\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                + data
+            )
+            await writer.drain()
+        writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+def run_with_server(responses, scenario):
+    async def main():
+        server = FakeDriverServer(responses)
+        driver = async_engine.AsyncWebDriver({}, port=await server.start())
+        try:
+            await driver.start()
+            return server, await scenario(driver)
+        finally:
+            await driver.quit()
+            server.server.close()
+
+    return asyncio.run(main())
+
+
+RESPONSES = {
+    ("POST", "/session"): (200, {"sessionId": "s1", "capabilities": {}}),
+    ("DELETE", "/session/s1"): (200, None),
+    ("POST", "/session/s1/url"): (200, None),
+    ("GET", "/session/s1/url"): (200, "about:blank"),
+    ("POST", "/session/s1/element"): (
+        404,
+        {"error": "no such element", "message": "Unable to locate element"},
+    ),
+}
+
+
+def test_commands_share_one_kept_alive_connection():
+    async def scenario(driver):
+        await driver.get("about:blank")
+        return await driver.current_url()
+
+    server, url = run_with_server(RESPONSES, scenario)
+    assert url == "about:blank"
+    assert server.connections == 1
+    assert server.requests[1] == ("POST", "/session/s1/url", {"url": "about:blank"})
+
+
+def test_w3c_errors_raise_the_matching_selenium_exception():
+    async def scenario(driver):
+        with pytest.raises(NoSuchElementException, match="Unable to locate element"):
+            await driver.find_element("#missing")
+
+    run_with_server(RESPONSES, scenario)
+
+
+def test_get_element_times_out_when_the_element_never_appears(monkeypatch):
+    monkeypatch.setattr(async_engine.AsyncElementHandler, "timeout", 0.2)
+
+    async def scenario(driver):
+        with pytest.raises(TimeoutException):
+            await async_engine.AsyncElementHandler(driver).get_element("#missing")
+
+    run_with_server(RESPONSES, scenario)
+
+
+def test_css_string_escapes_quotes_and_backslashes():
+    assert async_engine.css_string('say "hi" \\ bye') == '"say \\"hi\\" \\\\ bye"'
+
+
+class RecordingHandler(async_engine.AsyncElementHandler):
+    def __init__(self):
+        super().__init__(None)
+        self.calls = []
+
+    async def click(self, locator):
+        self.calls.append(("click", locator, self.timeout))
+
+    async def wait_until_ready(self, condition, target=None):
+        self.calls.append(("wait", condition.name, self.timeout))
+
+    async def perform_all(self, operations):
+        self.calls.append(("perform_all", len(operations), self.timeout))
+
+    async def _load(self, path, ready):
+        self.calls.append(("load", path, ready))
+
+
+def test_steps_load_a_routed_layout_directly_and_skip_selecting_it():
+    handler = RecordingHandler()
+    route = Route("/category", "/category#{layout}", ".ready")
+
+    async def scenario():
+        await flow_compiler.Visit("category", "my layout", route).run(handler)
+        await flow_compiler.SelectLayout("my layout").run(handler)
+
+    asyncio.run(scenario())
+    assert handler.calls == [("load", "/category#my%20layout", ".ready")]
+
+
+def test_steps_wait_with_the_timeout_of_their_component():
+    handler = RecordingHandler()
+    component = Component("[component]", 1, timeout=3)
+    step = flow_compiler.EditComponent("region", 1, "ad", component, [])
+    asyncio.run(step.run(handler))
+    assert {timeout for _, _, timeout in handler.calls} == {3}
+    assert handler.timeout == async_engine.AsyncElementHandler.timeout
+
+
+def test_steps_wait_with_the_timeout_of_their_inputs():
+    handler = RecordingHandler()
+    component = Component("[component]", 1, timeout=3)
+    actions = [
+        flow_compiler.InputAction("name", Text("[name]"), "set", "a"),
+        flow_compiler.InputAction("save", Button("[save]", timeout=7), "click"),
+    ]
+    step = flow_compiler.EditComponent("region", 1, "ad", component, actions)
+    asyncio.run(step.run(handler))
+    assert [call for call in handler.calls if call[0] == "perform_all"] == [
+        ("perform_all", 1, 3),
+        ("perform_all", 1, 7),
+    ]
+
+
+class UnstartableDriver:
+    async def start(self):
+        raise WebDriverException("geckodriver exited with code 1")
+
+    async def quit(self):
+        pass
+
+
+def test_run_concurrent_reports_tests_as_crashed_when_no_session_starts():
+    tests = [flow_compiler.TestPlan(index, "page", None, []) for index in range(3)]
+    results = asyncio.run(
+        async_engine.run_concurrent(
+            tests, 2, {"environment": "dev"}, "site", UnstartableDriver
+        )
+    )
+    assert [result.outcome for result in results] == ["crashed"] * 3
+
+
+class StartableDriver(UnstartableDriver):
+    async def start(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    "error", [OSError("connection reset"), asyncio.IncompleteReadError(b"", 10)]
+)
+def test_run_concurrent_reports_the_test_it_held_as_crashed_when_reset_fails(
+    monkeypatch, error
+):
+    async def restore_login(handler, base_url, entry):
+        return True
+
+    async def reset(handler, base_url):
+        raise error
+
+    monkeypatch.setattr(async_engine.AuthCache, "load", lambda self, environment, site: {})
+    monkeypatch.setattr(async_engine, "restore_login", restore_login)
+    monkeypatch.setattr(async_engine, "reset", reset)
+    tests = [flow_compiler.TestPlan(index, "page", None, []) for index in range(2)]
+    results = asyncio.run(
+        async_engine.run_concurrent(
+            tests, 1, {"environment": "dev"}, "site", StartableDriver
+        )
+    )
+    assert [result.index for result in results] == [0, 1]
+    assert [result.outcome for result in results] == ["crashed", "crashed"]
+    assert results[0].error.startswith("session 0: ")
+
+
+@pytest.mark.skipif(shutil.which("geckodriver") is None, reason="needs geckodriver")
+class TestAsyncElementHandler:
+    def run(self, scenario):
+        async def main():
+            driver = async_engine.AsyncWebDriver(
+                {"browserName": "firefox", "moz:firefoxOptions": {"args": ["-headless"]}}
+            )
+            await driver.start()
+            try:
+                handler = async_engine.AsyncElementHandler(driver)
+                await handler.navigate(
+                    pathlib.Path.cwd()
+                    .joinpath("lm_automator", "tests", "test-site.html")
+                    .as_uri()
+                )
+                return await scenario(handler)
+            finally:
+                await driver.quit()
+
+        return asyncio.run(main())
+
+    def test_perform_sets_text_checks_checkboxes_and_selects_options(self):
+        async def scenario(handler):
+            await handler.perform("#input", "set", "hello")
+            await handler.perform("#checkbox", "check", True)
+            await handler.perform("#select-1", "select", "saab")
+            return await handler.read_values(
+                {
+                    "text": ("#input", "text"),
+                    "checkbox": ("#checkbox", "checkbox"),
+                    "select": ("#select-1", "select"),
+                }
+            )
+
+        assert self.run(scenario) == {"text": "hello", "checkbox": True, "select": "saab"}
+
+    def test_click_clicks_an_enabled_button(self):
+        async def scenario(handler):
+            await handler.click("#button-1")
+
+        self.run(scenario)
+
+    def test_element_is_present_returns_false_for_a_missing_element(self):
+        async def scenario(handler):
+            handler.timeout = 0.2
+            return await handler.element_is_present("#i-do-not-exist")
+
+        assert self.run(scenario) is False
+
+    def test_sessions_run_concurrently_from_one_process(self):
+        async def main():
+            drivers = [
+                async_engine.AsyncWebDriver(
+                    {"browserName": "firefox", "moz:firefoxOptions": {"args": ["-headless"]}}
+                )
+                for _ in range(3)
+            ]
+            await asyncio.gather(*(driver.start() for driver in drivers))
+            try:
+                await asyncio.gather(*(driver.get("about:blank") for driver in drivers))
+                return len({driver.session_id for driver in drivers})
+            finally:
+                await asyncio.gather(*(driver.quit() for driver in drivers))
+
+        assert asyncio.run(main()) == 3
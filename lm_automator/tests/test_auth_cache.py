@@ -0,0 +1,61 @@
+import json
+import time
+
+import pytest
+
+from lm_automator.auth_cache import AuthCache
+
+
+def write_entry(cache, **entry):
+    cache.directory.mkdir(parents=True, exist_ok=True)
+    with open(cache.path("dev", "fox29"), "w") as file:
+        json.dump(
+            dict({"saved_at": time.time(), "cookies": [], "storage": {}}, **entry), file
+        )
+
+
+def test_load_returns_none_when_nothing_was_saved(tmp_path):
+    assert AuthCache(tmp_path).load("dev", "fox29") is None
+
+
+def test_load_returns_saved_entry(tmp_path):
+    cache = AuthCache(tmp_path)
+    write_entry(cache, cookies=[{"name": "sid", "value": "1"}])
+    assert cache.load("dev", "fox29")["cookies"] == [{"name": "sid", "value": "1"}]
+
+
+def test_load_returns_none_when_entry_is_older_than_max_age(tmp_path):
+    cache = AuthCache(tmp_path)
+    write_entry(cache, saved_at=time.time() - cache.max_age - 1)
+    assert cache.load("dev", "fox29") is None
+
+
+def test_load_returns_none_when_a_cookie_has_expired(tmp_path):
+    cache = AuthCache(tmp_path)
+    write_entry(cache, cookies=[{"name": "sid", "value": "1", "expiry": 1}])
+    assert cache.load("dev", "fox29") is None
+
+
+def test_load_is_keyed_by_environment_and_site(tmp_path):
+    cache = AuthCache(tmp_path)
+    write_entry(cache)
+    assert cache.load("prod", "fox29") is None
+    assert cache.load("dev", "fox5") is None
+
+
+def test_clear_removes_saved_entry(tmp_path):
+    cache = AuthCache(tmp_path)
+    write_entry(cache)
+    cache.clear("dev", "fox29")
+    assert cache.load("dev", "fox29") is None
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['{"saved_at": 1', '{"cookies": []}', '{"saved_at": 1, "cookies": [1], "storage": {}}', "[]"],
+)
+def test_load_deletes_an_entry_it_cannot_read(tmp_path, content):
+    cache = AuthCache(tmp_path)
+    cache.path("dev", "fox29").write_text(content)
+    assert cache.load("dev", "fox29") is None
+    assert not cache.path("dev", "fox29").exists()
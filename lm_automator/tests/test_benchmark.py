@@ -0,0 +1,52 @@
+import pytest
+
+from lm_automator.benchmark import Benchmark, compare, measure, percentile
+
+
+def test_percentile_returns_the_median_of_an_odd_number_of_samples():
+    assert percentile([3, 1, 2], 0.5) == 2
+
+
+def test_percentile_interpolates_between_ranks():
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+
+
+def test_percentile_of_a_single_sample_is_that_sample():
+    assert percentile([7], 0.99) == 7
+
+
+def test_measure_runs_setup_before_every_run():
+    calls = []
+    result = measure(
+        Benchmark("fake", lambda: calls.append("run"), lambda: calls.append("setup")),
+        3,
+    )
+    assert calls == ["setup", "run"] * 3
+    assert result["runs"] == 3
+    assert result["p50"] <= result["p95"] <= result["p99"]
+
+
+BASELINE = {"get_element": {"p50": 10.0, "p95": 20.0}}
+
+
+def test_compare_flags_benchmarks_slower_than_the_threshold():
+    [regression] = compare({"get_element": {"p50": 13.0, "p95": 20.0}}, BASELINE, 0.2)
+    assert regression.startswith("get_element p50")
+
+
+@pytest.mark.parametrize(
+    "results",
+    [
+        {"get_element": {"p50": 11.0, "p95": 23.0}},
+        {"get_element": {"p50": 5.0, "p95": 5.0}},
+        {"click_element": {"p50": 100.0, "p95": 100.0}},
+    ],
+)
+def test_compare_ignores_changes_within_the_threshold_and_new_benchmarks(results):
+    assert compare(results, BASELINE, 0.2) == []
+
+
+def test_compare_reports_slowdowns_from_a_zero_baseline_in_milliseconds():
+    baseline = {"get_element": {"p50": 0.0, "p95": 0.0}}
+    results = {"get_element": {"p50": 0.05, "p95": 2.0}}
+    assert compare(results, baseline, 0.2) == ["get_element p95: 0.00ms -> 2.00ms (+2.00ms)"]
@@ -0,0 +1,55 @@
+from lm_automator.common import DriverSession
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_session_does_not_launch_driver_until_first_use():
+    launched = []
+    session = DriverSession(lambda: launched.append(FakeDriver()) or launched[-1])
+    assert not session.started
+    assert launched == []
+
+
+def test_session_launches_driver_once_and_reuses_it():
+    launched = []
+    session = DriverSession(lambda: launched.append(FakeDriver()) or launched[-1])
+    assert session.driver is session.driver
+    assert len(launched) == 1
+
+
+def test_sessions_are_independent():
+    first = DriverSession(FakeDriver)
+    second = DriverSession(FakeDriver)
+    assert first.driver is not second.driver
+
+
+def test_quit_closes_driver_and_allows_relaunch():
+    session = DriverSession(FakeDriver)
+    driver = session.driver
+    session.quit()
+    assert driver.quit_called
+    assert not session.started
+    assert session.driver is not driver
+
+
+def test_session_is_at_a_page_and_layout_only_while_unchanged():
+    session = DriverSession(FakeDriver)
+    assert not session.at("category")
+    session.arrived("category", "entertainment")
+    assert session.at("category", "entertainment")
+    assert not session.at("category")
+    session.dirty = True
+    assert not session.at("category", "entertainment")
+
+
+def test_quit_forgets_the_page():
+    session = DriverSession(FakeDriver)
+    session.arrived("category")
+    session.quit()
+    assert session.page is None
@@ -2,7 +2,6 @@ import pytest
 
 from lm_automator.component import Component
 from lm_automator.element_handler import ElementHandler
-from lm_automator.common import DRIVER
 
 
 @pytest.mark.usefixtures("login")
@@ -42,7 +41,7 @@ class TestComponent:
 
     @classmethod
     def setup_method(cls):
-        DRIVER.refresh()
+        ElementHandler.refresh()
         ElementHandler.wait_for_element_to_disappear(
             f"{cls.region_locator} .overlay",
             reason="Loading overlay over region must be gone to add a component.",
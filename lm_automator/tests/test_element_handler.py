@@ -2,11 +2,17 @@ import timeit
 
 import pytest
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import TimeoutException, UnexpectedTagNameException
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedTagNameException,
+)
 from selenium.webdriver.support.ui import Select
 
-from lm_automator.common import DRIVER
-from lm_automator.element_handler import ElementHandler
+from lm_automator import element_handler
+from lm_automator.common import SESSION, DriverSession
+from lm_automator.element_handler import BudgetExceeded, ElementHandler
+from lm_automator.readiness import PAGE_CHANGED, PAGE_LOADED
 
 
 @pytest.mark.usefixtures("visit_test_site")
@@ -183,16 +189,234 @@ class TestElementHandler:
         ElementHandler.wait_for_timeout(reason="Testing.")
         assert int(timeit.default_timer() - start_time) == timeout
 
+    def test_wait_until_ready_method_returns_before_the_timeout_when_page_is_idle(self):
+        start_time = timeit.default_timer()
+        assert ElementHandler.wait_until_ready(PAGE_LOADED) is True
+        assert timeit.default_timer() - start_time < ElementHandler.timeout
+
+    def test_wait_until_ready_method_raises_when_the_page_never_becomes_idle(self):
+        SESSION.driver.execute_script(
+            "window.busy = setInterval(function () {"
+            " document.body.setAttribute('data-tick', Date.now()); }, 10);"
+        )
+        try:
+            with ElementHandler.waiting(timeout=0.5):
+                with pytest.raises(TimeoutException):
+                    ElementHandler.wait_until_ready(PAGE_LOADED)
+        finally:
+            SESSION.driver.execute_script("clearInterval(window.busy);")
+
+    def test_wait_until_ready_method_waits_for_the_page_to_change(self):
+        ElementHandler.wait_until_ready(PAGE_LOADED)
+        SESSION.driver.execute_script(
+            "setTimeout(function () { location.hash = 'changed'; }, 300);"
+        )
+        assert ElementHandler.wait_until_ready(PAGE_CHANGED) is True
+        assert SESSION.driver.current_url.endswith("#changed")
+
+    def test_run_batch_method_applies_every_operation_in_one_call(self):
+        ElementHandler.refresh()
+        results = ElementHandler.run_batch(
+            [
+                ("#input", "set", "batched"),
+                ("#select-3", "select", "blue"),
+                ("#checkbox", "check", True),
+                ("#button", "click", None),
+            ]
+        )
+        assert all(result.ok for result in results)
+        assert ElementHandler.get_element("#input").get_attribute("value") == "batched"
+        assert ElementHandler.get_element("#select-3").get_attribute("value") == "blue"
+        assert ElementHandler.get_element("#checkbox").is_selected()
+        assert ElementHandler.get_element("#button").text == "Hello"
+
+    def test_run_batch_method_stops_at_the_first_failure_and_skips_the_rest(self):
+        results = ElementHandler.run_batch(
+            [
+                ("#select-3", "select", "purple"),
+                ("#input", "set", "never"),
+            ]
+        )
+        assert [result.ok for result in results] == [False, False]
+        assert results[1].error == "skipped"
+
+    def test_perform_all_method_falls_back_to_single_operations(self):
+        with pytest.raises(TimeoutException):
+            ElementHandler.perform_all([("#button-2", "click", None)])
+
+    def test_get_element_method_returns_cached_element_on_repeated_lookups(self):
+        ElementHandler.invalidate_cache()
+        hits = ElementHandler.cache_stats()["hits"]
+        element = ElementHandler.get_element(".main-content")
+        assert ElementHandler.get_element(".main-content") is element
+        assert ElementHandler.cache_stats()["hits"] == hits + 1
+
+    def test_refresh_method_invalidates_cached_elements(self):
+        element = ElementHandler.get_element(".main-content")
+        ElementHandler.refresh()
+        assert ElementHandler.get_element(".main-content") is not element
+
+    def test_with_element_method_looks_up_stale_element_again(self):
+        ElementHandler.get_element("#input")
+        SESSION.driver.execute_script(
+            "var input = document.querySelector('#input');"
+            "input.replaceWith(input.cloneNode());"
+        )
+        stale = ElementHandler.cache_stats()["stale"]
+        assert ElementHandler.with_element("#input", lambda element: element.tag_name) == "input"
+        assert ElementHandler.cache_stats()["stale"] == stale + 1
+
+    def test_read_values_method_returns_every_input_value_in_one_call(self):
+        ElementHandler.refresh()
+        ElementHandler.send_keys_to_element("#input", "snapshot")
+        ElementHandler.select_value_from_element("#select-3", "green")
+        assert ElementHandler.read_values(
+            {
+                "text": ("#input", "text"),
+                "checkbox": ("#checkbox", "checkbox"),
+                "select": ("#select-3", "select"),
+                "missing": ("#i-do-not-exist", "text"),
+            }
+        ) == {"text": "snapshot", "checkbox": False, "select": "green", "missing": None}
+
     def test_drag_element_to_element_method_drags_correct_element_to_target_element(
         self,
     ):
-        DRIVER.refresh()
+        ElementHandler.refresh()
         ElementHandler.drag_element_to_element("#draggable", "#drop-zone")
         assert ElementHandler.get_element("#drop-zone").text == "Dropped!"
 
     def test_drag_element_by_offset_method_drags_correct_element_to_target_element(
         self,
     ):
-        DRIVER.refresh()
+        ElementHandler.refresh()
         ElementHandler.drag_element_by_offset("#draggable", 100, 100)
         assert ElementHandler.get_element("#drop-zone").text == "Dropped!"
+
+    def test_waiting_uses_the_given_timeout_inside_the_context_only(self):
+        with ElementHandler.waiting(timeout=0.5, poll=0.1):
+            assert timeit.timeit(
+                lambda: ElementHandler.element_is_present("#i-do-not-exist"), number=1
+            ) < 1.5
+        assert ElementHandler.timeout == 5
+        assert ElementHandler.poll == 0.5
+
+    def test_budget_cuts_waits_short_then_raises_budget_exceeded(self):
+        with ElementHandler.budget(0.5):
+            with pytest.raises(TimeoutException):
+                ElementHandler.get_element("#i-do-not-exist")
+            with pytest.raises(BudgetExceeded):
+                ElementHandler.get_element("#i-do-not-exist")
+        assert ElementHandler.deadline is None
+
+    def test_get_element_method_resolves_as_soon_as_a_late_element_is_added(self):
+        SESSION.driver.execute_script(
+            "setTimeout(function () {"
+            " var element = document.createElement('div');"
+            " element.id = 'late'; document.body.appendChild(element); }, 200);"
+        )
+        assert timeit.timeit(lambda: ElementHandler.get_element("#late"), number=1) < 0.5
+
+    def test_click_element_method_waits_for_a_disabled_element_to_be_enabled(self):
+        SESSION.driver.execute_script(
+            "var button = document.querySelector('#button-2');"
+            "setTimeout(function () { button.disabled = false; }, 200);"
+        )
+        ElementHandler.click_element("#button-2")
+        ElementHandler.refresh()
+
+    def test_poll_wait_mode_waits_with_webdriver_wait(self, monkeypatch):
+        monkeypatch.setattr(ElementHandler, "wait_mode", "poll")
+        assert isinstance(ElementHandler.get_element(".main-content"), WebElement)
+        with pytest.raises(TimeoutException):
+            ElementHandler.get_element(".i-do-not-exist")
+
+
+class FailingScriptDriver:
+    def __init__(self):
+        self.script_timeouts = []
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        raise TimeoutException("script timeout")
+
+
+def test_run_batch_restores_the_script_timeout_after_a_long_batch(monkeypatch):
+    driver = FailingScriptDriver()
+    monkeypatch.setattr(ElementHandler, "session", DriverSession(lambda: driver))
+    with pytest.raises(TimeoutException):
+        ElementHandler.run_batch([("#input", "set", "text")] * 10)
+    assert driver.script_timeouts == [10 * ElementHandler.timeout + 1, 30]
+
+
+class TimedOutBatchDriver(FailingScriptDriver):
+    def execute_async_script(self, script, *args):
+        return [[False, "Timed out waiting for #button-2", ElementHandler.timeout - 1]]
+
+
+def test_perform_all_gives_the_failed_operation_only_the_time_left(monkeypatch):
+    timeouts = []
+    monkeypatch.setattr(ElementHandler, "session", DriverSession(TimedOutBatchDriver))
+    monkeypatch.setattr(
+        ElementHandler, "perform", lambda *operation: timeouts.append(ElementHandler.timeout)
+    )
+    ElementHandler.perform_all([("#button-2", "click", None), ("#button", "click", None)])
+    assert timeouts == [1, ElementHandler.timeout]
+
+
+class FindingDriver:
+    def __init__(self):
+        self.lookups = []
+
+    def find_element(self, by, value):
+        self.lookups.append(value)
+        return object()
+
+
+@pytest.mark.parametrize(
+    "locator, lookups",
+    [(".region", 1), (".region [component]:nth-child(2) .input", 2), ("li:first-child", 2)],
+)
+def test_get_element_only_caches_locators_that_do_not_depend_on_position(
+    monkeypatch, locator, lookups
+):
+    driver = FindingDriver()
+    monkeypatch.setattr(ElementHandler, "session", DriverSession(lambda: driver))
+    monkeypatch.setattr(ElementHandler, "wait_mode", "poll")
+    ElementHandler.invalidate_cache()
+    ElementHandler.get_element(locator)
+    ElementHandler.get_element(locator)
+    ElementHandler.invalidate_cache()
+    assert len(driver.lookups) == lookups
+
+
+class StaleOnceActionChains:
+    dragged = []
+
+    def __init__(self, driver):
+        pass
+
+    def drag_and_drop_by_offset(self, element, x_offset, y_offset):
+        self.element = element
+        return self
+
+    def perform(self):
+        if not StaleOnceActionChains.dragged:
+            StaleOnceActionChains.dragged.append(None)
+            raise StaleElementReferenceException("re-rendered")
+        StaleOnceActionChains.dragged.append(self.element)
+
+
+def test_drag_element_by_offset_looks_up_a_stale_cached_element_again(monkeypatch):
+    driver = FindingDriver()
+    monkeypatch.setattr(ElementHandler, "session", DriverSession(lambda: driver))
+    monkeypatch.setattr(ElementHandler, "wait_mode", "poll")
+    monkeypatch.setattr(element_handler, "ActionChains", StaleOnceActionChains)
+    ElementHandler.invalidate_cache()
+    ElementHandler.get_element(".handle")
+    ElementHandler.drag_element_by_offset(".handle", 10, 0)
+    ElementHandler.invalidate_cache()
+    assert len(driver.lookups) == 2
+    assert StaleOnceActionChains.dragged[-1] is not None
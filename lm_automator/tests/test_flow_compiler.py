@@ -0,0 +1,502 @@
+import copy
+import pathlib
+import pickle
+
+import pytest
+
+from lm_automator import flow_compiler
+from lm_automator.component import Component
+from lm_automator.element_handler import ElementHandler
+from lm_automator.flow_compiler import FlowCompiler, FlowError, load_plan
+from lm_automator.inputs import Select
+from lm_automator.page import Route
+
+EXAMPLES = pathlib.Path(__file__).parent.parent.joinpath("examples")
+
+MODEL_DATA = {
+    "menus": {"page-1": {"region-1": ["component-1", "component-2"]}},
+    "regions": {"region-1": {"locator": "region-1-locator"}},
+    "components": {
+        "locator": "component-locator",
+        "component-1": {
+            "input-1": {"type": "text", "locator": "input-1-locator"},
+            "input-2": {"type": "button", "locator": "input-2-locator"},
+            "input-3": {"type": "checkbox", "locator": "input-3-locator"},
+            "input-4": {"type": "select", "locator": "input-4-locator"},
+        },
+    },
+}
+
+COMPILER = FlowCompiler(MODEL_DATA)
+
+
+def flow(*steps, **test):
+    return {"site": "fox29", "tests": [dict({"page": "page-1", "steps": list(steps)}, **test)]}
+
+
+def test_compile_starts_each_test_with_navigation():
+    plan = COMPILER.compile(flow(layout="layout-1"))
+    assert plan.tests[0].steps == [
+        flow_compiler.Visit("page-1", "layout-1"),
+        flow_compiler.SelectLayout("layout-1"),
+    ]
+
+
+def test_compile_resolves_add_components_region():
+    step = COMPILER.compile(
+        flow({"action": "add-components", "region": "region-1", "components": ["component-2"]})
+    ).tests[0].steps[1]
+    assert isinstance(step, flow_compiler.AddComponents)
+    assert step.region.locator == "region-1-locator"
+    assert step.components == ["component-2"]
+
+
+def test_compile_resolves_edit_component_inputs():
+    step = COMPILER.compile(
+        flow(
+            {
+                "action": "edit-component",
+                "region": "region-1",
+                "index": 2,
+                "component": "component-1",
+                "steps": [{"action": "select", "input": "input-4", "value": "a"}],
+            }
+        )
+    ).tests[0].steps[1]
+    assert step.component.locator == "region-1-locator component-locator:nth-child(2)"
+    assert isinstance(step.actions[0].input, Select)
+    assert step.actions[0].value == "a"
+
+
+def test_compile_resolves_assert_state_component_inputs():
+    step = COMPILER.compile(
+        flow(
+            {
+                "action": "assert-state",
+                "region": "region-1",
+                "index": 1,
+                "component": "component-1",
+                "expected": {"input-1": 5, "input-3": True},
+            }
+        )
+    ).tests[0].steps[1]
+    assert step.component.inputs["input-4"] == ("select", "input-4-locator")
+    assert step.expected == {"input-1": "5", "input-3": True}
+
+
+class FakeComponent:
+    def snapshot(self):
+        return {"input-1": "hello", "input-3": False}
+
+
+def test_assert_state_passes_when_every_expected_value_matches():
+    flow_compiler.AssertState(
+        "region-1", 1, "component-1", FakeComponent(), {"input-1": "hello"}
+    ).execute()
+
+
+def test_assert_state_reports_every_mismatch():
+    step = flow_compiler.AssertState(
+        "region-1",
+        1,
+        "component-1",
+        FakeComponent(),
+        {"input-1": "bye", "input-3": True},
+    )
+    with pytest.raises(flow_compiler.StateMismatch, match="input-1.*input-3"):
+        step.execute()
+
+
+def test_edit_component_waits_with_the_timeout_of_each_input(monkeypatch):
+    model_data = copy.deepcopy(MODEL_DATA)
+    model_data["components"]["component-1"]["input-2"].update(timeout=7, poll=0.2)
+    step = FlowCompiler(model_data).compile(
+        flow(
+            {
+                "action": "edit-component",
+                "region": "region-1",
+                "index": 1,
+                "component": "component-1",
+                "steps": [
+                    {"action": "set", "input": "input-1", "value": "a"},
+                    {"action": "click", "input": "input-2"},
+                    {"action": "check", "input": "input-3", "value": True},
+                ],
+            }
+        )
+    ).tests[0].steps[1]
+    calls = []
+    monkeypatch.setattr(Component, "edit", lambda self: None)
+
+    def perform_all(operations):
+        actions = [action for _, action, _ in operations]
+        calls.append((actions, ElementHandler.timeout, ElementHandler.poll))
+
+    monkeypatch.setattr(ElementHandler, "perform_all", perform_all)
+    step.execute()
+    default = (ElementHandler.timeout, ElementHandler.poll)
+    assert calls == [
+        (["set"], *default),
+        (["click"], 7, 0.2),
+        (["check"], *default),
+    ]
+
+
+@pytest.mark.parametrize(
+    "step, message",
+    [
+        ({"action": "fly"}, "unknown action"),
+        ({"action": "add-components", "region": "nowhere", "components": []}, "unknown region"),
+        (
+            {"action": "add-components", "region": "region-1", "components": ["component-9"]},
+            "not in the menu",
+        ),
+        ({"action": "remove-component", "region": "region-1", "index": 0}, "index"),
+        (
+            {"action": "edit-component", "region": "region-1", "index": 1, "component": "component-9", "steps": []},
+            "unknown component",
+        ),
+        (
+            {
+                "action": "edit-component",
+                "region": "region-1",
+                "index": 1,
+                "component": "component-1",
+                "steps": [{"action": "click", "input": "input-9"}],
+            },
+            "has no input",
+        ),
+        (
+            {
+                "action": "edit-component",
+                "region": "region-1",
+                "index": 1,
+                "component": "component-1",
+                "steps": [{"action": "check", "input": "input-1", "value": True}],
+            },
+            "cannot check",
+        ),
+        (
+            {
+                "action": "assert-state",
+                "region": "region-1",
+                "index": 1,
+                "component": "component-1",
+                "expected": {"input-2": True},
+            },
+            "has no state",
+        ),
+    ],
+)
+def test_compile_raises_flow_error_for_invalid_steps(step, message):
+    with pytest.raises(FlowError, match=message):
+        COMPILER.compile(flow(step))
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (lambda model: model.pop("components"), "mapping of components"),
+        (lambda model: model["regions"].update({"region-2": {}}), "'region-2' .* locator"),
+        (
+            lambda model: model["components"]["component-1"]["input-1"].pop("type"),
+            "'input-1' of component 'component-1' must have a type",
+        ),
+        (
+            lambda model: model["components"]["component-1"]["input-1"].update(type="radio"),
+            "must have a type of text, button, select, checkbox",
+        ),
+    ],
+)
+def test_compiler_raises_flow_error_for_invalid_models(change, message):
+    model_data = copy.deepcopy(MODEL_DATA)
+    change(model_data)
+    with pytest.raises(FlowError, match=message):
+        FlowCompiler(model_data)
+
+
+def test_load_plan_compiles_the_examples():
+    plan = load_plan(
+        EXAMPLES.joinpath("flow.yml"),
+        EXAMPLES.joinpath("models.yml"),
+        cache_dir=None,
+        model_cache_dir=None,
+    )
+    assert plan.site == "fox29"
+    assert len(plan.tests[0].steps) == 6
+
+
+def test_load_plan_reuses_the_cached_plan(tmp_path):
+    args = (EXAMPLES.joinpath("flow.yml"), EXAMPLES.joinpath("models.yml"))
+    load_plan(*args, cache_dir=tmp_path, model_cache_dir=None)
+    [cache_file] = tmp_path.iterdir()
+    cache_file.write_bytes(pickle.dumps(flow_compiler.Plan("cached", [])))
+    assert load_plan(*args, cache_dir=tmp_path, model_cache_dir=None).site == "cached"
+
+
+@pytest.mark.parametrize(
+    "content", [b"not a pickle", pickle.dumps({"site": "cached"}), b"\x80\x05garbage"]
+)
+def test_load_plan_compiles_again_when_the_cache_cannot_be_read(tmp_path, content):
+    args = (EXAMPLES.joinpath("flow.yml"), EXAMPLES.joinpath("models.yml"))
+    load_plan(*args, cache_dir=tmp_path, model_cache_dir=None)
+    [cache_file] = tmp_path.iterdir()
+    cache_file.write_bytes(content)
+    assert load_plan(*args, cache_dir=tmp_path, model_cache_dir=None).site == "fox29"
+
+
+def test_stream_plan_compiles_the_same_tests_as_load_plan():
+    args = (EXAMPLES.joinpath("flow.yml"), EXAMPLES.joinpath("models.yml"))
+    site, tests = flow_compiler.stream_plan(*args, model_cache_dir=None)
+    plan = load_plan(*args, cache_dir=None, model_cache_dir=None)
+    assert site == plan.site
+    # Widgets compare by identity, so compare what each step is and targets.
+    assert [
+        (test.page, test.layout, [(type(step), step[0]) for step in test.steps])
+        for test in tests
+    ] == [
+        (test.page, test.layout, [(type(step), step[0]) for step in test.steps])
+        for test in plan.tests
+    ]
+
+
+def test_flow_reader_reads_the_site_before_any_test(tmp_path):
+    flow_file = tmp_path.joinpath("flow.yml")
+    flow_file.write_text("site: fox29\ntests:\n  - page: one\n  - [not, valid\n")
+    reader = flow_compiler.FlowReader(flow_file)
+    tests = reader.tests()
+    assert reader.site == "fox29"
+    assert next(tests) == {"page": "one"}
+    with pytest.raises(FlowError):
+        next(tests)
+
+
+def test_flow_reader_raises_flow_error_for_keys_after_the_tests(tmp_path):
+    flow_file = tmp_path.joinpath("flow.yml")
+    flow_file.write_text("site: fox29\ntests:\n  - page: one\nbudget: 10\n")
+    tests = flow_compiler.FlowReader(flow_file).tests()
+    assert next(tests) == {"page": "one"}
+    with pytest.raises(FlowError, match="'budget' must come before the tests"):
+        next(tests)
+
+
+def test_compile_raises_flow_error_for_keys_after_the_tests():
+    with pytest.raises(FlowError, match="'budget' must come before the tests"):
+        COMPILER.compile(dict(flow(), budget=10))
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("tests: []\nsite: fox29\n", "site must come before the tests"),
+        ("site: fox29\n", "list of tests"),
+        ("- site\n", "mapping with a site"),
+    ],
+)
+def test_flow_reader_raises_flow_error_for_invalid_headers(tmp_path, text, message):
+    flow_file = tmp_path.joinpath("flow.yml")
+    flow_file.write_text(text)
+    with pytest.raises(FlowError, match=message):
+        flow_compiler.FlowReader(flow_file)
+
+
+def test_load_model_returns_the_cached_model_while_the_file_is_unchanged(tmp_path):
+    model_file = tmp_path.joinpath("models.yml")
+    model_file.write_text("components: {}\n")
+    cache_dir = tmp_path.joinpath("cache")
+    assert flow_compiler.load_model(model_file, cache_dir) == {"components": {}}
+    [cache_file] = cache_dir.iterdir()
+    cached = pickle.loads(cache_file.read_bytes())
+    cache_file.write_bytes(pickle.dumps(dict(cached, data={"cached": True})))
+    assert flow_compiler.load_model(model_file, cache_dir) == {"cached": True}
+
+
+@pytest.mark.parametrize("content", [b"\x80\x05garbage", pickle.dumps({"data": {}})])
+def test_load_model_parses_the_file_again_when_the_cache_cannot_be_read(tmp_path, content):
+    model_file = tmp_path.joinpath("models.yml")
+    model_file.write_text("components: {}\n")
+    cache_dir = tmp_path.joinpath("cache")
+    flow_compiler.load_model(model_file, cache_dir)
+    [cache_file] = cache_dir.iterdir()
+    cache_file.write_bytes(content)
+    assert flow_compiler.load_model(model_file, cache_dir) == {"components": {}}
+
+
+def test_load_model_parses_the_file_again_once_it_changes(tmp_path):
+    model_file = tmp_path.joinpath("models.yml")
+    model_file.write_text("components: {}\n")
+    cache_dir = tmp_path.joinpath("cache")
+    flow_compiler.load_model(model_file, cache_dir)
+    model_file.write_text("regions: {}\n")
+    assert flow_compiler.load_model(model_file, cache_dir) == {"regions": {}}
+
+
+def test_load_model_keeps_the_cached_model_when_only_the_modification_time_changed(
+    tmp_path,
+):
+    model_file = tmp_path.joinpath("models.yml")
+    model_file.write_text("components: {}\n")
+    cache_dir = tmp_path.joinpath("cache")
+    flow_compiler.load_model(model_file, cache_dir)
+    [cache_file] = cache_dir.iterdir()
+    cached = pickle.loads(cache_file.read_bytes())
+    cache_file.write_bytes(
+        pickle.dumps(dict(cached, stat=(0, 0), data={"cached": True}))
+    )
+    assert flow_compiler.load_model(model_file, cache_dir) == {"cached": True}
+
+
+def fingerprints(model_data, flow_data):
+    return [test.fingerprint for test in FlowCompiler(model_data).compile(flow_data).tests]
+
+
+def test_fingerprint_changes_only_for_tests_using_a_changed_model_entry():
+    flow_data = {
+        "site": "site",
+        "tests": [
+            {
+                "page": "page-1",
+                "steps": [
+                    {
+                        "action": "add-components",
+                        "region": "region-1",
+                        "components": ["component-1"],
+                    }
+                ],
+            },
+            {
+                "page": "page-1",
+                "steps": [
+                    {
+                        "action": "edit-component",
+                        "region": "region-1",
+                        "index": 1,
+                        "component": "component-1",
+                        "steps": [{"action": "click", "input": "input-2"}],
+                    }
+                ],
+            },
+        ],
+    }
+    before = fingerprints(MODEL_DATA, flow_data)
+    model_data = copy.deepcopy(MODEL_DATA)
+    model_data["components"]["component-1"]["input-2"]["locator"] = "changed"
+    after = fingerprints(model_data, flow_data)
+    assert after[0] == before[0]
+    assert after[1] != before[1]
+
+
+def test_fingerprint_does_not_depend_on_the_position_of_the_test():
+    test = {"page": "page-1", "steps": []}
+    first, second = fingerprints(MODEL_DATA, {"site": "site", "tests": [test, test]})
+    assert first == second
+
+
+@pytest.mark.parametrize("changes", [{"site": "other"}, {"budget": 5}])
+def test_fingerprint_changes_with_the_site_and_the_budget(changes):
+    tests = [{"page": "page-1", "steps": []}]
+    changed = dict({"site": "site"}, **changes, tests=tests)
+    assert fingerprints(MODEL_DATA, changed) != fingerprints(
+        MODEL_DATA, {"site": "site", "tests": tests}
+    )
+
+
+def test_compile_applies_the_flow_budget_unless_a_test_sets_its_own():
+    plan = COMPILER.compile(
+        {
+            "site": "fox29",
+            "budget": 60,
+            "tests": [
+                {"page": "page-1", "steps": []},
+                {"page": "page-1", "steps": [], "budget": 5},
+            ],
+        }
+    )
+    assert [test.budget for test in plan.tests] == [60, 5]
+
+
+def test_compile_raises_flow_error_for_an_invalid_budget():
+    with pytest.raises(FlowError, match="budget must be"):
+        COMPILER.compile(flow(budget=0))
+
+
+def add(*components):
+    return {"action": "add-components", "region": "region-1", "components": list(components)}
+
+
+def edit(*steps, index=1):
+    return {
+        "action": "edit-component",
+        "region": "region-1",
+        "index": index,
+        "component": "component-1",
+        "steps": list(steps),
+    }
+
+
+SET = {"action": "set", "input": "input-1", "value": "a"}
+CLICK = {"action": "click", "input": "input-2"}
+CHECK = {"action": "check", "input": "input-3", "value": True}
+
+
+def test_optimize_merges_adjacent_adds_to_the_same_region():
+    test = COMPILER.compile(flow(add("component-1"), add("component-2"))).tests[0]
+    assert [type(step) for step in test.steps] == [
+        flow_compiler.Visit,
+        flow_compiler.AddComponents,
+    ]
+    assert test.steps[1].components == ["component-1", "component-2"]
+    assert test.savings == flow_compiler.Savings(1, 2)
+
+
+def test_optimize_merges_consecutive_edits_of_the_same_component_only():
+    test = COMPILER.compile(flow(edit(SET), edit(CHECK), edit(SET, index=2))).tests[0]
+    assert [
+        [action.input_name for action in step.actions] for step in test.steps[1:]
+    ] == [["input-1", "input-3"], ["input-1"]]
+    assert test.savings == flow_compiler.Savings(1, 2)
+
+
+def test_optimize_drops_writes_of_the_value_an_input_already_holds():
+    assert_state = {
+        "action": "assert-state",
+        "region": "region-1",
+        "index": 1,
+        "component": "component-1",
+        "expected": {"input-1": "a"},
+    }
+    test = COMPILER.compile(flow(edit(SET, CHECK), assert_state, edit(SET, CHECK))).tests[0]
+    assert [type(step) for step in test.steps] == [
+        flow_compiler.Visit,
+        flow_compiler.EditComponent,
+        flow_compiler.AssertState,
+    ]
+    assert test.savings == flow_compiler.Savings(3, 2)
+
+
+def test_optimize_forgets_written_values_after_a_click_or_a_removal():
+    remove = {"action": "remove-component", "region": "region-1", "index": 1}
+    test = COMPILER.compile(flow(edit(SET, CLICK, SET), remove, edit(SET))).tests[0]
+    assert [len(test.steps[1].actions), len(test.steps[3].actions)] == [3, 1]
+    assert test.savings == flow_compiler.Savings()
+
+
+def test_compile_keeps_every_step_without_optimizing():
+    compiler = FlowCompiler(MODEL_DATA, optimize=False)
+    test = compiler.compile(flow(add("component-1"), add("component-2"))).tests[0]
+    assert len(test.steps) == 3
+    assert test.savings == flow_compiler.Savings()
+
+
+def test_compile_gives_visits_the_route_of_their_page():
+    model_data = dict(MODEL_DATA, pages={"page-1": {"url": "/page-1", "ready": ".ready"}})
+    visit = FlowCompiler(model_data).compile(flow(layout="layout-1")).tests[0].steps[0]
+    assert visit == flow_compiler.Visit(
+        "page-1", "layout-1", Route("/page-1", None, ".ready")
+    )
+
+
+def test_compile_raises_flow_error_for_an_invalid_route():
+    model_data = dict(MODEL_DATA, pages={"page-1": {"path": "/page-1"}})
+    with pytest.raises(FlowError, match="the route of page 'page-1'"):
+        FlowCompiler(model_data).compile(flow())
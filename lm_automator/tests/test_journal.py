@@ -0,0 +1,43 @@
+from lm_automator import runner
+from lm_automator.journal import Journal, flow_hash
+
+
+def test_passed_returns_the_tests_whose_latest_result_passed(tmp_path):
+    journal = Journal("flow", tmp_path.joinpath("journal.jsonl"))
+    journal.start()
+    journal.record(runner.TestResult(0, "passed", 1.0))
+    journal.record(runner.TestResult(1, "passed", 1.0))
+    journal.record(runner.TestResult(2, "failed", 1.0))
+    journal.record(runner.TestResult(1, "crashed", 1.0))
+    assert journal.passed() == {0}
+
+
+def test_a_fresh_run_forgets_earlier_results(tmp_path):
+    journal = Journal("flow", tmp_path.joinpath("journal.jsonl"))
+    journal.record(runner.TestResult(0, "passed", 1.0))
+    journal.start()
+    journal.record(runner.TestResult(1, "passed", 1.0))
+    assert journal.passed() == {1}
+
+
+def test_results_of_other_flows_are_ignored(tmp_path):
+    path = tmp_path.joinpath("journal.jsonl")
+    Journal("other", path).record(runner.TestResult(0, "passed", 1.0))
+    assert Journal("flow", path).passed() == set()
+
+
+def test_a_line_cut_short_is_skipped(tmp_path):
+    journal = Journal("flow", tmp_path.joinpath("journal.jsonl"))
+    journal.record(runner.TestResult(0, "passed", 1.0))
+    with open(journal.path, "a") as file:
+        file.write('{"flow_hash": "flow", "ind')
+    assert journal.passed() == {0}
+
+
+def test_flow_hash_changes_with_either_file(tmp_path):
+    flow_file, model_file = tmp_path.joinpath("flow.yml"), tmp_path.joinpath("models.yml")
+    flow_file.write_text("site: one")
+    model_file.write_text("components: {}")
+    before = flow_hash(flow_file, model_file)
+    model_file.write_text("components: {a: {}}")
+    assert flow_hash(flow_file, model_file) != before
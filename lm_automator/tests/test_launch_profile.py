@@ -0,0 +1,43 @@
+import pytest
+
+from lm_automator.common import LaunchProfile
+
+
+def test_default_profile_sets_no_preferences():
+    assert LaunchProfile().preferences() == {}
+
+
+def test_default_profile_launches_headed_with_normal_page_load_strategy():
+    options = LaunchProfile().options()
+    assert "-headless" not in options.arguments
+    assert options.page_load_strategy == "normal"
+
+
+def test_from_config_applies_launch_options():
+    options = LaunchProfile.from_config(
+        {"headless": True, "page_load_strategy": "eager", "window_size": [1280, 800]}
+    ).options()
+    assert options.arguments == ["-headless", "--width=1280", "--height=800"]
+    assert options.page_load_strategy == "eager"
+
+
+def test_from_config_accepts_a_missing_browser_section():
+    assert LaunchProfile.from_config(None).preferences() == {}
+
+
+def test_from_config_raises_for_an_unknown_option_by_name():
+    with pytest.raises(ValueError, match="Unknown browser option 'headles'"):
+        LaunchProfile.from_config({"headles": True})
+
+
+def test_resource_options_set_firefox_preferences():
+    preferences = LaunchProfile(
+        disable_images=True,
+        disable_fonts=True,
+        disable_media=True,
+        disable_animations=True,
+    ).preferences()
+    assert preferences["permissions.default.image"] == 2
+    assert preferences["gfx.downloadable_fonts.enabled"] is False
+    assert preferences["media.autoplay.default"] == 5
+    assert preferences["general.smoothScroll"] is False
@@ -0,0 +1,53 @@
+import pathlib
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from lm_automator.auth_cache import AuthCache
+from lm_automator.common import SESSION
+from lm_automator.element_handler import ElementHandler
+from lm_automator.layout_manager import LayoutManager
+
+
+LOGIN_PAGE = "file://" + str(
+    pathlib.Path.cwd().joinpath("lm_automator", "tests", "test-login.html")
+)
+
+
+@pytest.fixture
+def layout_manager(tmp_path):
+    layout_manager = LayoutManager(
+        environment="dev",
+        site="fox29",
+        session=SESSION,
+        auth_cache=AuthCache(tmp_path),
+    )
+    layout_manager.base_url = LOGIN_PAGE
+    layout_manager.restore_path = ""
+    ElementHandler.navigate(LOGIN_PAGE)
+    SESSION.driver.execute_script("localStorage.clear();")
+    yield layout_manager
+    SESSION.driver.execute_script("localStorage.clear();")
+
+
+class TestLayoutManager:
+    def test_login_saves_the_session_to_the_auth_cache(self, layout_manager):
+        layout_manager.login("username", "password", interactive=False)
+        assert layout_manager.auth_cache.load("dev", "fox29") is not None
+
+    def test_login_restores_a_saved_session_without_the_login_form(
+        self, layout_manager
+    ):
+        layout_manager.login("username", "password", interactive=False)
+        SESSION.driver.execute_script("localStorage.clear();")
+        ElementHandler.refresh()
+        layout_manager.login("username", "password", interactive=False)
+        assert ElementHandler.element_is_present(".main-sidebar")
+        assert SESSION.driver.find_elements(By.CSS_SELECTOR, ".login") == []
+
+    def test_restore_login_returns_false_when_the_saved_session_has_expired(
+        self, layout_manager
+    ):
+        layout_manager.login("username", "password", interactive=False)
+        layout_manager.auth_cache.max_age = 0
+        assert layout_manager.restore_login() is False
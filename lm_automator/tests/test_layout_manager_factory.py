@@ -1,3 +1,5 @@
+import pytest
+
 from lm_automator.layout_manager_factory import LayoutManagerFactory
 
 from lm_automator.region import Region
@@ -90,3 +92,55 @@ def test_get_component_returns_component_object_with_expected_position():
 
 def test_get_component_returns_component_object_with_expected_locator():
     assert COMPONENT.locator == "region-1-locator component-locator:nth-child(1)"
+
+
+def test_get_region_returns_the_same_instance_for_the_same_arguments():
+    assert FACTORY.get_region(region_name="region-1", page_name="page-1") is REGION
+
+
+def test_get_input_returns_the_same_instance_for_the_same_arguments():
+    assert FACTORY.get_input("region-1", "component-1", "input-1") is FACTORY.get_input(
+        "region-1", "component-1", "input-1"
+    )
+
+
+def test_get_component_returns_the_same_instance_for_the_same_arguments():
+    assert FACTORY.get_component(region_name="region-1", position=1) is COMPONENT
+
+
+def test_widgets_do_not_have_an_instance_dict():
+    input_ = FACTORY.get_input("region-1", "component-1", "input-1")
+    assert not any(hasattr(widget, "__dict__") for widget in (REGION, COMPONENT, input_))
+
+
+def test_get_input_raises_key_error_for_unknown_input():
+    with pytest.raises(KeyError):
+        FACTORY.get_input("region-1", "component-1", "input-9")
+
+
+def test_widgets_inherit_timeouts_from_their_region_and_component():
+    factory = LayoutManagerFactory(
+        {
+            "menus": {"page-1": {"region-1": ["component-1"]}},
+            "regions": {"region-1": {"locator": "region-1-locator", "timeout": 10}},
+            "components": {
+                "locator": "component-locator",
+                "component-1": {
+                    "timeout": 3,
+                    "input-1": {"type": "text", "locator": "input-1-locator"},
+                    "input-2": {
+                        "type": "button",
+                        "locator": "input-2-locator",
+                        "poll": 0.1,
+                    },
+                },
+            },
+        }
+    )
+    region = factory.get_region("region-1", "page-1")
+    component = factory.get_component("region-1", 1, "component-1")
+    button = factory.get_input("region-1", "component-1", "input-2")
+    assert (region.timeout, region.poll) == (10, None)
+    assert (component.timeout, component.poll) == (3, None)
+    assert (button.timeout, button.poll) == (3, 0.1)
+    assert set(component.inputs) == {"input-1", "input-2"}
@@ -1,7 +1,8 @@
 import pytest
 
-from lm_automator.page import Page
-from lm_automator.common import DRIVER
+from lm_automator.page import Page, Route
+from lm_automator.common import SESSION, DriverSession
+from lm_automator.element_handler import ElementHandler
 
 
 @pytest.mark.usefixtures("login")
@@ -9,12 +10,26 @@ class TestPage:
 
     def test_visit_method_opens_correct_page(self):
         Page.visit("category")
-        assert DRIVER.current_url == "https://dev-layout-cms.fox29.com/category"
+        assert SESSION.driver.current_url == "https://dev-layout-cms.fox29.com/category"
 
     def test_select_layout_method_opens_correct_layout(self):
-        DRIVER.get("https://dev-layout-cms.fox29.com/category")
+        ElementHandler.navigate("https://dev-layout-cms.fox29.com/category")
         Page.select_layout("Entertainment")
         assert (
-            DRIVER.current_url
+            SESSION.driver.current_url
             == "https://dev-layout-cms.fox29.com/category#entertainment"
         )
+
+
+class UnlaunchableDriver:
+    def __init__(self):
+        raise AssertionError("the browser should not be needed")
+
+
+def test_visit_and_select_layout_skip_the_page_and_layout_already_open(monkeypatch):
+    session = DriverSession(UnlaunchableDriver)
+    session.arrived("category", "entertainment")
+    monkeypatch.setattr(ElementHandler, "session", session)
+    Page.visit("category", "entertainment", Route("/category"))
+    Page.select_layout("entertainment")
+    assert session.at("category", "entertainment")
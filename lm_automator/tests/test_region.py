@@ -3,7 +3,6 @@ from selenium.common.exceptions import TimeoutException
 
 from lm_automator.region import Region
 from lm_automator.element_handler import ElementHandler
-from lm_automator.common import DRIVER
 
 
 @pytest.mark.usefixtures("login")
@@ -24,7 +23,7 @@ class TestRegion:
             return []
 
     def setup_method(self):
-        DRIVER.refresh()
+        ElementHandler.refresh()
         ElementHandler.wait_for_timeout(reason="Overlay needs to disappear.")
 
     def test_add_components(self):
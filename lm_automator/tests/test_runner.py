@@ -0,0 +1,86 @@
+import os
+import time
+
+from lm_automator import runner
+from lm_automator import flow_compiler
+from lm_automator.journal import Journal
+
+
+def fake_worker(tasks, results, config_data, site, trace):
+    name = runner.multiprocessing.current_process().name
+    results.put(("ready", name, None))
+    while True:
+        test = tasks.get()
+        if test is None:
+            break
+        if test.page == "crash":
+            os._exit(1)
+        if test.page == "slow":
+            time.sleep(2)
+        results.put(("finished", name, runner.TestResult(test.index, "passed", 0.0)))
+
+
+def failing_worker(tasks, results, config_data, site, trace):
+    name = runner.multiprocessing.current_process().name
+    results.put(("failed", name, "RuntimeError: login failed"))
+    raise SystemExit(3)
+
+
+def test_run_parallel_reports_why_workers_died_before_running_a_test(capsys):
+    tests = [flow_compiler.TestPlan(0, "page", None, [])]
+    results = runner.run_parallel(tests, 1, {}, "site", worker=failing_worker)
+    assert results[0].outcome == "crashed"
+    assert "exited with code 3" in results[0].error
+    assert "RuntimeError: login failed" in results[0].error
+    assert "RuntimeError: login failed" in capsys.readouterr().out
+
+
+def test_run_parallel_reports_crashed_test_and_runs_the_rest():
+    tests = [
+        flow_compiler.TestPlan(index, page, None, [])
+        for index, page in enumerate(["page", "crash", "page", "page", "page"])
+    ]
+    results = runner.run_parallel(tests, 2, {}, "site", worker=fake_worker)
+    assert [result.index for result in results] == [0, 1, 2, 3, 4]
+    assert [result.outcome for result in results] == [
+        "passed",
+        "crashed",
+        "passed",
+        "passed",
+        "passed",
+    ]
+
+
+def test_report_returns_true_when_every_test_passed():
+    assert runner.report([runner.TestResult(0, "passed", 1.0), runner.TestResult(1, "passed", 2.0)])
+
+
+def test_report_returns_false_when_a_test_failed():
+    assert not runner.report([runner.TestResult(0, "passed", 1.0), runner.TestResult(1, "failed", 2.0, "boom")])
+
+
+def test_run_parallel_runs_a_stream_of_tests():
+    tests = (flow_compiler.TestPlan(index, "page", None, []) for index in range(4))
+    results = runner.run_parallel(tests, 2, {}, "site", worker=fake_worker)
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert all(result.outcome == "passed" for result in results)
+
+
+def test_run_parallel_records_every_result_in_the_journal(tmp_path):
+    journal = Journal("flow", tmp_path.joinpath("journal.jsonl"))
+    tests = [
+        flow_compiler.TestPlan(index, page, None, [])
+        for index, page in enumerate(["page", "crash", "page"])
+    ]
+    runner.run_parallel(tests, 2, {}, "site", journal=journal, worker=fake_worker)
+    assert journal.outcomes() == {0: "passed", 1: "crashed", 2: "passed"}
+
+
+def test_run_parallel_does_not_report_workers_that_finished(capsys):
+    # The first worker is done long before the second finishes its slow test.
+    tests = [
+        flow_compiler.TestPlan(index, page, None, []) for index, page in enumerate(["page", "slow"])
+    ]
+    results = runner.run_parallel(tests, 2, {}, "site", worker=fake_worker)
+    assert [result.outcome for result in results] == ["passed", "passed"]
+    assert "exited with code" not in capsys.readouterr().out
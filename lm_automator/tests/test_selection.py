@@ -0,0 +1,26 @@
+import json
+
+from lm_automator.selection import ResultState
+
+
+def test_changed_is_true_for_unknown_and_failed_fingerprints(tmp_path):
+    state = ResultState(tmp_path.joinpath("results.json"))
+    state.record("failed-test", "failed")
+    assert state.changed("new-test")
+    assert state.changed("failed-test")
+
+
+def test_changed_is_false_for_fingerprints_that_passed_in_a_saved_run(tmp_path):
+    path = tmp_path.joinpath("results.json")
+    state = ResultState(path)
+    state.record("passed-test", "passed")
+    state.save()
+    assert not ResultState(path).changed("passed-test")
+
+
+def test_save_forgets_old_fingerprints(tmp_path):
+    path = tmp_path.joinpath("results.json")
+    path.write_text(json.dumps({"old-test": {"outcome": "passed", "ran_at": 0}}))
+    state = ResultState(path)
+    state.save()
+    assert ResultState(path).outcome("old-test") is None
@@ -0,0 +1,76 @@
+import pathlib
+
+import pytest
+from urllib3.exceptions import ProtocolError
+
+from lm_automator.common import SESSION, DriverSession
+from lm_automator.element_handler import ElementHandler
+from lm_automator.layout_manager import LayoutManager
+from lm_automator.session_pool import SessionPool
+
+
+class DeadDriver:
+    def __init__(self, error):
+        self.error = error
+
+    @property
+    def current_url(self):
+        raise self.error
+
+
+@pytest.mark.parametrize(
+    "error",
+    [ConnectionRefusedError("The driver process is gone."), ProtocolError("Connection aborted.")],
+)
+def test_healthy_returns_false_when_the_driver_cannot_be_reached(error):
+    assert SessionPool.healthy(DriverSession(lambda: DeadDriver(error))) is False
+
+
+@pytest.mark.usefixtures("visit_test_site")
+class TestSessionPool:
+    @classmethod
+    def setup_class(cls):
+        cls.layout_manager = LayoutManager(environment="dev", site="fox29", session=SESSION)
+        cls.layout_manager.base_url = "file://" + str(
+            pathlib.Path.cwd().joinpath("lm_automator", "tests", "test-site.html")
+        )
+        cls.pool = SessionPool("dev", "fox29", "username", "password")
+
+    def test_reset_keeps_auth_storage_and_clears_the_rest(self):
+        SESSION.driver.execute_script(
+            "localStorage.setItem('okta-token-storage', 'token');"
+            "localStorage.setItem('draft', 'data');"
+            "sessionStorage.setItem('draft', 'data');"
+        )
+        self.pool.reset(self.layout_manager)
+        assert SESSION.driver.execute_script(
+            "return [localStorage.getItem('okta-token-storage'),"
+            " localStorage.getItem('draft'), sessionStorage.getItem('draft')];"
+        ) == ["token", None, None]
+
+    def test_reset_closes_extra_windows(self):
+        SESSION.driver.switch_to.new_window("tab")
+        self.pool.reset(self.layout_manager)
+        assert len(SESSION.driver.window_handles) == 1
+
+    def test_reset_returns_to_base_url(self):
+        ElementHandler.navigate("about:blank")
+        self.pool.reset(self.layout_manager)
+        assert SESSION.driver.current_url == self.layout_manager.base_url
+
+    def test_reset_stays_on_a_page_left_unchanged_with_its_storage(self):
+        ElementHandler.navigate(self.layout_manager.base_url)
+        SESSION.driver.execute_script("localStorage.setItem('draft', 'data');")
+        SESSION.arrived("category")
+        self.pool.reset(self.layout_manager)
+        assert SESSION.driver.execute_script("return localStorage.getItem('draft');") == "data"
+        ElementHandler.navigate("about:blank")
+        SESSION.arrived("category")
+        self.pool.reset(self.layout_manager)
+        assert SESSION.driver.current_url == "about:blank"
+        SESSION.dirty = True
+        self.pool.reset(self.layout_manager)
+        assert SESSION.driver.current_url == self.layout_manager.base_url
+
+    def test_healthy_returns_true_for_a_running_session(self):
+        assert self.pool.healthy(SESSION) is True
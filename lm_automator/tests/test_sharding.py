@@ -0,0 +1,82 @@
+import argparse
+
+import pytest
+
+from lm_automator import sharding
+from lm_automator import flow_compiler
+
+
+def plans(*fingerprints):
+    return [
+        flow_compiler.TestPlan(index, "page", None, [], fingerprint)
+        for index, fingerprint in enumerate(fingerprints)
+    ]
+
+
+def history(tmp_path, **durations):
+    history = sharding.DurationHistory(tmp_path.joinpath("durations.jsonl"))
+    history.record(durations)
+    return sharding.DurationHistory(history.path)
+
+
+def test_parse_shard_numbers_shards_from_one():
+    assert sharding.parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            sharding.parse_shard(value)
+
+
+def test_history_averages_the_entries_of_concatenated_files(tmp_path):
+    first = history(tmp_path, a=1.0, b=4.0)
+    second = sharding.DurationHistory(tmp_path.joinpath("other.jsonl"))
+    second.record({"a": 3.0})
+    with open(first.path, "a") as file:
+        file.write(second.path.read_text() + '{"fingerprint": "c", "dur')
+    assert sharding.DurationHistory(first.path).durations == {"a": 2.0, "b": 4.0}
+
+
+def test_assign_packs_the_longest_tests_first(tmp_path):
+    tests = plans("a", "b", "c", "d", "e")
+    shards = sharding.assign(tests, 2, history(tmp_path, a=7, b=5, c=4, d=3, e=1))
+    loads = [0, 0]
+    for test in tests:
+        loads[shards[test.index]] += {"a": 7, "b": 5, "c": 4, "d": 3, "e": 1}[
+            test.fingerprint
+        ]
+    assert sorted(loads) == [10, 10]
+
+
+def test_assign_expects_tests_without_history_to_take_the_average(tmp_path):
+    shards = sharding.assign(plans("a", "b", "new"), 2, history(tmp_path, a=10, b=2))
+    assert shards[0] != shards[2]
+    assert shards[1] == shards[2]
+
+
+def test_assign_falls_back_to_a_hash_without_history(tmp_path):
+    tests = plans("a", "b", "c")
+    shards = sharding.assign(tests, 3, history(tmp_path))
+    assert shards == {test.index: sharding.hash_shard(test, 3) for test in tests}
+
+
+def test_shards_together_hold_every_test_once(tmp_path):
+    tests = plans(*"abcdefg")
+    durations = history(tmp_path, a=1, c=5, e=2)
+    assigned = [
+        test.index
+        for number in (1, 2, 3)
+        for test in sharding.shard(tests, number, 3, durations)
+    ]
+    assert sorted(assigned) == list(range(7))
+    streamed = [
+        test.index
+        for number in (1, 2, 3)
+        for test in sharding.shard(iter(tests), number, 3, durations)
+    ]
+    assert sorted(streamed) == list(range(7))
+
+
+def test_shard_splits_by_hash_without_a_shared_history():
+    tests = plans(*"abcdefg")
+    assert [test.index for test in sharding.shard(tests, 2, 3)] == [
+        test.index for test in tests if sharding.hash_shard(test, 3) == 1
+    ]
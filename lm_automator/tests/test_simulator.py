@@ -0,0 +1,88 @@
+import pathlib
+
+from lm_automator.flow_compiler import load_plan
+from lm_automator.simulator import simulate, run_simulated
+from lm_automator.tests.test_flow_compiler import COMPILER, flow
+
+EXAMPLES = pathlib.Path(__file__).parent.parent.joinpath("examples")
+
+
+def add(*components):
+    return {"action": "add-components", "region": "region-1", "components": list(components)}
+
+
+def edit(index, *steps, component="component-1"):
+    return {
+        "action": "edit-component",
+        "region": "region-1",
+        "index": index,
+        "component": component,
+        "steps": list(steps),
+    }
+
+
+def remove(index):
+    return {"action": "remove-component", "region": "region-1", "index": index}
+
+
+def assert_state(index, **expected):
+    return {
+        "action": "assert-state",
+        "region": "region-1",
+        "index": index,
+        "component": "component-1",
+        "expected": expected,
+    }
+
+
+def simulated(*steps):
+    return simulate(COMPILER.compile(flow(*steps)).tests[0])
+
+
+def test_example_flow_passes():
+    plan = load_plan(
+        str(EXAMPLES.joinpath("flow.yml")), str(EXAMPLES.joinpath("models.yml")), None, None
+    )
+    assert [result.outcome for result in run_simulated(plan.tests)] == ["passed"]
+
+
+def test_editing_a_component_past_the_end_of_the_region_fails():
+    result = simulated(add("component-1"), edit(2))
+    assert result.outcome == "failed"
+    assert "region-1 has 1 components, there is no component 2" in result.error
+
+
+def test_editing_a_component_of_another_kind_fails():
+    result = simulated(add("component-2"), edit(1))
+    assert result.outcome == "failed"
+    assert "component 1 of region-1 is 'component-2'" in result.error
+
+
+def test_removing_a_component_moves_the_ones_after_it_up():
+    assert (
+        simulated(add("component-2", "component-1"), remove(1), edit(1)).outcome
+        == "passed"
+    )
+    assert simulated(add("component-1"), remove(1), remove(1)).outcome == "failed"
+
+
+def test_assert_state_checks_the_values_written_by_edits():
+    write = edit(
+        1,
+        {"action": "set", "input": "input-1", "value": 5},
+        {"action": "check", "input": "input-3", "value": True},
+    )
+    assert (
+        simulated(add("component-1"), write, assert_state(1, **{"input-1": 5})).outcome
+        == "passed"
+    )
+    result = simulated(add("component-1"), write, assert_state(1, **{"input-3": False}))
+    assert result.outcome == "failed"
+    assert "input-3: expected False, found True" in result.error
+
+
+def test_assert_state_assumes_inputs_never_written_match():
+    assert (
+        simulated(add("component-1"), assert_state(1, **{"input-4": "a"})).outcome
+        == "passed"
+    )
@@ -0,0 +1,130 @@
+import json
+import time
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from lm_automator.common import DriverSession
+from lm_automator.component import Component
+from lm_automator.element_handler import ElementHandler
+from lm_automator.inputs import Button, Checkbox, Select, Text
+from lm_automator.page import Page
+from lm_automator.region import Region
+from lm_automator.tracing import Tracer
+
+
+def enabled_tracer():
+    tracer = Tracer()
+    tracer.enabled = True
+    return tracer
+
+
+def test_span_records_nothing_when_disabled():
+    tracer = Tracer()
+    with tracer.span("test 0", "test"):
+        pass
+    assert tracer.events == []
+
+
+def test_span_records_a_complete_chrome_trace_event():
+    tracer = enabled_tracer()
+    with tracer.span("Visit", "step", test=0):
+        pass
+    [event] = tracer.events
+    assert event["name"] == "Visit"
+    assert event["cat"] == "step"
+    assert event["ph"] == "X"
+    assert event["args"]["test"] == 0
+
+
+def test_wait_spans_count_towards_the_wait_time_of_their_parents():
+    tracer = enabled_tracer()
+    with tracer.span("test 0", "test"):
+        with tracer.span("ElementHandler.click_element"):
+            with tracer.span("WebDriverWait.until", "wait"):
+                pass
+    wait, action, test = tracer.events
+    assert test["args"]["wait_ms"] == wait["args"]["wait_ms"]
+    assert action["args"]["wait_ms"] == wait["args"]["wait_ms"]
+
+
+def test_commands_count_towards_every_enclosing_span():
+    tracer = enabled_tracer()
+    with tracer.span("test 0", "test"):
+        with tracer.span("ElementHandler.get_element"):
+            tracer.count_command()
+            tracer.count_command()
+    assert [event["args"]["commands"] for event in tracer.events] == [2, 2]
+
+
+def test_summary_lists_tests_and_steps_only():
+    tracer = enabled_tracer()
+    with tracer.span("test 0", "test", test=0):
+        with tracer.span("Visit", "step", test=0):
+            with tracer.span("Page.visit"):
+                pass
+    lines = tracer.summary().splitlines()
+    assert len(lines) == 3
+    assert lines[1].startswith("test 0")
+    assert lines[2].startswith("  Visit")
+
+
+def test_summary_lists_each_test_with_its_own_steps_across_workers():
+    tracer, worker = enabled_tracer(), enabled_tracer()
+    with tracer.span("test 0", "test", test=0):
+        with worker.span("test 1", "test", test=1):
+            with tracer.span("Visit", "step", test=0):
+                with worker.span("AddComponents", "step", test=1):
+                    pass
+    # Spans from a worker process arrive in the parent's tracer like this.
+    tracer.events.extend(dict(event, pid=event["pid"] + 1) for event in worker.events)
+    rows = [line[:40].strip() for line in tracer.summary().splitlines()[1:]]
+    assert rows == ["test 0", "Visit", "test 1", "AddComponents"]
+
+
+def test_write_chrome_trace_writes_trace_events(tmp_path):
+    tracer = enabled_tracer()
+    with tracer.span("test 0", "test"):
+        pass
+    tracer.write_chrome_trace(tmp_path.joinpath("trace.json"))
+    with open(tmp_path.joinpath("trace.json")) as file:
+        assert json.load(file)["traceEvents"] == tracer.events
+
+
+def install(monkeypatch, tracer):
+    # Let monkeypatch put back every attribute install replaces.
+    for class_ in (
+        WebDriver,
+        WebDriverWait,
+        ElementHandler,
+        Page,
+        Button,
+        Region,
+        Component,
+        Text,
+        Checkbox,
+        Select,
+    ):
+        for name, attribute in list(vars(class_).items()):
+            if not name.startswith("__"):
+                monkeypatch.setattr(class_, name, attribute)
+    tracer.install()
+
+
+class ObservingDriver:
+    def execute_async_script(self, script, *args):
+        time.sleep(0.3)
+        return object()
+
+
+def test_observer_mode_waits_count_as_wait_time(monkeypatch):
+    monkeypatch.setattr(ElementHandler, "session", DriverSession(ObservingDriver))
+    monkeypatch.setattr(ElementHandler, "wait_mode", "observer")
+    tracer = Tracer()
+    install(monkeypatch, tracer)
+    ElementHandler.invalidate_cache()
+    with tracer.span("test 0", "test"):
+        ElementHandler.get_element(".observed")
+    ElementHandler.invalidate_cache()
+    [test] = [event for event in tracer.events if event["cat"] == "test"]
+    assert test["args"]["wait_ms"] >= 250
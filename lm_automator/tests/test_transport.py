@@ -0,0 +1,118 @@
+import http.client
+import http.server
+import json
+import threading
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+
+from lm_automator import transport
+
+
+class FakeDriverHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests = []
+    # Whether to close each connection once it answered, like a driver
+    # dropping an idle kept alive connection.
+    close_idle = False
+
+    def setup(self):
+        super().setup()
+        FakeDriverHandler.connections += 1
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        FakeDriverHandler.requests.append(
+            (self.command, self.path, json.loads(body) if body else None)
+        )
+        if self.path.endswith("/title"):
+            # The response breaks off after its headers.
+            self.send_response(200)
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            self.close_connection = True
+            return
+        if self.path.endswith("/element"):
+            status = 404
+            value = {"error": "no such element", "message": "Unable to locate element"}
+        else:
+            status, value = 200, "about:blank"
+        data = json.dumps({"value": value}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = FakeDriverHandler.close_idle
+
+    do_GET = do_POST = do_DELETE = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def connection():
+    FakeDriverHandler.connections = 0
+    FakeDriverHandler.requests = []
+    FakeDriverHandler.close_idle = False
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeDriverHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = transport.ThinConnection(f"http://127.0.0.1:{server.server_port}")
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_commands_share_one_kept_alive_connection(connection):
+    for _ in range(3):
+        response = connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+    assert response["value"] == "about:blank"
+    assert FakeDriverHandler.connections == 1
+
+
+def test_path_parameters_are_substituted_and_left_out_of_the_body(connection):
+    connection.execute(Command.GET, {"sessionId": "s1", "url": "about:blank"})
+    assert FakeDriverHandler.requests == [
+        ("POST", "/session/s1/url", {"url": "about:blank"})
+    ]
+
+
+def test_errors_are_returned_so_webdriver_raises_the_usual_exception(connection):
+    response = connection.execute(
+        Command.FIND_ELEMENT,
+        {"sessionId": "s1", "using": "css selector", "value": "#missing"},
+    )
+    with pytest.raises(NoSuchElementException, match="Unable to locate element"):
+        ErrorHandler().check_response(response)
+
+
+def test_bodies_of_repeated_commands_are_serialized_once():
+    items = (("using", str, "css selector"), ("value", str, "#input"))
+    assert transport._serialize(items) is transport._serialize(items)
+
+
+def test_bodies_of_equal_values_of_different_types_are_cached_apart():
+    assert transport._serialize((("value", bool, True),)) == b'{"value": true}'
+    assert transport._serialize((("value", int, 1),)) == b'{"value": 1}'
+
+
+def test_a_command_is_sent_again_when_the_idle_connection_was_closed(connection):
+    FakeDriverHandler.close_idle = True
+    for _ in range(2):
+        connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+    assert len(FakeDriverHandler.requests) == 2
+    assert FakeDriverHandler.connections == 2
+
+
+def test_a_command_whose_response_broke_off_is_not_sent_again(connection):
+    connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+    with pytest.raises(http.client.IncompleteRead):
+        connection.execute(Command.GET_TITLE, {"sessionId": "s1"})
+    assert len(FakeDriverHandler.requests) == 2
@@ -0,0 +1,220 @@
+"""Contains the Tracer class for profiling where the time of a run goes."""
+
+import inspect
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Generator, List, Tuple
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from lm_automator.component import Component
+from lm_automator.element_handler import ElementHandler
+from lm_automator.inputs import Button, Checkbox, Select, Text
+from lm_automator.page import Page
+from lm_automator.region import Region
+
+
+class _Span:
+    """An open span and what has been measured inside it so far."""
+
+    __slots__ = ("name", "category", "args", "wall_start", "start", "wait", "commands")
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.wait = 0.0
+        self.commands = 0
+
+
+class Tracer:
+    """Records nested spans with their wall time, time spent waiting and WebDriver commands.
+
+    Nothing is wrapped until install is called, so a run without tracing pays
+    nothing for it beyond the test and step spans, which return immediately.
+
+    Attributes:
+        enabled -- whether install has been called
+        events -- finished spans as Chrome trace events
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._stack: List[_Span] = []
+
+    @contextmanager
+    def span(self, name: str, category: str = "action", **args: Any) -> Generator:
+        """Record the time spent inside the context as a span.
+
+        Spans of the "wait" category count towards the wait time of their parents.
+
+        Arguments:
+            name -- name of the span, e.g. the method called
+            category -- "test", "step", "action" or "wait"
+            args -- extra details to show with the span in the trace
+        """
+        if not self.enabled:
+            yield
+            return
+
+        span = _Span(name, category, args)
+        self._stack.append(span)
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - span.start
+            self._stack.pop()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.commands += span.commands
+                parent.wait += duration if category == "wait" else span.wait
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": span.wall_start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": dict(
+                        args,
+                        wait_ms=round(
+                            (duration if category == "wait" else span.wait) * 1e3, 3
+                        ),
+                        commands=span.commands,
+                    ),
+                }
+            )
+
+    def count_command(self) -> None:
+        """Count a WebDriver command towards the innermost open span."""
+        if self._stack:
+            self._stack[-1].commands += 1
+
+    def install(self) -> None:
+        """Wrap the ElementHandler, widget and Page methods and WebDriver commands in spans."""
+        if self.enabled:
+            return
+        self.enabled = True
+
+        original_execute = WebDriver.execute
+
+        @wraps(original_execute)
+        def execute(driver: WebDriver, *args: Any, **kwargs: Any) -> Any:
+            self.count_command()
+            return original_execute(driver, *args, **kwargs)
+
+        WebDriver.execute = execute  # type: ignore
+        WebDriverWait.until = self._wrap(  # type: ignore
+            WebDriverWait.until, "WebDriverWait.until", "wait"
+        )
+        WebDriverWait.until_not = self._wrap(  # type: ignore
+            WebDriverWait.until_not, "WebDriverWait.until_not", "wait"
+        )
+
+        # Observer mode and readiness waits run a script, not a WebDriverWait.
+        script_waits = ("_until", "wait_until_ready")
+        for name, attribute in list(vars(ElementHandler).items()):
+            if name.startswith("_") and name not in script_waits:
+                continue
+            if not isinstance(attribute, classmethod):
+                continue
+            function = attribute.__func__
+            if inspect.isgeneratorfunction(getattr(function, "__wrapped__", None)):
+                # Context managers such as enter_frame would only time their setup.
+                continue
+            waits = name.startswith("wait") or name in script_waits
+            category = "wait" if waits else "action"
+            setattr(
+                ElementHandler,
+                name,
+                classmethod(self._wrap(function, f"ElementHandler.{name}", category)),
+            )
+
+        for name in ("select_layout", "visit", "publish"):
+            function = vars(Page)[name].__func__
+            setattr(Page, name, classmethod(self._wrap(function, f"Page.{name}")))
+
+        for class_, names in (
+            (Button, ("click",)),
+            (Region, ("add_components", "expand_menu")),
+            (Component, ("edit", "delete", "snapshot")),
+        ):
+            for name in names:
+                setattr(
+                    class_,
+                    name,
+                    self._wrap(vars(class_)[name], f"{class_.__name__}.{name}"),
+                )
+
+        for class_ in (Text, Checkbox, Select):
+            value = vars(class_)["value"]
+            setattr(
+                class_,
+                "value",
+                property(
+                    self._wrap(value.fget, f"{class_.__name__}.value"),
+                    self._wrap(value.fset, f"{class_.__name__}.value="),
+                ),
+            )
+
+    def _wrap(
+        self, function: Callable, name: str, category: str = "action"
+    ) -> Callable:
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the recorded spans as a JSON trace viewable in chrome://tracing.
+
+        Arguments:
+            path -- file to write the trace to
+        """
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+
+    def summary(self) -> str:
+        """Return a table of the wall, wait and action time and commands of each test and step.
+
+        Workers run tests at the same time, so spans are grouped by process and
+        test before being listed, each test followed by its own steps.
+        """
+        tests: Dict[Tuple[int, Any], List[Dict[str, Any]]] = {}
+        for event in self.events:
+            if event["cat"] in ("test", "step"):
+                key = (event["pid"], event["args"].get("test"))
+                tests.setdefault(key, []).append(event)
+        rows = [
+            f"{'span':<40} {'wall s':>9} {'wait s':>9} {'action s':>9} {'commands':>9}"
+        ]
+        for events in sorted(
+            tests.values(), key=lambda events: min(event["ts"] for event in events)
+        ):
+            events.sort(key=lambda event: (event["cat"] != "test", event["ts"]))
+            rows.extend(self._row(event) for event in events)
+        return "\n".join(rows)
+
+    @staticmethod
+    def _row(event: Dict[str, Any]) -> str:
+        wall = event["dur"] / 1e6
+        wait = event["args"]["wait_ms"] / 1e3
+        name = event["name"] if event["cat"] == "test" else "  " + event["name"]
+        return (
+            f"{name:<40} {wall:>9.3f} {wait:>9.3f} {wall - wait:>9.3f}"
+            f" {event['args']['commands']:>9}"
+        )
+
+
+TRACER = Tracer()
@@ -0,0 +1,150 @@
+"""Contains ThinConnection, a lightweight transport for Selenium's WebDriver commands."""
+
+import functools
+import http.client
+import json
+import string
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from urllib import parse
+
+from selenium.webdriver.firefox.remote_connection import FirefoxRemoteConnection
+from selenium.webdriver.remote.client_config import ClientConfig
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_path(path: str) -> Tuple[string.Template, FrozenSet[str]]:
+    """Return the template of a command's path and the parameters it substitutes."""
+    return (
+        string.Template(path),
+        frozenset(word[1:] for word in path.split("/") if word.startswith("$")),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _serialize(items: Tuple[Tuple[str, type, Any], ...]) -> bytes:
+    """Return the JSON body of command parameters given as hashable items.
+
+    Each item is (name, type of the value, value). True, 1 and 1.0 are equal
+    and hash alike, so without their types they would share one cache entry
+    and be sent as each other's JSON. lru_cache's typed only looks at the
+    types of the arguments themselves, not of what the tuple holds.
+    """
+    return json.dumps({name: value for name, _, value in items}).encode()
+
+
+class ThinConnection(FirefoxRemoteConnection):
+    """Sends commands over a single persistent connection with as little work per command as possible.
+
+    Compared to Selenium's connection it skips the connection pool, logging and
+    per-request header building, caches the bodies of repeated commands such as
+    finding the same locator, and only parses the JSON of the response. Errors
+    are returned the way Selenium's connection returns them, so WebDriver raises
+    the same exceptions.
+
+    Attributes:
+        timeout -- seconds to wait for a response to a command
+    """
+
+    timeout = 120
+
+    def __init__(self, remote_server_addr: str):
+        """
+        Arguments:
+            remote_server_addr -- URL of the driver, e.g. http://localhost:4444
+        """
+        super().__init__(
+            remote_server_addr,
+            client_config=ClientConfig(
+                remote_server_addr=remote_server_addr, keep_alive=False, timeout=self.timeout
+            ),
+        )
+        url = parse.urlsplit(remote_server_addr)
+        self._host = url.hostname
+        self._port = url.port
+        self._prefix = url.path.rstrip("/")
+        self._headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json;charset=UTF-8",
+            "Connection": "keep-alive",
+            "User-Agent": self.user_agent,
+        }
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def execute(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a command to the driver and return its parsed response.
+
+        Arguments:
+            command -- name of the command, see selenium.webdriver.remote.command
+            params -- the command's parameters, including the ones in its path
+        """
+        method, path = self._commands.get(command) or self.extra_commands[command]
+        template, substituted = _parse_path(path)
+        body = None
+        if method in ("POST", "PUT"):
+            body_params = tuple(
+                (name, type(value), value)
+                for name, value in params.items()
+                if name not in substituted
+            )
+            try:
+                body = _serialize(body_params)
+            except TypeError:
+                # Lists and dicts, e.g. script arguments, cannot be cached.
+                body = json.dumps(
+                    {name: value for name, _, value in body_params}
+                ).encode()
+        return self._request(method, self._prefix + template.substitute(params), body)
+
+    def _request(self, method: str, url: str, body: Any = None) -> Dict[str, Any]:
+        if url.startswith("http"):
+            url = parse.urlsplit(url).path
+        if isinstance(body, str):
+            body = body.encode()
+        if method not in ("POST", "PUT"):
+            body = None
+        reused = self._connection is not None
+        try:
+            response = self._send(method, url, body)
+        except ConnectionError:
+            # The driver may have closed the kept alive connection while it was
+            # idle. Nothing came back, so the command never ran: send it again
+            # once on a new connection. On a new connection it is a real error.
+            self._disconnect()
+            if not reused:
+                raise
+            response = self._send(method, url, body)
+        try:
+            data = response.read()
+        except Exception:
+            # The command may have run, so it must not be sent again.
+            self._disconnect()
+            raise
+
+        if response.status >= 400:
+            return {"status": response.status, "value": data.decode("utf-8")}
+        result = json.loads(data) if data else {}
+        result.setdefault("value", None)
+        return result
+
+    def _send(self, method: str, url: str, body: Optional[bytes]) -> http.client.HTTPResponse:
+        """Send a request and return the response once its status line arrived."""
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(
+                self._host, self._port, timeout=self.timeout
+            )
+        try:
+            self._connection.request(method, url, body=body, headers=self._headers)
+            return self._connection.getresponse()
+        except http.client.HTTPException:
+            self._disconnect()
+            raise
+
+    def _disconnect(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def close(self) -> None:
+        """Close the connection to the driver."""
+        self._disconnect()
+        super().close()
@@ -1,6 +1,7 @@
 """Contains an abstract base class for HTML elements to subclass."""
 
 from abc import ABCMeta, abstractmethod
+from typing import Optional
 
 
 class Widget(metaclass=ABCMeta):
@@ -8,14 +9,24 @@ class Widget(metaclass=ABCMeta):
 
     Attributes:
         _locator -- CSS selector for locating the element
+        timeout -- seconds to wait for the element, None for ElementHandler's timeout
+        poll -- seconds between checks while waiting, None for ElementHandler's
     """
 
-    def __init__(self, locator: str):
+    __slots__ = ("_locator", "timeout", "poll")
+
+    def __init__(
+        self, locator: str, timeout: Optional[float] = None, poll: Optional[float] = None
+    ):
         """
         Arguments:
             locator -- CSS selector for locating the element
+            timeout -- seconds to wait for the element, None for ElementHandler's timeout
+            poll -- seconds between checks while waiting, None for ElementHandler's
         """
         self._locator = locator
+        self.timeout = timeout
+        self.poll = poll
 
     @property
     @abstractmethod